@@ -1,23 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+filtrar_grafo.py
+-----------------------
+Filtra los RAW descargados de Wikidata (formato WCQS) dejando las entidades
+festivas/religiosas: por QID de tipo o por palabras clave en la etiqueta y
+la descripción. El tipo cuenta también si es subclase (P279, transitiva) de
+un tipo relevante, con el índice precalculado de jerarquia_tipos.py.
+
+Las palabras clave de todos los idiomas se compilan en UNA expresión regular
+(alternancia) sobre texto normalizado: sin tildes ni diacríticos y con
+casefold, así 'peregrinacion' encuentra 'Peregrinación'. Cada fila se
+recorre una sola vez sea cual sea el nº de palabras. Los RAW se leen en
+streaming (fila a fila, sin cargar el JSON entero) y las filas relevantes se
+escriben a medida que se encuentran.
+
+Uso:
+    python filtrar_grafo.py                                  # 04_tipos_entidades_RAW.json
+    python filtrar_grafo.py data/02_conexiones_geograficas_RAW.json data/04_tipos_entidades_RAW.json
+    python filtrar_grafo.py data/*_RAW.json --limite palabra
+"""
+
+import argparse
 import json
+import re
+import unicodedata
+from pathlib import Path
 
-# 1. Cargar el JSON crudo descargado de Wikidata
-archivo_entrada = '04_tipos_entidades_RAW.json'
-with open(archivo_entrada, 'r', encoding='utf-8') as f:
-    datos_completos = json.load(f)
+from jerarquia_tipos import JERARQUIA, indice_subclases
 
-# 2. Extraer los resultados reales del formato WCQS
-# Los datos están en datos_completos['results']['bindings']
-datos = datos_completos['results']['bindings']
+TAMANO_BLOQUE = 1 << 20     # caracteres leídos por bloque al recorrer un RAW
 
-# 3. Palabras clave para buscar en etiquetas y descripciones
+# 1. Palabras clave para buscar en etiquetas y descripciones
 palabras_clave = {
-    'es': ['fiesta', 'festividad', 'danza', 'peregrinación', 'carnaval', 'celebración', 
+    'es': ['fiesta', 'festividad', 'danza', 'peregrinación', 'carnaval', 'celebración',
            'rito', 'tradición', 'patronal', 'virgen', 'señor', 'santo', 'carmen', 'qoyllur'],
     'qu': ['raymi'],  # Fiesta en quechua
     'en': ['festival', 'feast', 'celebration', 'pilgrimage', 'dance', 'ritual', 'tradition']
 }
 
-# 4. QIDs de tipos de entidades relevantes
+# 2. QIDs de tipos de entidades relevantes
 tipos_relevantes_qids = {
     'Q200538',   # fiesta
     'Q375011',   # festividad religiosa
@@ -26,68 +47,173 @@ tipos_relevantes_qids = {
     'Q20203314'  # festividad religiosa
 }
 
-# 5. Función para extraer el valor de un campo del formato WCQS
+# Límites de palabra: 'subcadena' (en cualquier posición, como antes),
+# 'inicio' (al comienzo de una palabra: 'danza' -> 'danzas') o 'palabra' (completa)
+LIMITES = {'subcadena': ('', ''), 'inicio': (r'\b', ''), 'palabra': (r'\b', r'\b')}
+# Marcas combinantes que deja NFKD (tildes, diéresis, virgulilla de la ñ...)
+DIACRITICOS = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+
+
+# 3. Normalización y compilación de las palabras clave
+def normalizar(texto):
+    """Texto sin diacríticos y en casefold: 'Peregrinación' -> 'peregrinacion'"""
+    if texto.isascii():
+        return texto.casefold()
+    return DIACRITICOS.sub('', unicodedata.normalize('NFKD', texto)).casefold()
+
+
+def compilar_patron(palabras_clave, limite='subcadena'):
+    """Una sola regex con todas las palabras (normalizadas, las más largas primero)"""
+    palabras = {normalizar(p) for lista in palabras_clave.values() for p in lista if p.strip()}
+    antes, despues = LIMITES[limite]
+    alternativas = '|'.join(re.escape(p) for p in sorted(palabras, key=lambda p: (-len(p), p)))
+    return re.compile(f"{antes}(?:{alternativas}){despues}")
+
+
+# 4. Función para extraer el valor de un campo del formato WCQS
 def obtener_valor(campo):
     """Extrae el valor de un campo en formato WCQS, o cadena vacía si no existe"""
     if campo and 'value' in campo:
         return campo['value']
     return ''
 
-# 6. Función para determinar si un ítem es relevante
-def es_relevante(item):
-    # Verificar por tipo de entidad (QIDs de festividades, danzas, etc.)
+
+# 5. Función para determinar si un ítem es relevante
+def es_relevante(item, patron, subclases=None):
+    # Verificar por tipo de entidad (QIDs de festividades, danzas, etc., o subclases suyas)
     tipo_url = obtener_valor(item.get('tipo'))
     if tipo_url:
         tipo_qid = tipo_url.split('/')[-1]  # Extraer QID de la URL
         if tipo_qid in tipos_relevantes_qids:
             return True
+        if subclases is not None and subclases.es_subclase(tipo_qid):
+            return True
+
+    # Verificar por palabras clave en labels y descripciones (una sola búsqueda)
+    item_label = obtener_valor(item.get('itemLabel', {}))
+    item_desc = obtener_valor(item.get('itemDescription', {}))
+    return patron.search(normalizar(f"{item_label}\n{item_desc}")) is not None
+
+
+# 6. Lectura en streaming del formato WCQS
+def leer_bindings(ruta):
+    """(head, generador de filas) de un JSON WCQS, leyendo por bloques
+
+    Se asume el orden de Wikidata: {"head": ..., "results": {"bindings": [...]}}.
+    """
+    decodificador = json.JSONDecoder()
+    f = open(ruta, 'r', encoding='utf-8')
+    texto = ''
+
+    def leer_mas():
+        nonlocal texto
+        bloque = f.read(TAMANO_BLOQUE)
+        if not bloque:
+            f.close()
+            raise ValueError(f"{ruta}: no contiene results.bindings")
+        texto += bloque
+
+    # Leer hasta tener el '[' que abre bindings (la cabecera puede cruzar varios bloques)
+    while True:
+        inicio_bindings = texto.find('"bindings"')
+        if inicio_bindings >= 0 and texto.find('[', inicio_bindings) >= 0:
+            break
+        leer_mas()
+
+    head = {}
+    if '"head"' in texto[:inicio_bindings]:
+        pos = texto.index(':', texto.index('"head"')) + 1
+        while texto[pos] in ' \t\r\n':
+            pos += 1
+        head, _ = decodificador.raw_decode(texto, pos)   # termina antes de "bindings", ya leído
+    texto = texto[texto.index('[', inicio_bindings) + 1:]
+
+    def filas():
+        nonlocal texto
+        with f:
+            pos = 0
+            while True:
+                while pos < len(texto) and texto[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(texto) and texto[pos] == ']':
+                    return
+                try:
+                    item, fin = decodificador.raw_decode(texto, pos)
+                except json.JSONDecodeError:
+                    bloque = f.read(TAMANO_BLOQUE)
+                    if not bloque:
+                        raise
+                    texto, pos = texto[pos:] + bloque, 0   # descartar lo ya consumido
+                    continue
+                yield item
+                pos = fin
+
+    return head, filas()
+
+
+# 7. Filtrar un RAW en una pasada, escribiendo las filas relevantes según se encuentran
+def filtrar_archivo(ruta, patron, archivo_salida=None, subclases=None):
+    """Filtra un RAW en streaming; devuelve (salida, nº filas, nº filtradas, primeras filtradas, tipos vistos)"""
+    ruta = Path(ruta)
+    if archivo_salida is None:
+        archivo_salida = ruta.with_name(f"{ruta.stem}_FILTRADO.json")
+    head, filas = leer_bindings(ruta)
+    total, filtrados, primeras, todos_tipos = 0, 0, [], set()
+    with open(archivo_salida, 'w', encoding='utf-8') as salida:
+        # Mismo formato WCQS para consistencia
+        salida.write('{"head": ' + json.dumps(head, ensure_ascii=False) + ', "results": {"bindings": [\n')
+        for item in filas:
+            total += 1
+            tipo_label = obtener_valor(item.get('tipoLabel', {}))
+            if tipo_label:
+                todos_tipos.add(tipo_label)
+            if es_relevante(item, patron, subclases):
+                salida.write((',\n' if filtrados else '') + json.dumps(item, ensure_ascii=False))
+                filtrados += 1
+                if len(primeras) < 10:
+                    primeras.append(item)
+        salida.write('\n]}}\n')
+    return archivo_salida, total, filtrados, primeras, todos_tipos
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Filtra RAW de Wikidata (WCQS) por tipo y palabras clave")
+    ap.add_argument("raw", nargs="*", default=["04_tipos_entidades_RAW.json"],
+                    help="Archivos RAW (default: 04_tipos_entidades_RAW.json)")
+    ap.add_argument("--limite", choices=sorted(LIMITES), default="subcadena",
+                    help="Cómo deben coincidir las palabras clave (default: subcadena)")
+    ap.add_argument("--jerarquia", default=str(JERARQUIA),
+                    help="Jerarquía P279 descargada (default: data/06_jerarquia_tipos.json)")
+    args = ap.parse_args()
+
+    patron = compilar_patron(palabras_clave, args.limite)
+    subclases = indice_subclases(tipos_relevantes_qids, args.jerarquia)
+    if subclases is None:
+        print(f"⚠️  Sin jerarquía P279 ({args.jerarquia}): solo cuentan los tipos exactos. "
+              f"Descárgala con: python jerarquia_tipos.py --descargar")
+    else:
+        print(f"🌳 Índice de subclases: {len(subclases.mascaras)} clases bajo los tipos relevantes")
+    for archivo_entrada in args.raw:
+        archivo_salida, total, filtrados, datos_filtrados, todos_tipos = filtrar_archivo(
+            archivo_entrada, patron, subclases=subclases)
+        print(f"✅ Filtrado completado!")
+        print(f"   Entradas originales: {total}")
+        print(f"   Entradas filtradas: {filtrados}")
+        print(f"   Archivo guardado como: {archivo_salida}")
+
+        # 8. Mostrar preview de los resultados
+        if datos_filtrados:
+            print("\n🔍 Primeras entradas filtradas:")
+            for i, item in enumerate(datos_filtrados):
+                label = obtener_valor(item.get('itemLabel', {}))
+                tipo = obtener_valor(item.get('tipoLabel', {}))
+                desc = obtener_valor(item.get('itemDescription', {}))
+                print(f"   {i+1}. {label} | Tipo: {tipo} | Desc: {desc}")
+        else:
+            print("\n❌ No se encontraron entidades relevantes con los criterios actuales.")
+            # Diagnóstico: mostrar todos los tipos encontrados
+            print(f"   Tipos encontrados en el RAW: {sorted(todos_tipos)}")
 
-    # Verificar por palabras clave en labels y descripciones
-    item_label = obtener_valor(item.get('itemLabel', {})).lower()
-    item_desc = obtener_valor(item.get('itemDescription', {})).lower()
-    texto_busqueda = f"{item_label} {item_desc}"
-    
-    for idioma, palabras in palabras_clave.items():
-        for palabra in palabras:
-            if palabra.lower() in texto_busqueda:
-                return True
-    
-    return False
-
-# 7. Filtrar los datos
-datos_filtrados = [item for item in datos if es_relevante(item)]
-
-# 8. Guardar el resultado filtrado (en el mismo formato WCQS para consistencia)
-resultado_filtrado = {
-    "head": datos_completos["head"],
-    "results": {"bindings": datos_filtrados}
-}
 
-archivo_salida = '04_tipos_entidades_RAW_FILTRADO.json'
-with open(archivo_salida, 'w', encoding='utf-8') as f:
-    json.dump(resultado_filtrado, f, ensure_ascii=False, indent=2)
-
-print(f"✅ Filtrado completado!")
-print(f"   Entradas originales: {len(datos)}")
-print(f"   Entradas filtradas: {len(datos_filtrados)}")
-print(f"   Archivo guardado como: {archivo_salida}")
-
-# 9. Mostrar preview de los resultados
-if datos_filtrados:
-    print("\n🔍 Primeras entradas filtradas:")
-    for i, item in enumerate(datos_filtrados[:10]):
-        label = obtener_valor(item.get('itemLabel', {}))
-        tipo = obtener_valor(item.get('tipoLabel', {}))
-        desc = obtener_valor(item.get('itemDescription', {}))
-        print(f"   {i+1}. {label} | Tipo: {tipo} | Desc: {desc}")
-else:
-    print("\n❌ No se encontraron entidades relevantes con los criterios actuales.")
-    
-    # Diagnóstico: mostrar todos los tipos encontrados
-    todos_tipos = set()
-    for item in datos:
-        tipo_label = obtener_valor(item.get('tipoLabel', {}))
-        if tipo_label:
-            todos_tipos.add(tipo_label)
-    
-    print(f"   Tipos encontrados en el RAW: {sorted(todos_tipos)}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+jerarquia_tipos.py
+-----------------------
+Índice precalculado del cierre transitivo de P279 (subclase de) para filtrar
+por tipo: "¿es X subclase, directa o no, de algún tipo relevante?" en O(1).
+
+Cada clase guarda un bitset con un bit por tipo raíz (fiesta, danza...): el
+bit r está activo si la clase desciende de la raíz r. El cierre se calcula
+una sola vez, a partir de la jerarquía descargada (06_jerarquia_tipos.sparql)
+o de un volcado de pares subclase -> superclase:
+    • aristas P279 invertidas (superclase -> subclase) como matriz dispersa
+    • un recorrido en anchura (scipy, en C) desde cada raíz marca su bit en
+      todas sus subclases: O(k·(n + m)), y los ciclos de Wikidata no lo rompen
+Los bitsets se guardan empaquetados junto a la jerarquía (.subclases.npz);
+al cargarlos cada clase queda como un entero y la consulta es un acceso a
+diccionario y un AND.
+
+Entradas admitidas:
+    .json   resultado WCQS de 06_jerarquia_tipos.sparql (?sub ?super)
+    .tsv    volcado con un par "sub<TAB>super" (QIDs o URIs) por línea
+
+Uso:
+    python jerarquia_tipos.py --descargar                 # consulta Wikidata y construye el índice
+    python jerarquia_tipos.py Q1128269 Q2308530           # ¿son subclases de algún tipo relevante?
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order
+
+JERARQUIA = Path(__file__).resolve().parent / "data" / "06_jerarquia_tipos.json"
+CONSULTA = Path(__file__).resolve().parent / "06_jerarquia_tipos.sparql"
+
+
+def _qid(valor):
+    return valor.rsplit('/', 1)[-1].strip()
+
+
+def leer_jerarquia(ruta):
+    """Pares (subclase, superclase) de un resultado WCQS (.json) o de un volcado .tsv"""
+    ruta = Path(ruta)
+    if ruta.suffix == '.json':
+        with open(ruta, 'r', encoding='utf-8') as f:
+            filas = json.load(f)['results']['bindings']
+        return [(_qid(b['sub']['value']), _qid(b['super']['value'])) for b in filas
+                if 'sub' in b and 'super' in b]
+    pares = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            campos = linea.split('\t')
+            if len(campos) >= 2 and campos[0].strip():
+                pares.append((_qid(campos[0]), _qid(campos[1])))
+    return pares
+
+
+class IndiceSubclases:
+    def __init__(self, clases, raices, bits):
+        self.clases = list(clases)               # índice -> QID
+        self.raices = list(raices)               # bit -> QID raíz
+        self.bits = np.asarray(bits, dtype=np.uint8)   # n x ceil(k/8), empaquetados
+        # QID -> bitset como entero (solo las clases bajo alguna raíz)
+        self.mascaras = {q: int.from_bytes(fila.tobytes(), 'big')
+                         for q, fila in zip(self.clases, self.bits) if fila.any()}
+        self._todas = self.mascara()
+
+    @classmethod
+    def construir(cls, pares, raices):
+        """Cierre transitivo de los pares (sub, super) restringido a las raíces dadas"""
+        raices = list(dict.fromkeys(raices))
+        clases = list(dict.fromkeys([q for par in pares for q in par] + raices))
+        indice = {q: i for i, q in enumerate(clases)}
+        n = len(clases)
+        sub = np.fromiter((indice[s] for s, _ in pares), dtype=np.int64, count=len(pares))
+        sup = np.fromiter((indice[p] for _, p in pares), dtype=np.int64, count=len(pares))
+        # superclase -> subclase: lo alcanzable desde una raíz son sus subclases
+        hacia_sub = sp.csr_matrix((np.ones(len(pares), dtype=np.int8), (sup, sub)), shape=(n, n))
+
+        B = np.zeros((n, len(raices)), dtype=bool)
+        for j, raiz in enumerate(raices):
+            B[breadth_first_order(hacia_sub, indice[raiz], directed=True, return_predecessors=False), j] = True
+        return cls(clases, raices, np.packbits(B, axis=1))
+
+    def mascara(self, raices=None):
+        """Entero con los bits de las raíces pedidas (por defecto, todas)"""
+        raices = self.raices if raices is None else raices
+        k = len(self.raices)
+        relleno = -k % 8                          # packbits rellena con ceros por la derecha
+        return sum(1 << (k - 1 - self.raices.index(r) + relleno) for r in raices)
+
+    def es_subclase(self, qid, mascara=None):
+        """True si qid es (o desciende por P279 de) alguna de las raíces de la máscara"""
+        mascara = self._todas if mascara is None else mascara
+        return self.mascaras.get(qid, 0) & mascara != 0
+
+    def subclases(self, raiz):
+        """QIDs que descienden de raiz (incluida)"""
+        bit = self.mascara([raiz])
+        return [q for q, m in self.mascaras.items() if m & bit]
+
+    def guardar(self, filename):
+        np.savez_compressed(filename, clases=np.array(self.clases, dtype=str),
+                            raices=np.array(self.raices, dtype=str), bits=self.bits)
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        return cls(datos['clases'].tolist(), datos['raices'].tolist(), datos['bits'])
+
+
+def ruta_indice(ruta_jerarquia):
+    """El índice se guarda junto a la jerarquía: 06_jerarquia_tipos.json -> 06_jerarquia_tipos.subclases.npz"""
+    return Path(ruta_jerarquia).with_suffix(".subclases.npz")
+
+
+def descargar_jerarquia(ruta=JERARQUIA):
+    """Ejecuta 06_jerarquia_tipos.sparql en Wikidata y guarda el resultado WCQS"""
+    from SPARQLWrapper import SPARQLWrapper, JSON
+
+    sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
+    sparql.setReturnFormat(JSON)
+    sparql.setTimeout(180)
+    sparql.setQuery(CONSULTA.read_text(encoding='utf-8'))
+    resultados = sparql.query().convert()
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False)
+    return ruta
+
+
+def indice_subclases(raices, ruta_jerarquia=JERARQUIA):
+    """Índice de la jerarquía para esas raíces: lo carga si está al día, si no lo construye y guarda
+
+    El índice guardado solo se reutiliza si tiene exactamente esas raíces: con
+    raíces de más, es_subclase seguiría aceptando subclases de tipos ya quitados.
+    Devuelve None si no hay jerarquía descargada.
+    """
+    ruta_jerarquia = Path(ruta_jerarquia)
+    if not ruta_jerarquia.exists():
+        return None
+    ruta = ruta_indice(ruta_jerarquia)
+    if ruta.exists() and ruta.stat().st_mtime >= ruta_jerarquia.stat().st_mtime:
+        indice = IndiceSubclases.cargar(ruta)
+        if set(raices) == set(indice.raices):
+            return indice
+    indice = IndiceSubclases.construir(leer_jerarquia(ruta_jerarquia), sorted(raices))
+    indice.guardar(ruta)
+    return indice
+
+
+def main():
+    from filtrar_grafo import tipos_relevantes_qids
+
+    ap = argparse.ArgumentParser(description="Índice de cierre P279 (subclase de) de los tipos relevantes")
+    ap.add_argument("qids", nargs="*", help="QIDs de tipos a consultar")
+    ap.add_argument("--jerarquia", default=str(JERARQUIA), help="Resultado WCQS .json o volcado .tsv sub/super")
+    ap.add_argument("--descargar", action="store_true", help="Volver a descargar la jerarquía de Wikidata")
+    args = ap.parse_args()
+
+    if args.descargar:
+        print(f"🌐 Descargando jerarquía P279 -> {descargar_jerarquia(args.jerarquia)}")
+    indice = indice_subclases(tipos_relevantes_qids, args.jerarquia)
+    if indice is None:
+        print(f"❌ No existe {args.jerarquia} (usa --descargar)")
+        return
+    print(f"✅ {len(indice.clases)} clases, {len(indice.mascaras)} bajo {len(indice.raices)} tipos relevantes "
+          f"-> {ruta_indice(args.jerarquia)}")
+    for raiz in indice.raices:
+        print(f"   • {raiz}: {len(indice.subclases(raiz))} subclases")
+    for qid in args.qids:
+        print(f"   {qid}: {'✓ subclase de un tipo relevante' if indice.es_subclase(qid) else '✗ no relevante'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,42 @@
 visualizar_grafo.py
 -----------------------
 Visualiza el grafo (JSON con 'nodes' y 'edges') quedándose por defecto
-con la componente conexa maximal (LCC). Exporta PNG y SVG.
+con la componente conexa maximal (LCC). Exporta PNG y SVG desde un único
+dibujo por lotes (dibujo.py): aristas en una LineCollection, o como imagen
+de densidad en grafos con muchas aristas. Con --teselas exporta además una
+pirámide de teselas 256x256 con un visor HTML (teselas.py) para explorar
+grafos grandes sin una imagen gigante. Con --html exporta un visor WebGL
+interactivo (interactivo.py) con búsqueda, coloreado por dimensión.
 
 Uso:
     python visualizar_grafo_lcc.py --input data/grafo_unificado.json
     # (opcional) cambiar prefijo de salida:
     # python visualizar_grafo_lcc.py -i data/grafo_unificado.json -o data/grafo_unificado_viz
+    # (opcional) pirámide de teselas en data/grafo_unificado_teselas/index.html:
+    # python visualizar_grafo_lcc.py -i data/grafo_unificado.json --teselas
+    # (opcional) visor interactivo en data/grafo_unificado.html:
+    # python visualizar_grafo_lcc.py -i data/grafo_unificado.json --html
 """
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from math import sqrt
 import warnings
 
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+
+# Rutinas de grafo compartidas (grafos_unidos/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "grafos_unidos"))
+from componentes import componente_mayor
+from ranking import top_k_dict
+from disposicion import disposicion, ruta_disposicion
+from dibujo import arrays_dibujo, colocar_etiquetas, dibujar_aristas, dibujar_nodos, guardar_figura
+from teselas import exportar_teselas
+from interactivo import exportar_html
+from grafo_disperso import DIMENSIONES_PROPIEDADES
 
 
 def load_property_graph(json_path: Path) -> nx.MultiDiGraph:
@@ -64,15 +84,11 @@ def to_simple_graph(Gmulti: nx.MultiDiGraph) -> nx.Graph:
 
 
 def largest_connected_component(G: nx.Graph) -> nx.Graph:
-    """Devuelve la componente conexa maximal (tratando el grafo como no dirigido)."""
-    if G.number_of_nodes() == 0:
-        return G
-    H = nx.Graph(G)  # garantizar no dirigido para componentes
-    comps = list(nx.connected_components(H))
-    if not comps:
-        return G
-    giant = max(comps, key=len)
-    return H.subgraph(giant).copy()
+    """Devuelve la componente conexa maximal (tratando el grafo como no dirigido).
+
+    Union-find sobre las aristas; el resultado es una vista de G, sin copias.
+    """
+    return componente_mayor(G)
 
 
 def score_node_size(deg, base=150, scale=55, exp=1.2, min_sz=80, max_sz=1800):
@@ -80,20 +96,25 @@ def score_node_size(deg, base=150, scale=55, exp=1.2, min_sz=80, max_sz=1800):
     return max(min_sz, min(max_sz, int(val)))
 
 
+LABEL_CANDIDATES = 8   # candidatos por etiqueta pedida: los que solapan se saltan
+
+
 def pick_labels(G: nx.Graph, top_k=25, keywords=None):
-    """Etiquetas: top_k por grado + nodos cuyo label coincida con keywords."""
+    """(nodos con keyword, candidatos en orden de prioridad): keywords primero, luego por grado."""
     keywords = keywords or []
     deg = dict(G.degree())
-    top_nodes = {n for n, _ in sorted(deg.items(), key=lambda x: x[1], reverse=True)[:top_k]}
 
-    kw_nodes = set()
+    kw_nodes = []
     if keywords:
         lower_kw = [k.lower() for k in keywords]
         for n, d in G.nodes(data=True):
             label = (d.get("label") or "").lower()
             if any(k in label for k in lower_kw):
-                kw_nodes.add(n)
-    return top_nodes | kw_nodes
+                kw_nodes.append(n)
+    kw_nodes.sort(key=lambda n: -deg[n])
+    kw_set = set(kw_nodes)
+    by_degree = [n for n, _ in top_k_dict(deg, LABEL_CANDIDATES * top_k + len(kw_nodes)) if n not in kw_set]
+    return kw_nodes, kw_nodes + by_degree
 
 
 def truncate(s: str, maxlen=36):
@@ -107,58 +128,87 @@ def draw_graph(G: nx.Graph,
                keywords=None,
                figsize=(14, 10),
                dpi=200,
-               seed=42):
+               seed=42,
+               cache=None):
     if G.number_of_nodes() == 0:
         warnings.warn("Grafo vacío; no se generará imagen.")
         return
 
-    # Layout spring con k ~ 1/sqrt(n) para evitar amontonamiento
-    n = G.number_of_nodes()
-    k = 1.2 / max(1.0, sqrt(n))
-    pos = nx.spring_layout(G, k=k, seed=seed, iterations=200)
+    # Layout ForceAtlas2 (Barnes-Hut multinivel): escala a grafos grandes;
+    # con caché, un grafo ya dibujado reutiliza (o parte de) sus posiciones
+    pos = disposicion(G, semilla=seed, cache=cache)
 
+    nodes, P, src, dst, weights = arrays_dibujo(G, pos)
     deg = dict(G.degree())
-    weights = [G[u][v].get("weight", 1) for u, v in G.edges()]
-    max_w = max(weights) if weights else 1
+    max_w = weights.max() if len(weights) else 1
 
     # Estéticas (sin colores específicos)
-    node_sizes = [score_node_size(deg.get(n, 0)) for n in G.nodes()]
-    edge_widths = [1 + 2.5 * (w / max_w) for w in weights]
-
-    plt.figure(figsize=figsize, dpi=dpi)
-
-    nx.draw_networkx_edges(G, pos, width=edge_widths, alpha=0.35)
-    nx.draw_networkx_nodes(G, pos, node_size=node_sizes, alpha=0.9, linewidths=0.8, edgecolors="black")
-
-    label_nodes = pick_labels(G, top_k=top_labels, keywords=keywords or ["qoyllur", "paucartambo", "carmen"])
-    labels = {}
-    for n, d in G.nodes(data=True):
-        if n in label_nodes:
-            text = d.get("label") or n
-            labels[n] = truncate(text, 34)
-
-    nx.draw_networkx_labels(
-        G, pos, labels=labels,
-        font_size=9,
-        font_weight="regular",
-        verticalalignment="center",
-        horizontalalignment="center",
+    node_sizes = [score_node_size(deg.get(n, 0)) for n in nodes]
+    edge_widths = 1 + 2.5 * (weights / max_w)
+
+    fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
+
+    dibujar_aristas(ax, P, src, dst, anchos=edge_widths, color="black", dpi=dpi, pesos=weights)
+    dibujar_nodos(ax, P, tamanos=node_sizes, colores="#1f78b4")
+
+    # Candidatos por prioridad; se descartan los que taparían una etiqueta ya colocada
+    kw_nodes, candidates = pick_labels(G, top_k=top_labels,
+                                       keywords=keywords or ["qoyllur", "paucartambo", "carmen"])
+    index = {n: i for i, n in enumerate(nodes)}
+    texts = [truncate(G.nodes[n].get("label") or n, 34) for n in nodes]
+    placed = colocar_etiquetas(
+        ax, P, texts, orden=[index[n] for n in candidates], maximo=top_labels + len(kw_nodes),
+        fontsize=9, margen=0.22 * 9 * dpi / 72,
+        fontweight="regular",
         bbox=dict(boxstyle="round,pad=0.22", fc="white", ec="black", alpha=0.65, lw=0.5)
     )
 
-    title = f"Grafo (LCC) • nodos={G.number_of_nodes()} • aristas={G.number_of_edges()} • etiquetas={len(labels)}"
-    plt.title(title, fontsize=12)
-    plt.axis("off")
+    title = f"Grafo (LCC) • nodos={G.number_of_nodes()} • aristas={G.number_of_edges()} • etiquetas={len(placed)}"
+    ax.set_title(title, fontsize=12)
+    ax.set_axis_off()
 
-    png_path = output_prefix.with_suffix(".png")
-    svg_path = output_prefix.with_suffix(".svg")
-    plt.tight_layout(pad=0.5)
-    plt.savefig(png_path, dpi=dpi)
-    plt.savefig(svg_path)
-    plt.close()
+    fig.tight_layout(pad=0.5)
+    png_path, svg_path = guardar_figura(fig, output_prefix, ("png", "svg"), dpi=dpi)
+    plt.close(fig)
     print(f"Visualización exportada:\n  - {png_path}\n  - {svg_path}")
 
 
+def node_dimensions(Gmulti: nx.MultiDiGraph) -> dict:
+    """Dimensión de cada nodo: la más frecuente entre las propiedades de sus aristas (sin 'N/A')."""
+    counts = {}
+    for u, v, d in Gmulti.edges(data=True):
+        dim = DIMENSIONES_PROPIEDADES.get(d.get("property_id"))
+        if dim:
+            for n in (u, v):
+                counts.setdefault(n, {}).setdefault(dim, 0)
+                counts[n][dim] += 1
+    return {n: max(c, key=c.get) for n, c in counts.items()}
+
+
+def export_html(G: nx.Graph, dimensions: dict, out_path: Path, seed=42, cache=None):
+    """Visor HTML/WebGL autocontenido del grafo (mismo layout que draw_graph)."""
+    pos = disposicion(G, semilla=seed, cache=cache)
+    nodes, P, src, dst, _weights = arrays_dibujo(G, pos)
+    deg = np.array([G.degree(n) for n in nodes], dtype=float)
+    exportar_html(out_path, P, src, dst,
+                  etiquetas=[G.nodes[n].get("label") or str(n) for n in nodes],
+                  grupos=[dimensions.get(n, "N/A") for n in nodes],
+                  ids=nodes, tamanos=3 + 2 * np.sqrt(deg), titulo=out_path.stem)
+    print(f"Visor interactivo exportado:\n  - {out_path}")
+
+
+def export_tiles(G: nx.Graph, out_dir: Path, seed=42, cache=None, procesos=None):
+    """Pirámide de teselas + visor index.html del grafo (mismo layout que draw_graph)."""
+    pos = disposicion(G, semilla=seed, cache=cache)
+    nodes, P, src, dst, _weights = arrays_dibujo(G, pos)
+    deg = np.array([G.degree(n) for n in nodes], dtype=float)
+    labels = [truncate(G.nodes[n].get("label") or str(n), 28) for n in nodes]
+    resumen = exportar_teselas(P, src, dst, out_dir, tamanos=6 + 4 * np.sqrt(deg), etiquetas=labels,
+                               prioridad=deg, procesos=procesos, titulo=out_dir.name)
+    total = sum(dibujadas for dibujadas, _ in resumen.values())
+    print(f"Teselas exportadas ({total} en {len(resumen)} niveles):\n  - {out_dir / 'index.html'}")
+
+
 def main():
     ap = argparse.ArgumentParser(description="Visualizador (LCC por defecto) de grafos JSON (nodes/edges).")
     ap.add_argument("--input", "-i", required=True, help="Ruta al JSON (p.ej., data/grafo_unificado.json)")
@@ -167,6 +217,11 @@ def main():
     ap.add_argument("--dpi", type=int, default=220, help="DPI para PNG (default: 220)")
     ap.add_argument("--figw", type=float, default=14.0, help="Ancho figura (pulgadas)")
     ap.add_argument("--figh", type=float, default=10.0, help="Alto figura (pulgadas)")
+    ap.add_argument("--teselas", nargs="?", const="", default=None,
+                    help="Exporta además una pirámide de teselas + visor HTML (default: <input>_teselas/)")
+    ap.add_argument("--procesos", type=int, default=None, help="Procesos para las teselas (default: todos)")
+    ap.add_argument("--html", nargs="?", const="", default=None,
+                    help="Exporta además un visor HTML/WebGL interactivo (default: <input>.html)")
     args = ap.parse_args()
 
     in_path = Path(args.input)
@@ -187,8 +242,17 @@ def main():
         top_labels=args.top_labels,
         figsize=(args.figw, args.figh),
         dpi=args.dpi,
+        cache=ruta_disposicion(in_path),
     )
 
+    if args.teselas is not None:
+        tiles_dir = Path(args.teselas) if args.teselas else in_path.parent / (in_path.stem + "_teselas")
+        export_tiles(G, tiles_dir, cache=ruta_disposicion(in_path), procesos=args.procesos)
+
+    if args.html is not None:
+        html_path = Path(args.html) if args.html else in_path.with_suffix(".html")
+        export_html(G, node_dimensions(Gm), html_path, cache=ruta_disposicion(in_path))
+
 
 if __name__ == "__main__":
     main()
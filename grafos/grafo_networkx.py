@@ -6,11 +6,19 @@ Created on Tue Aug 19 16:31:43 2025
 """
 
 import json
+import sys
 import networkx as nx
 import matplotlib.pyplot as plt
 import pandas as pd
 from pathlib import Path
 
+# Motor disperso compartido (grafos_unidos/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "grafos_unidos"))
+from grafo_disperso import GrafoDisperso
+from comunidades import comunidades_grafo
+from ranking import top_k_dict
+from disposicion import disposicion, ruta_disposicion
+
 # 1. Configuración de paths
 def get_file_paths():
     """Configura los paths relativos para encontrar el JSON"""
@@ -20,8 +28,8 @@ def get_file_paths():
     return json_path
 
 # 2. Cargar y parsear el JSON
-def load_json_data():
-    file_path = get_file_paths()
+def load_json_data(file_path=None):
+    file_path = Path(file_path) if file_path else get_file_paths()
     
     if not file_path.exists():
         print(f"ERROR: No se encontró el archivo en: {file_path}")
@@ -85,7 +93,7 @@ def visualize_and_save_graph(G):
         plt.figure(figsize=(16, 14))
         
         # Layout para mejor visualización
-        pos = nx.kamada_kawai_layout(G)
+        pos = disposicion(G, cache=ruta_disposicion(get_file_paths()))
         
         # Colores por tipo de nodo
         node_colors = []
@@ -134,6 +142,8 @@ def export_analysis_to_csv(G, metrics, filename="analisis_grafo.csv"):
         })
     
     df_nodes = pd.DataFrame(nodes_data)
+    # Comunidades por modularidad (independientes de la dimensión asignada a mano)
+    df_nodes['comunidad'] = df_nodes['nodo'].map(comunidades_grafo(GrafoDisperso.desde_networkx(G)))
     df_nodes.to_csv(filename, index=False, encoding='utf-8')
     print(f"✓ Resultados exportados a: {filename}")
 
@@ -147,14 +157,14 @@ def analyze_graph(G, metrics):
     
     print("\n=== TOP 10 NODOS MÁS CONECTADOS ===")
     degree_centrality = metrics['degree_centrality']
-    top_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_nodes = top_k_dict(degree_centrality, 10)
     for i, (node, centrality) in enumerate(top_nodes, 1):
         node_type = G.nodes[node].get('type', 'N/A')
         print(f"{i:2d}. {node}: {centrality:.4f} ({node_type})")
     
     print("\n=== TOP 10 NODOS CON MAYOR INTERMEDIACIÓN ===")
     betweenness = metrics['betweenness_centrality']
-    top_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_betweenness = top_k_dict(betweenness, 10)
     for i, (node, betweenness_val) in enumerate(top_betweenness, 1):
         node_type = G.nodes[node].get('type', 'N/A')
         print(f"{i:2d}. {node}: {betweenness_val:.4f} ({node_type})")
@@ -11,20 +11,52 @@ Ejecuta: Lee CSV → Genera consultas ESPECÍFICAS → Ejecuta → Actualiza gra
 """
 
 import pandas as pd
+import numpy as np
 import json
 import os
 import sys
+import time
+import pickle
+import argparse
+import tempfile
 from SPARQLWrapper import SPARQLWrapper, JSON
 import networkx as nx
 import matplotlib.pyplot as plt
 from datetime import datetime
 
+# Motor disperso compartido (grafos_unidos/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "grafos_unidos"))
+from grafo_disperso import GrafoDisperso
+from centralidad import pagerank_personalizado
+from metricas_incrementales import MetricasIncrementales, huella_archivo, ruta_metricas
+from ranking import top_k
+from disposicion import disposicion, ruta_disposicion
+from grafo_networkx import get_file_paths, load_json_data, create_graph_from_results
+
 # Configuración
 CSV_ANALISIS = "analisis_grafo.csv"
 CARPETA_CONSULTAS = "consultas_profundizacion_mejoradas"
 CARPETA_RESULTADOS = "resultados_profundizacion_mejoradas"
 ENDPOINT_URL = "https://query.wikidata.org/sparql"
 
+# Ranking de candidatos: PageRank personalizado desde las festividades semilla
+GRAFO_SEMILLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "grafos_unidos", "grafo_combinado.pkl")
+SEMILLAS = ["Q2408955", "Q60643381"]  # Qoyllur Rit'i, Celebración a la Virgen
+PRESUPUESTO_NODOS = 60        # máximo de nodos a profundizar
+PRESUPUESTO_CONSULTAS = 8     # máximo de consultas SPARQL (una por dimensión)
+NODOS_POR_CONSULTA = 15       # límite de nodos en el VALUES de cada consulta
+NODOS_INTERMEDIACION = 5000   # por encima la intermediación se estima con una muestra de pivotes
+
+# Tipos de columnas del CSV de análisis (se carga una sola vez)
+TIPOS_ANALISIS = {
+    'nodo': str,
+    'tipo': 'category',
+    'dimension': 'category',
+    'grado_centralidad': 'float64',
+    'intermediacion': 'float64',
+    'comunidad': 'Int64',
+}
+
 def configurar_sparql():
     """Configura el cliente SPARQL con timeout"""
     user_agent = f"QoyllurRiti-Profundizacion/2.0 Python/{sys.version_info[0]}.{sys.version_info[1]}"
@@ -33,42 +65,87 @@ def configurar_sparql():
     sparql.setTimeout(300)  # 5 minutos timeout
     return sparql
 
-def cargar_analisis_previo():
-    """Carga y analiza el CSV existente"""
+def cargar_analisis_previo(ruta=CSV_ANALISIS):
+    """Carga y analiza el CSV existente (columnas tipadas, tipo/dimension categóricas)"""
     print("📊 Cargando análisis previo...")
-    df = pd.read_csv(CSV_ANALISIS)
+    df = pd.read_csv(ruta, dtype=TIPOS_ANALISIS)
     
     # Estadísticas básicas
+    conteo_tipos = df['tipo'].value_counts()
     print(f"   • Total nodos: {len(df)}")
     print(f"   • Dimensiones encontradas: {df['dimension'].nunique()}")
-    print(f"   • Nodos centrales: {len(df[df['tipo'] == 'central'])}")
-    print(f"   • Nodos intermedios: {len(df[df['tipo'] == 'intermediate'])}")
+    print(f"   • Nodos centrales: {conteo_tipos.get('central', 0)}")
+    print(f"   • Nodos intermedios: {conteo_tipos.get('intermediate', 0)}")
     
     return df
 
-def identificar_nodos_para_profundizar(df):
-    """Identifica nodos específicos que merecen profundización"""
-    print("\n🔍 Identificando nodos relevantes para profundización...")
+def cargar_grafo_semillas():
+    """Carga el grafo combinado en forma dispersa (None si no está disponible)"""
+    try:
+        with open(GRAFO_SEMILLAS, 'rb') as f:
+            return GrafoDisperso.desde_networkx(pickle.load(f))
+    except Exception as e:
+        print(f"   ⚠️  No se pudo cargar el grafo de semillas ({e}); se usará grado_centralidad")
+        return None
+
+def puntuar_candidatos(df, gd=None):
+    """Máscara de candidatos consultables y su PageRank personalizado desde las semillas"""
+    dimension = df['dimension'].astype('category')
+    consultables = [d for d in dimension.cat.categories if obtener_propiedades_por_dimension(d)]
+    validos = (dimension.isin(consultables) & ~df['nodo'].isin(SEMILLAS)).to_numpy()
+    
+    if gd is None:
+        return validos, np.zeros(len(df))
+    ppr = pagerank_personalizado(gd, SEMILLAS)
+    return validos, df['nodo'].map(ppr).fillna(0.0).to_numpy()
+
+def seleccionar_candidatos(df, validos, ppr, presupuesto_nodos=PRESUPUESTO_NODOS,
+                           presupuesto_consultas=PRESUPUESTO_CONSULTAS):
+    """Top-k por dimensión (argpartition) y recorte por presupuesto, sin ordenar todo el CSV.
+    
+    Equivale a recorrer el ranking global (ppr, grado) en orden: cada dimensión
+    abre una consulta en el orden de su mejor candidato y aporta como mucho
+    NODOS_POR_CONSULTA nodos, hasta agotar presupuesto_nodos.
+    """
+    codigos = df['dimension'].astype('category').cat.codes.to_numpy()
+    grado = df['grado_centralidad'].to_numpy(dtype=np.float64)
+    
+    # Agrupar índices válidos por dimensión con un único argsort estable de los códigos
+    idx_validos = np.flatnonzero(validos)
+    orden = idx_validos[np.argsort(codigos[idx_validos], kind='stable')]
+    cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+    
+    por_dimension = []
+    for idx in np.split(orden, cortes):
+        if len(idx):
+            por_dimension.append(idx[top_k(ppr[idx], NODOS_POR_CONSULTA, grado[idx])])
+    
+    # Cada dimensión abre una consulta en el orden de su mejor candidato
+    por_dimension.sort(key=lambda top: (ppr[top[0]], grado[top[0]]), reverse=True)
+    if not por_dimension:
+        return df.iloc[[]]
+    elegidos = np.concatenate(por_dimension[:presupuesto_consultas])
+    elegidos = elegidos[top_k(ppr[elegidos], presupuesto_nodos, grado[elegidos])]
+    
+    seleccion = df.iloc[elegidos].copy()
+    seleccion['ppr'] = ppr[elegidos]
+    return seleccion
+
+def identificar_nodos_para_profundizar(df, presupuesto_nodos=PRESUPUESTO_NODOS,
+                                       presupuesto_consultas=PRESUPUESTO_CONSULTAS):
+    """Consume el ranking de candidatos en orden hasta agotar el presupuesto de nodos o consultas"""
+    print("\n🔍 Identificando nodos relevantes para profundización (PageRank personalizado)...")
     
-    nodos_relevantes = []
+    validos, ppr = puntuar_candidatos(df, cargar_grafo_semillas())
+    seleccion = seleccionar_candidatos(df, validos, ppr, presupuesto_nodos, presupuesto_consultas)
     
-    # Criterios para seleccionar nodos
-    for _, row in df.iterrows():
-        # Nodos con alta centralidad y dimensión definida
-        if (row['grado_centralidad'] > 0.01 and 
-            row['dimension'] != 'N/A' and 
-            pd.notna(row['dimension'])):
-            
-            nodos_relevantes.append((row['nodo'], row['dimension']))
-            print(f"   • {row['nodo']} ({row['dimension']}): centralidad {row['grado_centralidad']:.4f}")
+    nodos_relevantes = list(zip(seleccion['nodo'], seleccion['dimension'].astype(str)))
+    for (nodo, dimension), valor in zip(nodos_relevantes, seleccion['ppr']):
+        print(f"   • {nodo} ({dimension}): ppr {valor:.5f}")
     
-    # También incluir algunos nodos intermedios importantes
-    for _, row in df[df['tipo'] == 'intermediate'].iterrows():
-        if row['grado_centralidad'] > 0.05:
-            nodos_relevantes.append((row['nodo'], row['dimension']))
-            print(f"   • {row['nodo']} ({row['dimension']}): INTERMEDIO centralidad {row['grado_centralidad']:.4f}")
-    
-    print(f"\n🎯 Total nodos seleccionados para profundización: {len(nodos_relevantes)}")
+    print(f"\n🎯 Total nodos seleccionados para profundización: {len(nodos_relevantes)}"
+          f" (presupuesto {presupuesto_nodos} nodos / {presupuesto_consultas} consultas,"
+          f" consultas usadas: {seleccion['dimension'].nunique()})")
     return nodos_relevantes
 
 def obtener_propiedades_por_dimension(dimension):
@@ -105,8 +182,8 @@ def generar_consultas_profundizacion(dimensiones, nodos_relevantes):
             print(f"   ⚠️  No hay nodos relevantes para dimensión: {dimension}")
             continue
         
-        # Limitar a 15 nodos por consulta para no sobrecargar
-        nodos_str = " ".join([f"wd:{nodo}" for nodo in nodos_filtro[:15]])
+        # Limitar nodos por consulta para no sobrecargar
+        nodos_str = " ".join([f"wd:{nodo}" for nodo in nodos_filtro[:NODOS_POR_CONSULTA]])
         
         consulta = f"""
 # Profundización ESPECÍFICA de dimensión {dimension}
@@ -218,48 +295,140 @@ def ejecutar_consultas(consultas):
     
     return resultados_totales
 
-def actualizar_grafo(resultados):
-    """Actualiza el grafo existente con los nuevos datos - EVITANDO DUPLICADOS"""
-    print("\n🔄 Actualizando grafo con nuevos datos (sin duplicados)...")
-    
-    # Cargar grafo existente
-    df_original = pd.read_csv(CSV_ANALISIS)
-    nodos_existentes = set(df_original['nodo'].tolist())
-    
+def cargar_metricas_base(df_original, ruta_base=None):
+    """Métricas incrementales del grafo base (None si no se puede)
+
+    Si junto al JSON base hay un estado guardado (.metricas.npz) con la misma
+    huella, se carga tal cual: ya contiene las aristas de profundizaciones
+    anteriores y su PageRank, que sirve de arranque en caliente. Si no, se
+    reconstruye desde el JSON (con la columna 'pagerank' del CSV si la hay).
+    """
+    ruta_base = ruta_base or get_file_paths()
+    if not os.path.exists(ruta_base):
+        print(f"   ⚠️  No se encontró el grafo base: {ruta_base}")
+        return None
+    huella = huella_archivo(ruta_base)
+    
+    ruta_estado = ruta_metricas(ruta_base)
+    if os.path.exists(ruta_estado):
+        metricas = MetricasIncrementales.cargar(ruta_estado)
+        if metricas.huella == huella:
+            print(f"   • Estado previo cargado de {ruta_estado} (PageRank en caliente)")
+            return metricas
+    
+    resultados_base = load_json_data(ruta_base)
+    if resultados_base is None:
+        return None
+    pagerank_previo = None
+    if 'pagerank' in df_original.columns:
+        previo = df_original.dropna(subset=['pagerank'])
+        pagerank_previo = dict(zip(previo['nodo'], previo['pagerank']))
+    
+    metricas = MetricasIncrementales.desde_networkx(create_graph_from_results(resultados_base), pagerank_previo)
+    metricas.huella = huella
+    return metricas
+
+def intermediacion(metricas):
+    """Intermediación (como nx.betweenness_centrality) del grafo actual
+
+    Exacta hasta NODOS_INTERMEDIACION nodos; por encima se estima desde
+    NODOS_INTERMEDIACION pivotes al azar (k=, semilla fija), nunca NaN.
+    """
+    origen, destino = metricas.aristas()
+    G = nx.DiGraph()
+    G.add_nodes_from(metricas.nodos)
+    G.add_edges_from(zip((metricas.nodos[i] for i in origen), (metricas.nodos[j] for j in destino)))
+    muestra = NODOS_INTERMEDIACION if metricas.n > NODOS_INTERMEDIACION else None
+    return pd.Series(nx.betweenness_centrality(G, k=muestra, seed=42))
+
+def aplicar_metricas(df, metricas):
+    """Escribe grado_centralidad, intermediacion y pagerank del grafo actualizado en el DataFrame
+
+    Las aristas nuevas cambian los caminos mínimos de todo el grafo, así que la
+    intermediación se recalcula entera (estimada en grafos grandes, ver intermediacion).
+    """
+    centralidad = pd.Series(metricas.centralidad_grado(), index=metricas.nodos)
+    pagerank = pd.Series(metricas.pagerank(), index=metricas.nodos)
+    
+    df['grado_centralidad'] = df['nodo'].map(centralidad)
+    df['pagerank'] = df['nodo'].map(pagerank)
+    df['intermediacion'] = df['nodo'].map(intermediacion(metricas))
+    return df
+
+def resultados_a_dataframe(resultados):
+    """Resultados de las consultas -> DataFrame (origen, destino, dimension) con QIDs cortos"""
+    df = pd.DataFrame(resultados, columns=['nodoOrigen', 'nodoDestino', 'dimension'])
+    return pd.DataFrame({
+        'origen': df['nodoOrigen'].str.rsplit('/', n=1).str[-1],
+        'destino': df['nodoDestino'].str.rsplit('/', n=1).str[-1],
+        'dimension': df['dimension'],
+    })
+
+def filtrar_nodos_nuevos(aristas, nodos_existentes):
+    """Destinos nuevos y no genéricos (sin duplicados) como filas del CSV de análisis"""
     # Nodos genéricos a excluir
-    nodos_excluidos = {'Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q15', 'Q16', 'Q17', 'Q18', 'Q20', 'Q30'}
+    nodos_excluidos = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5', 'Q15', 'Q16', 'Q17', 'Q18', 'Q20', 'Q30']
+    
+    destino = aristas['destino']
+    validos = (~destino.isin(nodos_existentes) &
+               ~destino.isin(nodos_excluidos) &
+               (destino.str.len() > 3) &  # IDs muy cortos suelen ser genéricos
+               ~destino.str.startswith(('Q0', 'Q1', 'Q2', 'Q3')))
+    
+    nuevos = aristas.loc[validos, ['origen', 'destino', 'dimension']].drop_duplicates('destino')
+    return pd.DataFrame({
+        'nodo': nuevos['destino'].to_numpy(),
+        'origen': nuevos['origen'].to_numpy(),  # Primer nodo que lo enlaza
+        'tipo': 'enriquecido',
+        'dimension': nuevos['dimension'].to_numpy(),
+    })
+
+def actualizar_grafo(resultados, df_original, ruta_base=None):
+    """Actualiza el grafo existente (ya cargado) con los nuevos datos - EVITANDO DUPLICADOS
+
+    ruta_base: JSON del grafo base (por defecto el de grafo_networkx); junto a
+    él se guarda el estado de las métricas para la siguiente ejecución.
+    Las métricas se actualizan aunque no haya nodos nuevos (aristas entre nodos
+    existentes). Si no hay grafo base, grado_centralidad de los nodos tocados e
+    intermediacion quedan NaN en el CSV (ranking.top_k los deja al final).
+    """
+    print("\n🔄 Actualizando grafo con nuevos datos (sin duplicados)...")
     
-    # Crear DataFrame con nuevos resultados
-    nuevos_datos = []
-    nodos_agregados = set()
+    aristas = resultados_a_dataframe(resultados)
+    df_nuevo = filtrar_nodos_nuevos(aristas, df_original['nodo'])
     
-    for resultado in resultados:
-        nodo_destino = resultado['nodoDestino'].split('/')[-1]
-        
-        # Filtrar nodos no deseados
-        if (nodo_destino not in nodos_existentes and 
-            nodo_destino not in nodos_agregados and
-            nodo_destino not in nodos_excluidos and
-            len(nodo_destino) > 3 and  # IDs muy cortos suelen ser genéricos
-            not nodo_destino.startswith(('Q0', 'Q1', 'Q2', 'Q3'))):
-            
-            nuevos_datos.append({
-                'nodo': nodo_destino,
-                'tipo': 'enriquecido',
-                'dimension': resultado['dimension'],
-                'grado_centralidad': 0.002,  # Valor más realista
-                'intermediacion': 0.0
-            })
-            nodos_agregados.add(nodo_destino)
-    
-    if not nuevos_datos:
+    if df_nuevo.empty:
+        # Sin filas nuevas, pero las aristas entre nodos existentes sí cambian las métricas
         print("   ⚠️  No se encontraron nuevos nodos válidos para agregar")
-        return df_original
-    
-    df_nuevo = pd.DataFrame(nuevos_datos)
-    
-    # Combinar con datos originales
-    df_completo = pd.concat([df_original, df_nuevo], ignore_index=True)
+        df_completo = df_original.copy()
+    else:
+        # Combinar con datos originales (las categorías se recalculan tras concatenar)
+        df_completo = pd.concat([df_original, df_nuevo], ignore_index=True)
+        df_completo[['tipo', 'dimension']] = df_completo[['tipo', 'dimension']].astype('category')
+    
+    # Los nodos nuevos son hojas: heredan la comunidad del primer nodo que los enlaza
+    if 'comunidad' in df_original.columns and not df_nuevo.empty:
+        comunidad = pd.Series(df_original['comunidad'].to_numpy(), index=df_original['nodo'])
+        origen = aristas.drop_duplicates('destino').set_index('destino')['origen']
+        nuevos = df_completo['comunidad'].isna()
+        df_completo.loc[nuevos, 'comunidad'] = df_completo.loc[nuevos, 'nodo'].map(origen).map(comunidad)
+    
+    # Métricas sin reconstruir el grafo: solo se agregan las aristas que el estado
+    # guardado aún no tiene (grado exacto en los nodos tocados, PageRank en caliente)
+    metricas = cargar_metricas_base(df_original, ruta_base)
+    if metricas is not None:
+        en_grafo = aristas['destino'].isin(df_completo['nodo'])
+        aristas_nuevas = zip(aristas.loc[en_grafo, 'origen'], aristas.loc[en_grafo, 'destino'])
+        nodos_tocados = metricas.agregar_aristas(aristas_nuevas)
+        df_completo = aplicar_metricas(df_completo, metricas)
+        metricas.guardar(ruta_metricas(ruta_base or get_file_paths()))
+        print(f"   • Métricas actualizadas incrementalmente ({len(nodos_tocados)} nodos con grado modificado)")
+    else:
+        # Sin grafo base no se conocen las métricas nuevas: quedan NaN, no valores inventados
+        tocados = df_completo['nodo'].isin(aristas['origen'])
+        df_completo.loc[tocados, 'grado_centralidad'] = np.nan
+        df_completo['intermediacion'] = np.nan
+        print("   ⚠️  Sin grafo base: métricas de los nodos nuevos/tocados e intermediación quedan NaN")
     
     # Guardar CSV actualizado
     df_completo.to_csv("analisis_grafo_mejorado.csv", index=False, encoding='utf-8')
@@ -270,7 +439,8 @@ def actualizar_grafo(resultados):
     print(f"   • Nodos totales: {len(df_completo)}")
     
     # Mostrar algunos nodos nuevos como ejemplo
-    print(f"   • Ejemplo nodos nuevos: {list(nodos_agregados)[:5]}")
+    if not df_nuevo.empty:
+        print(f"   • Ejemplo nodos nuevos: {df_nuevo['nodo'].head(5).tolist()}")
     
     return df_completo
 
@@ -278,53 +448,37 @@ def visualizar_grafo_actualizado(df):
     """Crea visualización del grafo actualizado MEJORADA"""
     print("\n🎨 Creando visualización MEJORADA del grafo actualizado...")
     
+    df = df.drop_duplicates('nodo')
     G = nx.DiGraph()
-    
-    # Añadir nodos con atributos
-    for _, row in df.iterrows():
-        G.add_node(row['nodo'], 
-                  tipo=row['tipo'], 
-                  dimension=row['dimension'],
-                  centralidad=row['grado_centralidad'])
+    G.add_nodes_from(df['nodo'])
+    if 'origen' in df.columns:
+        enlazados = df.dropna(subset=['origen'])
+        enlazados = enlazados[enlazados['origen'].isin(df['nodo'])]
+        G.add_edges_from(zip(enlazados['origen'], enlazados['nodo']))
     
     # Visualización mejorada
     plt.figure(figsize=(16, 12))
     
-    # Usar layout de resorte con parámetros optimizados
-    pos = nx.spring_layout(G, k=1, iterations=50, seed=42)
-    
-    # Colores y tamaños por tipo
-    node_colors = []
-    node_sizes = []
-    
-    for node in G.nodes():
-        node_data = G.nodes[node]
-        if node_data.get('tipo') == 'central':
-            node_colors.append('red')
-            node_sizes.append(200)
-        elif node_data.get('tipo') == 'intermediate':
-            node_colors.append('blue')
-            node_sizes.append(100)
-        elif node_data.get('tipo') == 'enriquecido':
-            node_colors.append('orange')
-            node_sizes.append(50)
-        else:  # target
-            node_colors.append('lightgreen')
-            node_sizes.append(30)
+    # ForceAtlas2 con caché: los nodos ya dibujados conservan su posición y
+    # solo los enriquecidos se colocan junto a su origen
+    pos = disposicion(G, semilla=42, cache=ruta_disposicion("analisis_grafo_mejorado.csv"))
+    
+    # Colores y tamaños por tipo (mismo orden que los nodos del grafo); el resto son targets
+    tipo = df['tipo'].astype(str)
+    node_colors = tipo.map({'central': 'red', 'intermediate': 'blue', 'enriquecido': 'orange'}).fillna('lightgreen')
+    node_sizes = tipo.map({'central': 200, 'intermediate': 100, 'enriquecido': 50}).fillna(30)
     
     nx.draw(G, pos, 
-            node_color=node_colors, 
-            node_size=node_sizes, 
+            node_color=node_colors.tolist(), 
+            node_size=node_sizes.tolist(), 
             with_labels=False, 
             alpha=0.7,
             edge_color='gray',
             width=0.5)
     
     # Añadir labels para nodos importantes
-    labels = {}
-    for node in G.nodes():
-        if G.nodes[node].get('centralidad', 0) > 0.01:
-            labels[node] = node
+    importantes = df.loc[df['grado_centralidad'] > 0.01, 'nodo']
+    labels = dict(zip(importantes, importantes))
     
     nx.draw_networkx_labels(G, pos, labels, font_size=8)
     
@@ -335,6 +489,51 @@ def visualizar_grafo_actualizado(df):
     
     print("✅ Visualización MEJORADA guardada como: grafo_actualizado_mejorado.png")
 
+def benchmark_seleccion(filas=1_000_000, aristas_nuevas=10_000, semilla=42):
+    """Mide carga tipada, selección top-k y filtrado de nodos nuevos sobre un CSV sintético"""
+    rng = np.random.default_rng(semilla)
+    dimensiones = ["Cultural", "Religioso", "Patrimonio", "Temporal", "Digital",
+                   "Social", "Geográfica", "Identidad", "N/A"]
+    tipos = ["central", "intermediate", "target"]
+    df_sintetico = pd.DataFrame({
+        'nodo': 'Q' + pd.Series(np.arange(filas) + 10_000_000).astype(str),
+        'tipo': np.array(tipos)[rng.integers(0, len(tipos), filas)],
+        'dimension': np.array(dimensiones)[rng.integers(0, len(dimensiones), filas)],
+        'grado_centralidad': rng.random(filas) * 0.01,
+        'intermediacion': rng.random(filas) * 0.001,
+    })
+    resultados = [{
+        'nodoOrigen': f"http://www.wikidata.org/entity/Q{10_000_000 + o}",
+        'nodoDestino': f"http://www.wikidata.org/entity/Q{90_000_000 + d}",
+        'dimension': dimensiones[d % 8],
+    } for o, d in zip(rng.integers(0, filas, aristas_nuevas), rng.integers(0, aristas_nuevas, aristas_nuevas))]
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "analisis_sintetico.csv")
+        df_sintetico.to_csv(ruta, index=False)
+        print(f"📐 CSV sintético: {filas} filas ({os.path.getsize(ruta) / 1e6:.1f} MB)")
+        
+        tiempos = {}
+        inicio = time.perf_counter()
+        df = cargar_analisis_previo(ruta)
+        tiempos['carga tipada'] = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    validos, _ = puntuar_candidatos(df)
+    ppr = rng.random(len(df))  # sustituto del PageRank personalizado
+    seleccion = seleccionar_candidatos(df, validos, ppr)
+    tiempos['selección top-k'] = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    aristas = resultados_a_dataframe(resultados)
+    df_nuevo = filtrar_nodos_nuevos(aristas, df['nodo'])
+    df_completo = pd.concat([df, df_nuevo], ignore_index=True)
+    tiempos['filtrado de nuevos'] = time.perf_counter() - inicio
+    
+    print(f"\n⏱️  {len(seleccion)} nodos seleccionados, {len(df_nuevo)} nodos nuevos, {len(df_completo)} filas finales")
+    for etapa, segundos in tiempos.items():
+        print(f"   • {etapa}: {segundos:.3f}s")
+
 def main():
     print("🎯 INICIANDO PROFUNDIZACIÓN AUTOMÁTICA MEJORADA")
     print("=" * 60)
@@ -368,8 +567,8 @@ def main():
             print("⚠️ No se obtuvieron resultados de las consultas")
             return
         
-        # Paso 6: Actualizar grafo SIN DUPLICADOS
-        df_actualizado = actualizar_grafo(resultados)
+        # Paso 6: Actualizar grafo SIN DUPLICADOS (reutiliza el CSV ya cargado)
+        df_actualizado = actualizar_grafo(resultados, df)
         
         # Paso 7: Visualizar
         visualizar_grafo_actualizado(df_actualizado)
@@ -393,4 +592,12 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    ap = argparse.ArgumentParser(description="Profundización automática del grafo de Qoyllur Rit'i")
+    ap.add_argument("--benchmark", action="store_true", help="Mide la selección sobre un CSV sintético")
+    ap.add_argument("--filas", type=int, default=1_000_000, help="Filas del CSV sintético (default: 1M)")
+    args = ap.parse_args()
+    
+    if args.benchmark:
+        benchmark_seleccion(args.filas)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+analisis_por_dimension.py - Analítica por dimensión en paralelo sobre memoria compartida
+
+estadisticas_por_dimension.csv promedia métricas calculadas sobre el grafo
+entero. Aquí el grafo se parte en subgrafos inducidos por las aristas de cada
+dimensión (Geográfica, Religioso, Patrimonio, ...) y cada fragmento recibe su
+propio análisis completo (densidad, componentes, diámetro/radio, grados,
+PageRank, eigenvector, Katz, triángulos y clustering) en un proceso aparte.
+Los arrays de aristas se publican una sola vez en memoria compartida; cada
+trabajador solo recibe el nombre del bloque, el código de su dimensión y el nº
+de nodos (el fragmento 'global' conserva también los nodos aislados).
+
+Uso:
+    python analisis_por_dimension.py                           # grafo_combinado.pkl
+    python analisis_por_dimension.py --grafo grafo_Q2408955.pkl --procesos 4
+
+Genera:
+    reportes_dimension/<dimension>.csv    métricas por nodo de cada fragmento
+    resumen_por_dimension.csv             una fila por fragmento + 'global'
+    metricas_por_dimension.csv            todas las filas por nodo, con su dimensión
+"""
+
+import argparse
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grafo_disperso import GrafoDisperso
+from centralidad import calcular_centralidades
+from componentes import componentes_grafo, indices_componente_mayor
+from excentricidad import diametro_radio_componente
+from motivos import EstructuraLocal
+
+GLOBAL = 'global'
+CARPETA_REPORTES = "reportes_dimension"
+
+
+def _publicar(arrays):
+    """Copia cada array a un bloque de memoria compartida; devuelve (bloques, descriptores)"""
+    bloques, descriptores = [], {}
+    for nombre, array in arrays.items():
+        bloque = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=bloque.buf)[:] = array
+        bloques.append(bloque)
+        descriptores[nombre] = (bloque.name, array.shape, array.dtype.str)
+    return bloques, descriptores
+
+
+def _adjuntar(descriptores):
+    """Vistas numpy de los bloques publicados (el proceso padre es quien los libera)"""
+    bloques, arrays = [], {}
+    for nombre, (bloque_nombre, forma, tipo) in descriptores.items():
+        bloque = shared_memory.SharedMemory(name=bloque_nombre)
+        bloques.append(bloque)
+        arrays[nombre] = np.ndarray(forma, dtype=np.dtype(tipo), buffer=bloque.buf)
+    return bloques, arrays
+
+
+def analizar_fragmento(gd, diametro=True):
+    """(resumen, métricas por nodo) de un GrafoDisperso
+
+    diametro: diámetro/radio exactos de la componente principal (iFUB); en
+    grafos aleatorios grandes puede requerir cientos de BFS.
+    """
+    n, m = gd.n, gd.m
+    etiquetas = componentes_grafo(gd)
+    tamanos = np.bincount(etiquetas) if n else np.zeros(0, dtype=np.int64)
+    diam = radio = None
+    if diametro and n:
+        idx = indices_componente_mayor(etiquetas)
+        diam, radio, _ = diametro_radio_componente(gd.adyacencia(no_dirigida=True)[idx][:, idx])
+    estructura = EstructuraLocal(gd)
+
+    # En fragmentos casi acíclicos eigenvector/Katz pueden no converger: se informa en el resumen
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter('always')
+        por_nodo = calcular_centralidades(gd)
+    por_nodo['grado_centralidad'] = (por_nodo['grado_entrada'] + por_nodo['grado_salida']) / max(n - 1, 1)
+    por_nodo['componente'] = etiquetas
+    por_nodo['triangulos'] = estructura.triangulos_por_nodo()
+    por_nodo['clustering'] = estructura.clustering()
+
+    resumen = {
+        'nodos': n,
+        'aristas': m,
+        'densidad': m / (n * (n - 1)) if n > 1 else 0.0,
+        'grado_medio': 2 * m / n if n else 0.0,
+        'componentes': len(tamanos),
+        'componente_principal': int(tamanos.max()) if n else 0,
+        'diametro_principal': diam,
+        'radio_principal': radio,
+        'triangulos': len(estructura.triangulos()),
+        'transitividad': float(estructura.transitividad()),
+        'clustering_medio': float(por_nodo['clustering'].mean()) if n else 0.0,
+        'pagerank_max': float(por_nodo['pagerank'].max()) if n else 0.0,
+        'avisos': '; '.join(str(a.message) for a in avisos),
+    }
+    return resumen, por_nodo
+
+
+def _analizar_dimension(descriptores, codigo, n, diametro=True):
+    """Trabajador: subgrafo inducido por las aristas de la dimensión `codigo` (None = el grafo de n nodos)"""
+    bloques, arrays = _adjuntar(descriptores)
+    try:
+        origen, destino = arrays['origen'], arrays['destino']
+        if codigo is None:
+            # Global: todos los nodos del grafo, también los aislados
+            gd = GrafoDisperso(np.arange(n), origen, destino)
+        else:
+            seleccion = arrays['dimension_arista'] == codigo
+            origen, destino = origen[seleccion], destino[seleccion]
+            # Nodos del fragmento = extremos de sus aristas (índices globales)
+            nodos, locales = np.unique(np.concatenate([origen, destino]), return_inverse=True)
+            gd = GrafoDisperso(nodos, locales[:len(origen)], locales[len(origen):])
+        return analizar_fragmento(gd, diametro)
+    finally:
+        for bloque in bloques:
+            bloque.close()
+
+
+def analizar_por_dimension(gd, procesos=None, diametro=True):
+    """Dict dimensión -> (resumen, métricas por nodo con índice = QID), más la entrada 'global'"""
+    codigos = np.unique(gd.dimension_arista).tolist()
+    nombres = [gd.dimensiones[c] for c in codigos] + [GLOBAL]
+    trabajos = codigos + [None]
+
+    bloques, descriptores = _publicar({'origen': gd.origen, 'destino': gd.destino,
+                                       'dimension_arista': gd.dimension_arista})
+    try:
+        procesos = min(procesos or os.cpu_count() or 1, len(trabajos))
+        with ProcessPoolExecutor(procesos) as ejecutor:
+            resultados = list(ejecutor.map(_analizar_dimension, [descriptores] * len(trabajos), trabajos,
+                                           [gd.n] * len(trabajos), [diametro] * len(trabajos)))
+    finally:
+        for bloque in bloques:
+            bloque.close()
+            bloque.unlink()
+
+    informes = {}
+    for nombre, (resumen, por_nodo) in zip(nombres, resultados):
+        por_nodo.index = pd.Index([gd.nodos[i] for i in por_nodo.index], name='nodo_id')
+        informes[nombre] = (resumen, por_nodo)
+    return informes
+
+
+def exportar_informes(informes, etiquetas=None, carpeta=CARPETA_REPORTES):
+    """Un CSV por fragmento + resumen y métricas fusionadas"""
+    Path(carpeta).mkdir(exist_ok=True)
+    etiquetas = etiquetas or {}
+    fusion = []
+    for nombre, (_, por_nodo) in informes.items():
+        por_nodo = por_nodo.sort_values('pagerank', ascending=False)
+        por_nodo.insert(0, 'nombre_nodo', [etiquetas.get(q) or q for q in por_nodo.index])
+        archivo = Path(carpeta) / f"{nombre.replace('/', '_')}.csv"
+        por_nodo.to_csv(archivo, encoding='utf-8')
+        fusion.append(por_nodo.reset_index().assign(dimension=nombre))
+
+    resumen = pd.DataFrame({nombre: r for nombre, (r, _) in informes.items()}).T
+    resumen.index.name = 'dimension'
+    resumen.to_csv("resumen_por_dimension.csv", encoding='utf-8')
+    pd.concat(fusion, ignore_index=True).to_csv("metricas_por_dimension.csv", index=False, encoding='utf-8')
+    return resumen
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Métricas completas por dimensión, un proceso por fragmento")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (default: todos)")
+    ap.add_argument("--sin-diametro", action="store_true", help="No calcular diámetro/radio (grafos muy grandes)")
+    args = ap.parse_args()
+
+    with open(args.grafo, 'rb') as f:
+        grafo = pickle.load(f)
+    gd = GrafoDisperso.desde_networkx(grafo)
+    print(f"📂 {args.grafo}: {gd.n} nodos, {gd.m} aristas, {len(gd.dimensiones)} dimensiones")
+
+    inicio = time.perf_counter()
+    informes = analizar_por_dimension(gd, args.procesos, not args.sin_diametro)
+    resumen = exportar_informes(informes, {q: d.get('label') for q, d in grafo.nodes(data=True)})
+    print(f"⏱️  {len(informes)} fragmentos analizados en {time.perf_counter() - inicio:.2f}s")
+
+    columnas = ['nodos', 'aristas', 'densidad', 'componentes', 'diametro_principal', 'transitividad']
+    print(resumen[columnas].to_string())
+    print(f"✓ Reportes por fragmento en: {CARPETA_REPORTES}/")
+    print("✓ Resumen fusionado: resumen_por_dimension.csv")
+    print("✓ Métricas por nodo fusionadas: metricas_por_dimension.csv")
+
+
+if __name__ == "__main__":
+    main()
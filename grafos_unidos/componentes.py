@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+componentes.py - Componentes conexas con union-find sobre arrays de aristas
+
+Rutina única para todos los scripts: trabaja directamente sobre los arrays
+(origen, destino) sin construir nunca una copia no dirigida del grafo. El
+union-find está vectorizado: en cada ronda las raíces de los extremos de cada
+arista se enganchan a la menor (unión) y después se comprime el camino por
+saltos de puntero hasta que todo nodo apunta a su raíz.
+"""
+
+import numpy as np
+
+
+def etiquetar_componentes(origen, destino, n):
+    """Etiqueta de componente (0..k-1, por orden de su nodo de menor índice) para cada nodo"""
+    padre = np.arange(n)
+    u = np.asarray(origen, dtype=np.int64)
+    v = np.asarray(destino, dtype=np.int64)
+
+    while len(u):
+        ru, rv = padre[u], padre[v]
+        distintas = ru != rv
+        if not distintas.any():
+            break
+        # Solo las aristas que aún unen raíces distintas pueden volver a unir algo
+        u, v, ru, rv = u[distintas], v[distintas], ru[distintas], rv[distintas]
+
+        # Unión: la raíz mayor cuelga de la menor
+        np.minimum.at(padre, np.maximum(ru, rv), np.minimum(ru, rv))
+
+        # Compresión de caminos: saltos de puntero hasta el punto fijo
+        while True:
+            abuelo = padre[padre]
+            if np.array_equal(abuelo, padre):
+                break
+            padre = abuelo
+
+    _, etiquetas = np.unique(padre, return_inverse=True)
+    return etiquetas
+
+
+def componentes_grafo(gd):
+    """Etiquetas de componente de un GrafoDisperso (aristas tratadas como no dirigidas)"""
+    return etiquetar_componentes(gd.origen, gd.destino, gd.n)
+
+
+def etiquetas_networkx(grafo):
+    """(nodos, etiquetas) de un grafo networkx, leyendo sus aristas una sola vez"""
+    nodos = list(grafo.nodes())
+    indice = {q: i for i, q in enumerate(nodos)}
+    m = grafo.number_of_edges()
+    origen = np.fromiter((indice[u] for u, _ in grafo.edges()), dtype=np.int64, count=m)
+    destino = np.fromiter((indice[v] for _, v in grafo.edges()), dtype=np.int64, count=m)
+    return nodos, etiquetar_componentes(origen, destino, len(nodos))
+
+
+def agrupar_por_componente(etiquetas):
+    """Lista de arrays de índices de nodo, uno por componente, con un único argsort"""
+    orden = np.argsort(etiquetas, kind='stable')
+    cortes = np.flatnonzero(np.diff(etiquetas[orden])) + 1
+    return np.split(orden, cortes) if len(orden) else []
+
+
+def indices_componente_mayor(etiquetas):
+    """Índices de los nodos de la componente más grande"""
+    if len(etiquetas) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(etiquetas == np.argmax(np.bincount(etiquetas)))
+
+
+def componente_mayor(grafo):
+    """Vista (sin copia) de networkx con la componente conexa maximal del grafo"""
+    if grafo.number_of_nodes() == 0:
+        return grafo
+    nodos, etiquetas = etiquetas_networkx(grafo)
+    return grafo.subgraph([nodos[i] for i in indices_componente_mayor(etiquetas)])
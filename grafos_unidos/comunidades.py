@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+comunidades.py - Detección de comunidades (Louvain vectorizado) sobre la adyacencia dispersa
+
+Hasta ahora los nodos solo se agrupaban por la 'dimension' asignada a mano
+(GrafoManager.determinar_dimension). Aquí las comunidades salen de los datos:
+  • fase local: los nodos se colorean (Jones-Plassmann) y en cada barrido
+    cada clase de color, cuyos nodos no son vecinos entre sí, calcula a la vez
+    la ganancia de modularidad hacia las comunidades vecinas (una CSR
+    nodo x comunidad) y mueve todos los que mejoran;
+  • agregación: cada comunidad pasa a ser un nodo (P^T A P) y se repite;
+  • al final, como en Leiden, las comunidades no conexas se parten en sus
+    componentes (union-find de componentes.py), lo que nunca baja la modularidad.
+Cada barrido es O(aristas), así que el total es casi lineal.
+
+Uso:
+    python comunidades.py                         # sobre grafo_combinado.pkl
+    python comunidades.py --benchmark --nodos 200000 --aristas 1000000
+"""
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from grafo_disperso import GrafoDisperso
+from componentes import etiquetar_componentes
+
+
+def modularidad(A, etiquetas, resolucion=1.0):
+    """Modularidad de una partición sobre una CSR simétrica (los lazos cuentan dentro)"""
+    k = np.asarray(A.sum(axis=1)).ravel()
+    m2 = k.sum()
+    if m2 == 0:
+        return 0.0
+    filas = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    internas = A.data[etiquetas[filas] == etiquetas[A.indices]].sum()
+    tot = np.bincount(etiquetas, weights=k)
+    return float(internas / m2 - resolucion * (tot @ tot) / m2 ** 2)
+
+
+def _sin_diagonal(A):
+    """(indptr, indices, data) de A sin los lazos"""
+    n = A.shape[0]
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    fuera = A.indices != filas
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(filas[fuera], minlength=n), out=indptr[1:])
+    return indptr, A.indices[fuera], A.data[fuera]
+
+
+def _colorear(A, rng):
+    """Coloreado Jones-Plassmann: clases de nodos no adyacentes entre sí"""
+    n = A.shape[0]
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    fuera = A.indices != filas
+    filas, vecinos = filas[fuera], A.indices[fuera]
+    prioridad = rng.random(n)
+    color = np.full(n, -1)
+    ronda = 0
+    while len(filas):
+        # Elegido si su prioridad supera la de todos sus vecinos aún sin color
+        maximo = np.zeros(n)
+        np.maximum.at(maximo, filas, prioridad[vecinos])
+        elegidos = (color < 0) & (prioridad > maximo)
+        color[elegidos] = ronda
+        ronda += 1
+        quedan = (color[filas] < 0) & (color[vecinos] < 0)
+        filas, vecinos = filas[quedan], vecinos[quedan]
+    color[color < 0] = ronda
+    return color
+
+
+def _mover_nodos(A, resolucion, rng, max_barridos=50, tol=1e-6):
+    """Fase local: barridos por clases de color; devuelve la comunidad de cada nodo"""
+    n = A.shape[0]
+    k = np.asarray(A.sum(axis=1)).ravel()
+    m2 = k.sum()
+    comunidad = np.arange(n)
+    if m2 == 0:
+        return comunidad
+
+    # Filas de A (sin lazos) de cada clase de color, extraídas una sola vez
+    A_fuera = A - sp.diags(A.diagonal())
+    A_fuera.eliminate_zeros()
+    color = _colorear(A, rng)
+    clases = []
+    for nodos in np.split(np.argsort(color, kind='stable'), np.flatnonzero(np.diff(np.sort(color))) + 1):
+        sub = A_fuera[nodos]
+        clases.append((nodos, sub.indptr, sub.indices, sub.data))
+
+    tot = k.copy()
+    q = modularidad(A, comunidad, resolucion)
+    for _ in range(max_barridos):
+        for nodos, indptr, indices, data in clases:
+            c = len(nodos)
+            propia_c = comunidad[nodos]
+            k_c = k[nodos]
+            # M[i, c] = peso del nodo i hacia la comunidad c
+            M = sp.csr_matrix((data, comunidad[indices], indptr), shape=(c, n), copy=True)
+            M.sum_duplicates()
+            filas = np.repeat(np.arange(c), np.diff(M.indptr))
+            propia = M.indices == propia_c[filas]
+
+            tot_sin = tot[propia_c] - k_c
+            k_propia = np.bincount(filas[propia], weights=M.data[propia], minlength=c)
+            quedarse = k_propia - resolucion * k_c * tot_sin / m2
+            ganancia = M.data - resolucion * k_c[filas] * np.where(propia, tot_sin[filas], tot[M.indices]) / m2
+
+            # Mejor comunidad por fila (empates -> la de menor etiqueta)
+            con_vecinos = np.flatnonzero(np.diff(M.indptr))
+            if len(con_vecinos) == 0:
+                continue
+            mejor = np.full(c, -np.inf)
+            mejor[con_vecinos] = np.maximum.reduceat(ganancia, M.indptr[con_vecinos])
+            candidata = np.where(ganancia >= mejor[filas], M.indices, n)
+            destino = propia_c.copy()
+            destino[con_vecinos] = np.minimum.reduceat(candidata, M.indptr[con_vecinos])
+
+            mover = mejor > quedarse + 1e-12 * m2
+            if mover.any():
+                # Nodos del mismo color no son vecinos: pueden moverse a la vez
+                np.subtract.at(tot, propia_c[mover], k_c[mover])
+                np.add.at(tot, destino[mover], k_c[mover])
+                comunidad[nodos[mover]] = destino[mover]
+
+        q_nuevo = modularidad(A, comunidad, resolucion)
+        if q_nuevo - q < tol:
+            break
+        q = q_nuevo
+
+    return np.unique(comunidad, return_inverse=True)[1]
+
+
+def _partir_no_conexas(A, etiquetas):
+    """Parte cada comunidad en sus componentes conexas (garantía de Leiden)"""
+    filas = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    dentro = etiquetas[filas] == etiquetas[A.indices]
+    return etiquetar_componentes(filas[dentro], A.indices[dentro], A.shape[0])
+
+
+def louvain(A, resolucion=1.0, semilla=42, max_niveles=20):
+    """Etiqueta de comunidad por nodo de una CSR simétrica; 0 = la comunidad más grande"""
+    rng = np.random.default_rng(semilla)
+    A0 = A.tocsr()
+    etiquetas = np.arange(A0.shape[0])
+    A = A0
+
+    for _ in range(max_niveles):
+        comunidad = _mover_nodos(A, resolucion, rng)
+        k = comunidad.max() + 1 if len(comunidad) else 0
+        if k == A.shape[0]:
+            break
+        etiquetas = comunidad[etiquetas]
+        # Agregación: una fila por comunidad, los pesos internos quedan en la diagonal
+        P = sp.csr_matrix((np.ones(A.shape[0]), (np.arange(A.shape[0]), comunidad)), shape=(A.shape[0], k))
+        A = (P.T @ A @ P).tocsr()
+
+    etiquetas = _partir_no_conexas(A0, etiquetas)
+    # Se renumeran por tamaño descendente
+    tamanos = np.bincount(etiquetas)
+    rango = np.empty_like(tamanos)
+    rango[np.argsort(-tamanos, kind='stable')] = np.arange(len(tamanos))
+    return rango[etiquetas]
+
+
+def comunidades_grafo(gd, pesos_dimension=None, resolucion=1.0, semilla=42):
+    """Series nodo_id -> comunidad de un GrafoDisperso (aristas tratadas como no dirigidas)"""
+    A = gd.adyacencia(pesos_dimension, no_dirigida=True)
+    etiquetas = louvain(A, resolucion, semilla)
+    return pd.Series(etiquetas, index=pd.Index(gd.nodos, name='nodo_id'), name='comunidad')
+
+
+def tabla_contingencia(comunidad, dimension):
+    """Tabla comunidad x dimensión (nº de nodos) con totales por fila y columna"""
+    return pd.crosstab(comunidad, dimension, margins=True, margins_name='total')
+
+
+def _particion_plantada(n, m, bloques, p_dentro=0.9, semilla=0):
+    """Grafo sintético con `bloques` comunidades plantadas (para el benchmark)"""
+    rng = np.random.default_rng(semilla)
+    bloque = rng.integers(0, bloques, n)
+    miembros = np.argsort(bloque, kind='stable')
+    inicio = np.searchsorted(bloque[miembros], np.arange(bloques))
+    tamano = np.bincount(bloque, minlength=bloques)
+
+    origen = rng.integers(0, n, m)
+    dentro = rng.random(m) < p_dentro
+    b = bloque[origen]
+    destino = rng.integers(0, n, m)
+    destino[dentro] = miembros[inicio[b[dentro]] + (rng.random(dentro.sum()) * tamano[b[dentro]]).astype(np.int64)]
+    gd = GrafoDisperso([f"Q{i}" for i in range(n)], origen, destino)
+    return gd, bloque
+
+
+def benchmark(n=200_000, m=1_000_000, bloques=200):
+    """Tiempo y calidad (modularidad, NMI con la partición plantada) en un grafo sintético"""
+    gd, plantada = _particion_plantada(n, m, bloques)
+    A = gd.adyacencia(no_dirigida=True)
+    print(f"📊 Grafo sintético: {n:,} nodos, {m:,} aristas, {bloques} comunidades plantadas")
+
+    inicio = time.perf_counter()
+    etiquetas = louvain(A)
+    segundos = time.perf_counter() - inicio
+
+    tabla = pd.crosstab(etiquetas, plantada).to_numpy().astype(np.float64)
+    pxy = tabla / tabla.sum()
+    px, py = pxy.sum(axis=1), pxy.sum(axis=0)
+    nz = pxy > 0
+    info = (pxy[nz] * np.log(pxy[nz] / np.outer(px, py)[nz])).sum()
+    entropia = -(px[px > 0] * np.log(px[px > 0])).sum() - (py[py > 0] * np.log(py[py > 0])).sum()
+
+    print(f"• Tiempo: {segundos:.2f} s")
+    print(f"• Comunidades: {etiquetas.max() + 1}")
+    print(f"• Modularidad: {modularidad(A, etiquetas):.4f} (plantada: {modularidad(A, plantada):.4f})")
+    print(f"• NMI con la partición plantada: {2 * info / entropia:.4f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Comunidades por modularidad sobre la adyacencia dispersa")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--resolucion", type=float, default=1.0, help="Resolución de la modularidad (default: 1.0)")
+    ap.add_argument("--benchmark", action="store_true", help="Medir sobre un grafo sintético")
+    ap.add_argument("--nodos", type=int, default=200_000)
+    ap.add_argument("--aristas", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    if args.benchmark:
+        benchmark(args.nodos, args.aristas)
+        return
+
+    with open(args.grafo, 'rb') as f:
+        grafo = pickle.load(f)
+    gd = GrafoDisperso.desde_networkx(grafo)
+    comunidad = comunidades_grafo(gd, resolucion=args.resolucion)
+    dimension = pd.Series({n: d.get('dimension', 'N/A') for n, d in grafo.nodes(data=True)})[comunidad.index]
+
+    print(f"🧩 {comunidad.max() + 1} comunidades, modularidad "
+          f"{modularidad(gd.adyacencia(no_dirigida=True), comunidad.to_numpy(), args.resolucion):.4f}")
+    print(tabla_contingencia(comunidad, dimension.rename('dimension')))
+
+
+if __name__ == "__main__":
+    main()
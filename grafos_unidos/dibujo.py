@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+dibujo.py - Dibujo por lotes de grafos grandes con matplotlib
+
+nx.draw_networkx_* crea un artista por arista/etiqueta y cada savefig vuelve a
+trazar el grafo entero; el SVG resultante guarda cada glifo como un trazado
+(320 KB para 228 nodos). Aquí:
+    • todas las aristas son UNA LineCollection y todos los nodos UN scatter
+    • por encima de UMBRAL_RASTER aristas, las aristas se acumulan en una
+      imagen de densidad numpy (estilo datashader) que se dibuja con imshow:
+      el coste y el tamaño del archivo dejan de depender de m
+    • la figura se compone una sola vez y se guarda en todos los formatos;
+      en SVG el texto queda como texto y las capas masivas como imagen
+    • las etiquetas se colocan por prioridad y se descartan las que tapan a
+      otra ya colocada (rejilla de cajas), así solo se dibuja texto legible
+
+Uso:
+    python dibujo.py --benchmark      # 100k nodos / 300k aristas sintéticos
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+UMBRAL_RASTER = 20_000          # aristas (o nodos) a partir de las cuales se rasteriza
+MUESTRAS_POR_BLOQUE = 4_000_000  # puntos de muestreo por bloque al acumular densidad
+MUESTRAS_MAXIMAS = 60_000_000    # por encima se reduce la resolución de la imagen de densidad
+
+
+def arrays_dibujo(G, pos):
+    """(nodos, P, origen, destino, pesos) de un grafo networkx y su dict de posiciones"""
+    nodos = list(G.nodes())
+    indice = {n: i for i, n in enumerate(nodos)}
+    P = np.array([pos[n] for n in nodos], dtype=np.float64).reshape(-1, 2)
+    m = G.number_of_edges()
+    origen, destino, pesos = np.empty(m, dtype=np.int64), np.empty(m, dtype=np.int64), np.empty(m)
+    for i, (u, v, w) in enumerate(G.edges(data="weight", default=1)):
+        origen[i], destino[i], pesos[i] = indice[u], indice[v], w
+    return nodos, P, origen, destino, pesos
+
+
+def extension(P, margen=0.05):
+    """(x0, x1, y0, y1) que contiene todas las posiciones, con un margen relativo"""
+    if len(P) == 0:
+        return -1.0, 1.0, -1.0, 1.0
+    minimo, maximo = P.min(axis=0), P.max(axis=0)
+    holgura = np.maximum((maximo - minimo) * margen, 1e-9)
+    minimo, maximo = minimo - holgura, maximo + holgura
+    return minimo[0], maximo[0], minimo[1], maximo[1]
+
+
+def densidad_aristas(P, origen, destino, ext, resolucion, pesos=None):
+    """Imagen alto x ancho con el peso acumulado de las aristas que cruzan cada píxel
+
+    Cada segmento se muestrea una vez por píxel a lo largo de su eje mayor (DDA),
+    por bloques para acotar la memoria.
+    """
+    ancho, alto = resolucion
+    x0, x1, y0, y1 = ext
+    escala = np.array([(ancho - 1) / (x1 - x0), (alto - 1) / (y1 - y0)])
+    A = (P[origen] - (x0, y0)) * escala
+    B = (P[destino] - (x0, y0)) * escala
+    muestras = np.ceil(np.abs(B - A).max(axis=1)).astype(np.int64) + 1
+    pesos = np.ones(len(origen)) if pesos is None else np.asarray(pesos, dtype=np.float64)
+
+    imagen = np.zeros(alto * ancho)
+    acumuladas = np.cumsum(muestras)
+    inicio = 0
+    while inicio < len(muestras):
+        base = acumuladas[inicio - 1] if inicio else 0
+        fin = max(int(np.searchsorted(acumuladas, base + MUESTRAS_POR_BLOQUE, side='right')), inicio + 1)
+        cuenta = muestras[inicio:fin]
+        arista = np.repeat(np.arange(inicio, fin), cuenta)
+        paso = np.arange(len(arista)) - np.repeat(np.cumsum(cuenta) - cuenta, cuenta)
+        t = paso / np.maximum(muestras[arista] - 1, 1)
+        punto = A[arista] + t[:, None] * (B[arista] - A[arista])
+        columna = np.clip(np.rint(punto[:, 0]).astype(np.int64), 0, ancho - 1)
+        fila = np.clip(np.rint(punto[:, 1]).astype(np.int64), 0, alto - 1)
+        imagen += np.bincount(fila * ancho + columna, weights=pesos[arista], minlength=alto * ancho)
+        inicio = fin
+    return imagen.reshape(alto, ancho)
+
+
+def _resolucion(ax, dpi):
+    """Tamaño en píxeles de los ejes al dpi de salida"""
+    figura = ax.get_figure()
+    ancho, alto = figura.get_size_inches() * ax.get_position().size * dpi
+    return max(int(ancho), 1), max(int(alto), 1)
+
+
+def dibujar_aristas(ax, P, origen, destino, anchos=1.0, color="gray", alpha=0.35,
+                    umbral=UMBRAL_RASTER, dpi=200, pesos=None, cmap="Greys", ext=None):
+    """Aristas como una LineCollection, o como imagen de densidad si hay más de `umbral`
+
+    ext: (x0, x1, y0, y1) de los ejes; por defecto, la extensión de P.
+    """
+    ext = extension(P) if ext is None else ext
+    ax.set_xlim(ext[0], ext[1])
+    ax.set_ylim(ext[2], ext[3])
+    if len(origen) <= umbral:
+        segmentos = np.stack([P[origen], P[destino]], axis=1)
+        lineas = LineCollection(segmentos, linewidths=anchos, colors=color, alpha=alpha, zorder=1)
+        ax.add_collection(lineas)
+        return lineas
+
+    # Coste ∝ longitud total en píxeles: si excede el presupuesto se acumula a
+    # menor resolución y imshow la amplía
+    ancho, alto = _resolucion(ax, dpi)
+    largo = np.abs(P[destino] - P[origen]) * (ancho / (ext[1] - ext[0]), alto / (ext[3] - ext[2]))
+    reduccion = max(1.0, largo.max(axis=1).sum() / MUESTRAS_MAXIMAS)
+    resolucion = max(int(ancho / reduccion), 1), max(int(alto / reduccion), 1)
+    imagen = densidad_aristas(P, origen, destino, ext, resolucion, pesos)
+    # Escala logarítmica: unas pocas aristas siguen visibles junto a los haces densos
+    imagen = np.ma.masked_equal(np.log1p(imagen), 0)
+    return ax.imshow(imagen, extent=ext, origin="lower", cmap=cmap, interpolation="nearest",
+                     aspect="auto", alpha=min(1.0, 2 * alpha), zorder=1,
+                     vmin=0, vmax=imagen.max() if imagen.count() else 1)
+
+
+def dibujar_nodos(ax, P, tamanos=20, colores="C0", alpha=0.9, bordes="black", grosor=0.8,
+                  umbral=UMBRAL_RASTER):
+    """Todos los nodos en un solo scatter (rasterizado en SVG si hay más de `umbral`)"""
+    return ax.scatter(P[:, 0], P[:, 1], s=tamanos, c=colores, alpha=alpha, edgecolors=bordes,
+                      linewidths=grosor, zorder=2, rasterized=len(P) > umbral)
+
+
+def _solapan(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def colocar_etiquetas(ax, P, textos, orden=None, maximo=None, fontsize=9, margen=2.0, **estilo):
+    """Dibuja etiquetas en orden de prioridad, saltando las que solapan a una ya colocada
+
+    La caja de cada texto se estima en píxeles (≈0.6·fontsize por carácter, sin
+    renderizarlo) y las cajas colocadas se indexan en una rejilla uniforme: cada
+    candidata solo se compara con las cajas de las celdas que cubre. Los límites
+    de los ejes deben estar ya fijados. Devuelve los índices etiquetados.
+    """
+    px_por_punto = ax.get_figure().dpi / 72
+    pantalla = ax.transData.transform(np.asarray(P, dtype=np.float64).reshape(-1, 2))
+    alto_linea = 1.25 * fontsize * px_por_punto
+    celda = 4 * alto_linea
+    rejilla, cajas, colocados = {}, [], []
+    for i in (range(len(textos)) if orden is None else orden):
+        if maximo is not None and len(colocados) >= maximo:
+            break
+        lineas = str(textos[i] or "").split("\n")
+        if not any(lineas):
+            continue
+        ancho = max(map(len, lineas)) * 0.6 * fontsize * px_por_punto / 2 + margen
+        alto = len(lineas) * alto_linea / 2 + margen
+        x, y = pantalla[i]
+        caja = (x - ancho, y - alto, x + ancho, y + alto)
+        celdas = [(cx, cy) for cx in range(int(caja[0] // celda), int(caja[2] // celda) + 1)
+                  for cy in range(int(caja[1] // celda), int(caja[3] // celda) + 1)]
+        if any(_solapan(caja, cajas[j]) for c in celdas for j in rejilla.get(c, ())):
+            continue
+        for c in celdas:
+            rejilla.setdefault(c, []).append(len(cajas))
+        cajas.append(caja)
+        colocados.append(i)
+
+    opciones = dict(ha="center", va="center", zorder=3)
+    opciones.update(estilo)
+    for i in colocados:
+        ax.text(P[i][0], P[i][1], textos[i], fontsize=fontsize, **opciones)
+    return colocados
+
+
+def guardar_figura(figura, prefijo, formatos=("png", "svg"), dpi=200, **opciones):
+    """Guarda la figura ya compuesta en cada formato; devuelve las rutas"""
+    rutas = []
+    with matplotlib.rc_context({"svg.fonttype": "none"}):   # texto como <text>, no como trazados
+        for formato in formatos:
+            ruta = Path(prefijo).with_suffix(f".{formato}")
+            figura.savefig(ruta, dpi=dpi, **opciones)
+            rutas.append(ruta)
+    return rutas
+
+
+def benchmark(n=100_000, m=300_000, semilla=42):
+    """Tiempo y tamaño de PNG+SVG con densidad frente a una LineCollection completa"""
+    import tempfile
+
+    # Malla con ruido y aristas entre vecinos cercanos, como tras un layout de fuerzas
+    rng = np.random.default_rng(semilla)
+    lado = int(np.sqrt(n))
+    P = np.column_stack([np.arange(n) % lado, np.arange(n) // lado]) + rng.normal(scale=0.5, size=(n, 2))
+    origen = rng.integers(0, n, m)
+    destino = np.clip(origen + rng.integers(-3, 4, m) + lado * rng.integers(-3, 4, m), 0, n - 1)
+    print(f"🧪 Benchmark dibujo: {n:,} nodos, {m:,} aristas")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre, umbral in (("densidad", UMBRAL_RASTER), ("LineCollection", m)):
+            inicio = time.perf_counter()
+            figura, ax = plt.subplots(figsize=(14, 10))
+            dibujar_aristas(ax, P, origen, destino, anchos=0.3, umbral=umbral)
+            dibujar_nodos(ax, P, tamanos=2, bordes="none")
+            ax.set_axis_off()
+            rutas = guardar_figura(figura, Path(carpeta) / nombre)
+            plt.close(figura)
+            tamano = sum(r.stat().st_size for r in rutas) / 1e6
+            print(f"   • {nombre}: {time.perf_counter() - inicio:.2f}s, PNG+SVG {tamano:.1f} MB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Dibujo por lotes de grafos grandes")
+    ap.add_argument("--benchmark", action="store_true", help="Grafo sintético de 100k nodos / 300k aristas")
+    ap.add_argument("--nodos", type=int, default=100_000)
+    ap.add_argument("--aristas", type=int, default=300_000)
+    args = ap.parse_args()
+    if args.benchmark:
+        benchmark(args.nodos, args.aristas)
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
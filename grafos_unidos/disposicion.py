@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+"""
+disposicion.py - Layout ForceAtlas2 con Barnes-Hut vectorizado y multinivel
+
+nx.spring_layout / kamada_kawai_layout calculan las n² repulsiones en cada
+iteración y dejan de ser prácticos pasados unos miles de nodos. Aquí:
+  • repulsión Barnes-Hut: un quadtree por códigos de Morton (un argsort y
+    reduceat por nivel) y un recorrido por frentes (nodo, celda) en numpy;
+    una celda lejana (lado/distancia < theta) cuenta como una masa puntual,
+    así que cada iteración es O(n log n);
+  • fuerzas de ForceAtlas2 (repulsión por grado, atracción lineal por arista,
+    gravedad) con su velocidad adaptativa (swing/traction) y parada temprana
+    cuando el desplazamiento medio se vuelve despreciable;
+  • multinivel: el grafo se engrosa con conjuntos independientes maximales
+    (los nodos de mayor grado son "soles" y sus vecinos se les unen), se
+    dispone el nivel más grueso y cada nivel fino parte de las posiciones
+    de su sol, con pocas iteraciones de refinado;
+  • caché: las posiciones se guardan junto al grafo con su huella (hash de
+    nodos y aristas). Si la huella coincide se reutilizan tal cual; si el
+    grafo creció (p.ej. tras profundizacion.py), los nodos conocidos quedan
+    fijos, los nuevos nacen en el centro de sus vecinos ya ubicados y solo
+    ellos se mueven unas pocas iteraciones, así que el dibujo no cambia.
+
+disposicion(grafo) devuelve {nodo: array([x, y])} en [-1, 1], igual que los
+layouts de networkx, para sustituirlos directamente.
+
+Uso:
+    python disposicion.py --benchmark --nodos 100000 --aristas 300000
+    python disposicion.py --grafo grafo_combinado.pkl     # calcula/actualiza grafo_combinado.disposicion.npz
+"""
+
+import argparse
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from grafo_disperso import GrafoDisperso, huella
+
+PROFUNDIDAD_ARBOL = 16         # niveles del quadtree (2^16 celdas por lado en el más fino)
+NODOS_MINIMOS_NIVEL = 64       # el engrosamiento se detiene por debajo de este tamaño
+FRACCION_MINIMA_CACHE = 0.5    # por debajo, la caché no sirve de arranque y se recalcula todo
+
+
+def _separar_bits(v):
+    """Intercala ceros entre los 32 bits bajos de v (para códigos de Morton)"""
+    v = v.astype(np.uint64)
+    for desplazamiento, mascara in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                                    (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                                    (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(desplazamiento))) & np.uint64(mascara)
+    return v
+
+
+def _rangos(inicios, largos):
+    """Concatenación de arange(inicio, inicio + largo) para cada par"""
+    total = largos.sum()
+    desplazamiento = np.repeat(inicios - np.cumsum(largos) + largos, largos)
+    return desplazamiento + np.arange(total)
+
+
+class _Quadtree:
+    """Quadtree plano: todas las celdas de todos los niveles en arrays globales"""
+    def __init__(self, P, masas, profundidad=PROFUNDIDAD_ARBOL):
+        n = len(P)
+        minimo = P.min(axis=0)
+        lado = float((P.max(axis=0) - minimo).max()) * (1 + 1e-9) or 1.0
+        lado_celdas = 1 << profundidad
+        q = np.clip(((P - minimo) / lado * lado_celdas).astype(np.int64), 0, lado_celdas - 1)
+        codigo = _separar_bits(q[:, 0]) | (_separar_bits(q[:, 1]) << np.uint64(1))
+        self.orden = np.argsort(codigo, kind='stable')
+        codigo = codigo[self.orden]
+        m = masas[self.orden]
+        mx, my = m * P[self.orden, 0], m * P[self.orden, 1]
+
+        niveles, desplazamiento = [], 0
+        for nivel in range(profundidad + 1):
+            clave = codigo >> np.uint64(2 * (profundidad - nivel))
+            inicio = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]])
+            fin = np.r_[inicio[1:], n]
+            masa = np.add.reduceat(m, inicio)
+            niveles.append({
+                'inicio': inicio, 'fin': fin, 'masa': masa,
+                'cx': np.add.reduceat(mx, inicio) / masa, 'cy': np.add.reduceat(my, inicio) / masa,
+                'lado': np.full(len(inicio), lado / (1 << nivel)),
+                'hoja': (fin - inicio == 1) | (nivel == profundidad),
+                'desplazamiento': desplazamiento,
+            })
+            desplazamiento += len(inicio)
+
+        # Hijos de cada celda: rango contiguo de celdas del nivel siguiente
+        for nivel, datos in enumerate(niveles[:-1]):
+            siguiente = niveles[nivel + 1]
+            datos['hijo_inicio'] = np.searchsorted(siguiente['inicio'], datos['inicio']) + siguiente['desplazamiento']
+            datos['hijo_fin'] = np.searchsorted(siguiente['inicio'], datos['fin']) + siguiente['desplazamiento']
+        niveles[-1]['hijo_inicio'] = niveles[-1]['hijo_fin'] = np.zeros(len(niveles[-1]['inicio']), dtype=np.int64)
+
+        for clave in ('inicio', 'fin', 'masa', 'cx', 'cy', 'lado', 'hoja', 'hijo_inicio', 'hijo_fin'):
+            setattr(self, clave, np.concatenate([d[clave] for d in niveles]))
+        self.cuenta = self.fin - self.inicio
+        self.lado2 = self.lado ** 2
+
+
+def _repulsion(P, masas, kr, theta, nodos=None):
+    """Fuerza de repulsión kr·m_i·m_j/d sobre `nodos` (None = todos), aproximada con Barnes-Hut"""
+    n = len(P)
+    arbol = _Quadtree(P, masas)
+    x, y = P[:, 0], P[:, 1]
+    fx, fy = np.zeros(n), np.zeros(n)
+    nodo = np.arange(n) if nodos is None else nodos
+    celda = np.zeros(len(nodo), dtype=np.int64)
+    theta2 = theta * theta
+
+    def aplicar(i, dx, dy, d2, masa):
+        f = kr * masas[i] * masa / d2
+        fx[:] += np.bincount(i, weights=f * dx, minlength=n)
+        fy[:] += np.bincount(i, weights=f * dy, minlength=n)
+
+    while len(nodo):
+        dx, dy = x[nodo] - arbol.cx[celda], y[nodo] - arbol.cy[celda]
+        d2 = dx * dx + dy * dy
+        lejos = arbol.lado2[celda] < theta2 * d2
+        hoja = arbol.hoja[celda] & ~lejos
+        cuenta = arbol.cuenta[celda]
+
+        # Celdas lejanas y hojas de un solo nodo (salvo el propio nodo): masa puntual
+        unico = hoja & (cuenta == 1)
+        propio = unico & (arbol.orden[arbol.inicio[celda]] == nodo)
+        puntual = (lejos | unico) & ~propio & (d2 > 0)
+        aplicar(nodo[puntual], dx[puntual], dy[puntual], d2[puntual], arbol.masa[celda[puntual]])
+
+        # Hojas del nivel más fino con varios nodos: interacción exacta con cada uno
+        varios = hoja & (cuenta > 1)
+        if varios.any():
+            i = np.repeat(nodo[varios], cuenta[varios])
+            j = arbol.orden[_rangos(arbol.inicio[celda[varios]], cuenta[varios])]
+            dx, dy = x[i] - x[j], y[i] - y[j]
+            d2 = dx * dx + dy * dy
+            distintos = d2 > 0
+            aplicar(i[distintos], dx[distintos], dy[distintos], d2[distintos], masas[j[distintos]])
+
+        # Celdas cercanas internas: se abren en sus hijos
+        abrir = ~lejos & ~hoja
+        largos = arbol.hijo_fin[celda[abrir]] - arbol.hijo_inicio[celda[abrir]]
+        nodo = np.repeat(nodo[abrir], largos)
+        celda = _rangos(arbol.hijo_inicio[celda[abrir]], largos)
+    return np.column_stack([fx, fy])
+
+
+def _sin_lazos(A):
+    A = sp.csr_matrix(A, dtype=np.float64, copy=True)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    return A
+
+
+def forceatlas2(A, posiciones=None, masas=None, iteraciones=300, theta=1.2, repulsion=2.0, gravedad=1.0,
+                tolerancia=1e-3, semilla=42, moviles=None):
+    """Posiciones (n x 2) por ForceAtlas2 sobre una CSR simétrica; para cuando se estabiliza
+
+    moviles: máscara de nodos que se mueven (el resto queda fijo); None = todos.
+    """
+    A = _sin_lazos(A)
+    n = A.shape[0]
+    rng = np.random.default_rng(semilla)
+    if masas is None:
+        masas = np.diff(A.indptr) + 1.0
+    P = rng.uniform(-1, 1, (n, 2)) * np.sqrt(n) if posiciones is None else np.array(posiciones, dtype=np.float64)
+    if n < 2:
+        return P
+
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    columnas, pesos = A.indices, A.data
+    F_anterior = np.zeros_like(P)
+    velocidad, eficiencia = 1.0, 1.0
+    jitter_estimado = 0.05 * np.sqrt(n)
+
+    activos = None if moviles is None else np.flatnonzero(moviles)
+    for _ in range(iteraciones):
+        F = _repulsion(P, masas, repulsion, theta, activos)
+        # Atracción lineal por arista (la CSR simétrica ya tiene ambos sentidos)
+        tiron = pesos[:, None] * (P[columnas] - P[filas])
+        F[:, 0] += np.bincount(filas, weights=tiron[:, 0], minlength=n)
+        F[:, 1] += np.bincount(filas, weights=tiron[:, 1], minlength=n)
+        # Gravedad hacia el origen
+        radio = np.maximum(np.hypot(P[:, 0], P[:, 1]), 1e-9)
+        F -= (gravedad * masas / radio)[:, None] * P
+        if moviles is not None:
+            F[~moviles] = 0.0
+
+        # Velocidad adaptativa de ForceAtlas2 (swing = oscilación, traction = avance útil)
+        swing = masas * np.hypot(*(F - F_anterior).T)
+        traction = masas * np.hypot(*(F + F_anterior).T) / 2
+        swing_total, traction_total = swing.sum(), max(traction.sum(), 1e-12)
+        jitter = max(np.sqrt(jitter_estimado), min(10.0, jitter_estimado * traction_total / n ** 2))
+        if swing_total / traction_total > 2.0:
+            eficiencia = max(eficiencia * 0.5, 0.05)
+            jitter = max(jitter, 1.0)
+        objetivo = jitter * eficiencia * traction_total / max(swing_total, 1e-12)
+        if swing_total > jitter * traction_total:
+            eficiencia = max(eficiencia * 0.7, 0.05)
+        elif velocidad < 1000:
+            eficiencia *= 1.3
+        velocidad += min(objetivo - velocidad, 0.5 * velocidad)
+
+        paso = F * (velocidad / (1 + np.sqrt(velocidad * swing)))[:, None]
+        P += paso
+        F_anterior = F
+
+        # Parada temprana: desplazamiento medio relativo al tamaño del layout
+        escala = np.sqrt(((P - P.mean(axis=0)) ** 2).sum(axis=1).mean()) or 1.0
+        desplazados = paso if moviles is None else paso[moviles]
+        if len(desplazados) == 0 or np.sqrt((desplazados ** 2).sum(axis=1).mean()) / escala < tolerancia:
+            break
+    return P
+
+
+def _conjunto_independiente(A, prioridad):
+    """Conjunto independiente maximal: gana quien supera la prioridad de sus vecinos indecisos"""
+    n = A.shape[0]
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    vecinos = A.indices
+    estado = np.zeros(n, dtype=np.int8)           # 0 indeciso, 1 dentro, -1 fuera
+    while (estado == 0).any():
+        maximo = np.full(n, -np.inf)
+        activas = (estado[filas] == 0) & (estado[vecinos] == 0)
+        np.maximum.at(maximo, filas[activas], prioridad[vecinos[activas]])
+        ganan = (estado == 0) & (prioridad > maximo)
+        estado[ganan] = 1
+        estado[vecinos[ganan[filas] & (estado[vecinos] == 0)]] = -1
+    return estado == 1
+
+
+def _engrosar(A, rng):
+    """Asignación nodo -> sol (soles = conjunto independiente, priorizando grado alto)"""
+    n = A.shape[0]
+    prioridad = np.diff(A.indptr) + rng.random(n)
+    sol = _conjunto_independiente(A, prioridad)
+    asignacion = np.where(sol, np.arange(n), -1)
+
+    # Cada planeta se une al sol vecino de mayor prioridad
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    candidatos = ~sol[filas] & sol[A.indices]
+    f, c = filas[candidatos], A.indices[candidatos]
+    orden = np.lexsort((-prioridad[c], f))
+    primero = np.ones(len(f), dtype=bool)
+    primero[1:] = f[orden][1:] != f[orden][:-1]
+    asignacion[f[orden][primero]] = c[orden][primero]
+
+    codigos = np.unique(asignacion, return_inverse=True)[1]
+    return codigos, codigos.max() + 1
+
+
+def disposicion_multinivel(A, iteraciones=300, iteraciones_refinado=30, semilla=42, **fuerzas):
+    """ForceAtlas2 sobre una jerarquía de grafos engrosados, del más grueso al original"""
+    rng = np.random.default_rng(semilla)
+    A = _sin_lazos(A)
+    masas = np.diff(A.indptr) + 1.0
+    jerarquia = [(A, masas, None)]
+    while A.shape[0] > NODOS_MINIMOS_NIVEL:
+        asignacion, k = _engrosar(A, rng)
+        if k > 0.8 * A.shape[0]:
+            break
+        P = sp.csr_matrix((np.ones(A.shape[0]), (np.arange(A.shape[0]), asignacion)), shape=(A.shape[0], k))
+        A = _sin_lazos(P.T @ A @ P)
+        masas = np.bincount(asignacion, weights=masas, minlength=k)
+        jerarquia.append((A, masas, asignacion))
+
+    posiciones = None
+    for nivel in range(len(jerarquia) - 1, -1, -1):
+        A, masas, _ = jerarquia[nivel]
+        grueso = nivel == len(jerarquia) - 1
+        posiciones = forceatlas2(A, posiciones, masas, iteraciones if grueso else iteraciones_refinado,
+                                 semilla=semilla, **fuerzas)
+        if nivel:
+            # Los nodos del nivel fino nacen junto a su sol, con un pequeño desorden
+            asignacion = jerarquia[nivel][2]
+            filas = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+            largo = np.median(np.hypot(*(posiciones[filas] - posiciones[A.indices]).T)) if A.nnz else 1.0
+            radio = np.full(len(asignacion), 0.25 * largo)
+            angulo = rng.uniform(0, 2 * np.pi, len(asignacion))
+            posiciones = posiciones[asignacion] + radio[:, None] * np.column_stack([np.cos(angulo), np.sin(angulo)])
+    return posiciones
+
+
+def normalizar(P):
+    """Centra y escala a [-1, 1] (como nx.rescale_layout)"""
+    P = P - P.mean(axis=0)
+    escala = np.abs(P).max()
+    return P / escala if escala > 0 else P
+
+
+def ubicar_nuevos(A, P, ubicados, semilla=42):
+    """Pone cada nodo no ubicado en el centro de sus vecinos ya ubicados (por rondas, como un BFS)"""
+    rng = np.random.default_rng(semilla)
+    P, ubicados = P.copy(), ubicados.copy()
+    filas = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    conocidas = ubicados[filas] & ubicados[A.indices]
+    largo = np.median(np.hypot(*(P[filas[conocidas]] - P[A.indices[conocidas]]).T)) if conocidas.any() else 1.0
+
+    while True:
+        vecinos = A @ ubicados.astype(np.float64)
+        listos = ~ubicados & (vecinos > 0)
+        if not listos.any():
+            break
+        centro = (A @ (P * ubicados[:, None]))[listos] / vecinos[listos, None]
+        # Un pequeño desorden evita que hermanos con los mismos vecinos coincidan
+        P[listos] = centro + rng.normal(0, 0.25 * largo, (listos.sum(), 2))
+        ubicados |= listos
+
+    # Sin ningún vecino ubicado (otra componente): al azar dentro del dibujo
+    if (~ubicados).any():
+        radio = np.abs(P[ubicados]).max() if ubicados.any() else 1.0
+        P[~ubicados] = rng.uniform(-radio, radio, ((~ubicados).sum(), 2))
+    return P
+
+
+def ruta_disposicion(ruta_grafo):
+    """Las posiciones se guardan junto al grafo: grafo_combinado.pkl -> grafo_combinado.disposicion.npz"""
+    return Path(ruta_grafo).with_suffix(".disposicion.npz")
+
+
+def _disposicion_en_cache(gd, cache, iteraciones, iteraciones_locales, semilla, fuerzas):
+    """Posiciones crudas (sin normalizar) reutilizando y actualizando la caché"""
+    A = gd.adyacencia(no_dirigida=True)
+    clave = huella(gd)
+    nodos = [str(q) for q in gd.nodos]          # la caché guarda los nodos como texto
+    try:
+        datos = np.load(cache)
+        previas = dict(zip(datos['nodos'].tolist(), datos['posiciones']))
+        huella_previa = str(datos['huella'])
+    except (FileNotFoundError, KeyError, ValueError):
+        previas, huella_previa = {}, None
+
+    ubicados = np.fromiter((q in previas for q in nodos), dtype=bool, count=gd.n)
+    if huella_previa == clave and ubicados.all():
+        return np.array([previas[q] for q in nodos])
+
+    if ubicados.mean() >= FRACCION_MINIMA_CACHE:
+        P = np.zeros((gd.n, 2))
+        P[ubicados] = [previas[q] for q, u in zip(nodos, ubicados) if u]
+        P = ubicar_nuevos(A, P, ubicados, semilla)
+        P = forceatlas2(A, P, iteraciones=iteraciones_locales, semilla=semilla, moviles=~ubicados, **fuerzas)
+    else:
+        P = disposicion_multinivel(A, iteraciones, semilla=semilla, **fuerzas)
+
+    np.savez_compressed(cache, nodos=np.array(nodos), posiciones=P, huella=clave)
+    return P
+
+
+def disposicion(grafo, iteraciones=300, semilla=42, cache=None, iteraciones_locales=30, **fuerzas):
+    """{nodo: array([x, y])} de un grafo networkx, como nx.spring_layout
+
+    cache: ruta .disposicion.npz (ver ruta_disposicion); si existe se arranca
+    desde ella y solo se refinan los nodos nuevos.
+    """
+    if grafo.number_of_nodes() == 0:
+        return {}
+    gd = GrafoDisperso.desde_networkx(grafo)
+    return dict(zip(gd.nodos, disposicion_disperso(gd, iteraciones, semilla, cache, iteraciones_locales, **fuerzas)))
+
+
+def disposicion_disperso(gd, iteraciones=300, semilla=42, cache=None, iteraciones_locales=30, **fuerzas):
+    """Posiciones normalizadas (n x 2, alineadas con gd.nodos) de un GrafoDisperso"""
+    if gd.n == 0:
+        return np.zeros((0, 2))
+    if cache is None:
+        P = disposicion_multinivel(gd.adyacencia(no_dirigida=True), iteraciones, semilla=semilla, **fuerzas)
+    else:
+        P = _disposicion_en_cache(gd, cache, iteraciones, iteraciones_locales, semilla, fuerzas)
+    return normalizar(P)
+
+
+def benchmark(n=100_000, m=300_000, semilla=0):
+    """Tiempo del layout multinivel sobre un grafo sintético con hubs (grado ~ Zipf)"""
+    rng = np.random.default_rng(semilla)
+    origen = (rng.zipf(1.8, m) - 1) % n
+    destino = rng.integers(0, n, m)
+    gd = GrafoDisperso([f"Q{i}" for i in range(n)], origen, destino)
+    A = gd.adyacencia(no_dirigida=True)
+    print(f"📊 Grafo sintético: {n:,} nodos, {m:,} aristas")
+
+    inicio = time.perf_counter()
+    P = disposicion_multinivel(A)
+    segundos = time.perf_counter() - inicio
+    filas = np.repeat(np.arange(n), np.diff(A.indptr))
+    largo = np.hypot(*(P[filas] - P[A.indices]).T)
+    print(f"• Tiempo: {segundos:.2f} s")
+    print(f"• Largo medio de arista / radio del layout: {largo.mean() / np.abs(P - P.mean(axis=0)).max():.4f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Layout ForceAtlas2 (Barnes-Hut, multinivel)")
+    ap.add_argument("--benchmark", action="store_true", help="Medir sobre un grafo sintético")
+    ap.add_argument("--nodos", type=int, default=100_000)
+    ap.add_argument("--aristas", type=int, default=300_000)
+    ap.add_argument("--grafo", default=None, help="Grafo PKL cuya caché de posiciones se calcula/actualiza")
+    args = ap.parse_args()
+    if args.benchmark:
+        benchmark(args.nodos, args.aristas)
+    elif args.grafo:
+        with open(args.grafo, 'rb') as f:
+            grafo = pickle.load(f)
+        inicio = time.perf_counter()
+        disposicion(grafo, cache=ruta_disposicion(args.grafo))
+        print(f"📍 {grafo.number_of_nodes()} posiciones en {ruta_disposicion(args.grafo)} "
+              f"({time.perf_counter() - inicio:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
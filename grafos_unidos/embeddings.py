@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+embeddings.py - Embeddings de nodos por paseos aleatorios (DeepWalk / node2vec) sobre CSR
+
+  • paseos: se generan por lotes vectorizados (todos los paseos avanzan un paso
+    a la vez) sobre los arrays de la CSR no dirigida; el siguiente vecino se
+    muestrea en O(1) con tablas alias por fila y, si p/q != 1, el sesgo de
+    segundo orden de node2vec se aplica por rechazo. Los lotes se reparten
+    entre procesos;
+  • entrenamiento (CPU): factorización implícita de skip-gram con muestreo
+    negativo, es decir, SVD truncada de la matriz PPMI desplazada de
+    co-ocurrencias dentro de la ventana (Levy & Goldberg, NetMF);
+  • salida: vectores float32 normalizados en <grafo>.embeddings.npy (se abre
+    con mmap) y la tabla de QIDs en <grafo>.embeddings.nodos.npy.
+
+Uso:
+    python embeddings.py                                  # entrena sobre grafo_combinado.pkl
+    python embeddings.py Q2408955 Q60643381 --k 10        # vecinos más cercanos
+"""
+
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import svds
+
+from grafo_disperso import GrafoDisperso
+
+
+def _alias_fila(p):
+    """Tabla alias de Vose para una distribución p (suma 1): (prob, alias) locales a la fila"""
+    d = len(p)
+    escalada = p * d
+    prob = np.ones(d)
+    alias = np.arange(d)
+    pequenos = [i for i in range(d) if escalada[i] < 1.0]
+    grandes = [i for i in range(d) if escalada[i] >= 1.0]
+    while pequenos and grandes:
+        s, g = pequenos.pop(), grandes.pop()
+        prob[s], alias[s] = escalada[s], g
+        escalada[g] -= 1.0 - escalada[s]
+        (pequenos if escalada[g] < 1.0 else grandes).append(g)
+    return prob, alias
+
+
+def tablas_alias(A):
+    """(prob, alias) por entrada de la CSR; las filas de pesos uniformes no necesitan tabla"""
+    prob = np.ones(A.nnz)
+    alias = np.zeros(A.nnz, dtype=np.int64)
+    grado = np.diff(A.indptr)
+    filas = np.repeat(np.arange(A.shape[0]), grado)
+    alias[:] = np.arange(A.nnz) - A.indptr[filas]     # alias = sí misma (muestreo uniforme)
+
+    con_datos = np.flatnonzero(grado)
+    minimo = np.minimum.reduceat(A.data, A.indptr[con_datos]) if len(con_datos) else np.zeros(0)
+    maximo = np.maximum.reduceat(A.data, A.indptr[con_datos]) if len(con_datos) else np.zeros(0)
+    for fila in con_datos[minimo != maximo]:
+        inicio, fin = A.indptr[fila], A.indptr[fila + 1]
+        pesos = A.data[inicio:fin]
+        prob[inicio:fin], alias[inicio:fin] = _alias_fila(pesos / pesos.sum())
+    return prob, alias
+
+
+# Estado de cada proceso trabajador (se recibe una vez en el inicializador)
+_GRAFO = {}
+
+
+def _iniciar_trabajador(indptr, indices, prob, alias, p, q):
+    claves = None
+    if p != 1.0 or q != 1.0:
+        # fila * n + columna, ordenadas (CSR canónica): "¿x es vecino de t?" por búsqueda binaria
+        n = len(indptr) - 1
+        claves = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr)) * n + indices
+    _GRAFO.update(indptr=indptr, indices=indices, prob=prob, alias=alias, p=p, q=q, claves=claves)
+
+
+def _paso(actual, rng):
+    """Un vecino de cada nodo actual (distribución de primer orden, tabla alias)"""
+    g = _GRAFO
+    inicio = g['indptr'][actual]
+    grado = g['indptr'][actual + 1] - inicio
+    j = (rng.random(len(actual)) * grado).astype(np.int64)
+    pos = inicio + j
+    local = np.where(rng.random(len(actual)) < g['prob'][pos], j, g['alias'][pos])
+    return g['indices'][inicio + local]
+
+
+def _paseos(inicios, largo, semilla):
+    """Paseos (len(inicios) x largo) por lotes; -1 tras un nodo sin vecinos"""
+    g = _GRAFO
+    rng = np.random.default_rng(semilla)
+    n = len(g['indptr']) - 1
+    grado = np.diff(g['indptr'])
+    sesgo = (1.0 / g['p'], 1.0, 1.0 / g['q'])       # volver / vecino común / alejarse
+    tope = max(sesgo)
+
+    paseos = np.full((len(inicios), largo), -1, dtype=np.int64)
+    paseos[:, 0] = inicios
+    for t in range(1, largo):
+        vivos = np.flatnonzero(paseos[:, t - 1] >= 0)
+        vivos = vivos[grado[paseos[vivos, t - 1]] > 0]
+        if len(vivos) == 0:
+            break
+        actual = paseos[vivos, t - 1]
+        siguiente = _paso(actual, rng)
+        if t > 1 and g['claves'] is not None:
+            # node2vec: se acepta x con probabilidad sesgo(previo, x) / tope
+            previo = paseos[vivos, t - 2]
+            pendientes = np.arange(len(vivos))
+            while len(pendientes):
+                x, pr = siguiente[pendientes], previo[pendientes]
+                clave = pr * n + x
+                pos = np.minimum(np.searchsorted(g['claves'], clave), len(g['claves']) - 1)
+                peso = np.where(x == pr, sesgo[0], np.where(g['claves'][pos] == clave, sesgo[1], sesgo[2]))
+                rechazados = pendientes[rng.random(len(pendientes)) * tope >= peso]
+                if len(rechazados):
+                    siguiente[rechazados] = _paso(actual[rechazados], rng)
+                pendientes = rechazados
+        paseos[vivos, t] = siguiente
+    return paseos
+
+
+def generar_paseos(A, paseos_por_nodo=10, largo=40, p=1.0, q=1.0, procesos=None, semilla=42, lote=20_000):
+    """Matriz de paseos (n * paseos_por_nodo x largo) generada en paralelo por lotes"""
+    prob, alias = tablas_alias(A)
+    n = A.shape[0]
+    rng = np.random.default_rng(semilla)
+    inicios = np.concatenate([rng.permutation(n) for _ in range(paseos_por_nodo)])
+    lotes = [inicios[i:i + lote] for i in range(0, len(inicios), lote)]
+    semillas = rng.integers(0, 2 ** 63, len(lotes))
+    argumentos = (A.indptr.astype(np.int64), A.indices.astype(np.int64), prob, alias, p, q)
+
+    procesos = min(procesos or os.cpu_count() or 1, len(lotes))
+    if procesos <= 1:
+        _iniciar_trabajador(*argumentos)
+        return np.vstack([_paseos(b, largo, s) for b, s in zip(lotes, semillas)])
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=argumentos) as ejecutor:
+        return np.vstack(list(ejecutor.map(_paseos, lotes, [largo] * len(lotes), semillas)))
+
+
+def coocurrencias(paseos, n, ventana=5, lote=50_000):
+    """Matriz CSR simétrica n x n de co-ocurrencias dentro de la ventana (acumulada por lotes)"""
+    C = sp.csr_matrix((n, n), dtype=np.float32)
+    for i in range(0, len(paseos), lote):
+        bloque = paseos[i:i + lote]
+        u = np.concatenate([bloque[:, :-d].ravel() for d in range(1, ventana + 1)])
+        v = np.concatenate([bloque[:, d:].ravel() for d in range(1, ventana + 1)])
+        validos = (u >= 0) & (v >= 0)
+        C = C + sp.csr_matrix((np.ones(validos.sum(), dtype=np.float32), (u[validos], v[validos])), shape=(n, n))
+    return (C + C.T).tocsr()
+
+
+def entrenar(C, dimension=64, negativos=1.0):
+    """Vectores (n x dimension) por SVD de la PPMI desplazada: max(log(#(i,j)·D / (#i·#j)) - log k, 0)"""
+    n = C.shape[0]
+    total = C.sum()
+    fila = np.asarray(C.sum(axis=1)).ravel()
+    contexto = fila ** 0.75                      # suavizado de contexto de word2vec
+    contexto *= total / contexto.sum()
+
+    # PMI en el sitio sobre la CSR: solo se conservan los valores positivos
+    filas = np.repeat(np.arange(n), np.diff(C.indptr))
+    M = C.copy()
+    M.data = (np.log(C.data * total / (fila[filas] * contexto[C.indices])) - np.log(negativos)).astype(np.float32)
+    M.data[M.data < 0] = 0
+    M.eliminate_zeros()
+
+    k = min(dimension, n - 2)
+    if k < 1:
+        return np.zeros((n, dimension), dtype=np.float32)
+    U, S, _ = svds(M, k=k, random_state=0)
+    vectores = np.zeros((n, dimension), dtype=np.float32)
+    vectores[:, :k] = U * np.sqrt(S)
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    return np.divide(vectores, normas, out=vectores, where=normas > 0)
+
+
+class Embeddings:
+    """Vectores normalizados por nodo, indexados con la tabla de QIDs"""
+    def __init__(self, nodos, vectores):
+        self.nodos = list(nodos)
+        self.indice = {q: i for i, q in enumerate(self.nodos)}
+        self.vectores = vectores
+
+    @classmethod
+    def desde_grafo(cls, gd, dimension=64, paseos_por_nodo=10, largo=40, ventana=5, p=1.0, q=1.0,
+                    procesos=None, pesos_dimension=None, semilla=42):
+        A = gd.adyacencia(pesos_dimension, no_dirigida=True)
+        paseos = generar_paseos(A, paseos_por_nodo, largo, p, q, procesos, semilla)
+        return cls(gd.nodos, entrenar(coocurrencias(paseos, gd.n, ventana), dimension))
+
+    def vecinos(self, qid, k=10):
+        """Series QID -> similitud coseno de los k nodos más cercanos a qid (descendente)"""
+        i = self.indice[qid]
+        coseno = np.asarray(self.vectores @ self.vectores[i], dtype=np.float64)
+        coseno[i] = -np.inf
+        k = min(k, len(coseno) - 1)
+        top = np.argpartition(-coseno, k - 1)[:k] if k > 0 else np.zeros(0, dtype=np.int64)
+        top = top[np.argsort(-coseno[top], kind='stable')]
+        return pd.Series(coseno[top], index=pd.Index([self.nodos[j] for j in top], name='nodo_id'), name='coseno')
+
+    def guardar(self, ruta):
+        """Vectores en .npy (mapeable en memoria) y tabla de QIDs en .nodos.npy"""
+        ruta = Path(ruta)
+        np.save(ruta, np.ascontiguousarray(self.vectores, dtype=np.float32))
+        np.save(ruta.with_suffix(".nodos.npy"), np.array(self.nodos))
+
+    @classmethod
+    def cargar(cls, ruta, mmap=True):
+        ruta = Path(ruta)
+        vectores = np.load(ruta, mmap_mode='r' if mmap else None)
+        return cls(np.load(ruta.with_suffix(".nodos.npy")).tolist(), vectores)
+
+
+def ruta_embeddings(ruta_grafo):
+    """Los vectores se guardan junto al grafo: grafo_combinado.pkl -> grafo_combinado.embeddings.npy"""
+    return Path(ruta_grafo).with_suffix(".embeddings.npy")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Embeddings de nodos por paseos aleatorios y vecinos más cercanos")
+    ap.add_argument("qids", nargs="*", help="QIDs a consultar (sin QIDs solo se entrena)")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--k", type=int, default=10, help="Nº de vecinos por consulta (default: 10)")
+    ap.add_argument("--dimension", type=int, default=64)
+    ap.add_argument("--paseos", type=int, default=10, help="Paseos por nodo (default: 10)")
+    ap.add_argument("--largo", type=int, default=40, help="Largo de cada paseo (default: 40)")
+    ap.add_argument("--ventana", type=int, default=5)
+    ap.add_argument("--p", type=float, default=1.0, help="node2vec: parámetro de retorno (default: 1)")
+    ap.add_argument("--q", type=float, default=1.0, help="node2vec: parámetro de entrada-salida (default: 1)")
+    ap.add_argument("--procesos", type=int, default=None, help="Procesos para los paseos (default: todos)")
+    ap.add_argument("--reentrenar", action="store_true", help="Ignorar los vectores guardados")
+    args = ap.parse_args()
+
+    ruta = ruta_embeddings(args.grafo)
+    with open(args.grafo, 'rb') as f:
+        gd = GrafoDisperso.desde_networkx(pickle.load(f))
+
+    embeddings = None
+    if ruta.exists() and not args.reentrenar:
+        embeddings = Embeddings.cargar(ruta)
+        if embeddings.nodos != gd.nodos:
+            embeddings = None
+    if embeddings is None:
+        inicio = time.perf_counter()
+        embeddings = Embeddings.desde_grafo(gd, args.dimension, args.paseos, args.largo, args.ventana,
+                                            args.p, args.q, args.procesos)
+        embeddings.guardar(ruta)
+        print(f"💾 Embeddings ({gd.n} x {args.dimension}) en {time.perf_counter() - inicio:.2f}s: {ruta}")
+
+    for qid in args.qids:
+        if qid not in embeddings.indice:
+            print(f"⚠️  {qid} no está en el grafo")
+            continue
+        print(f"\n🧭 Más cercanos a {qid}:")
+        for i, (nodo, coseno) in enumerate(embeddings.vecinos(qid, args.k).items(), 1):
+            print(f"   {i:2d}. {nodo}: {coseno:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+estadisticas_flujo.py - Estadísticas aproximadas de una pasada sobre un flujo de aristas
+
+Antes de lanzar unir_grafos.py sobre un crawl grande conviene un bosquejo
+rápido. Las aristas se leen por bloques (CSV, NDJSON o volcado JSON de
+Wikidata, con o sin .gz/.bz2), se hashean vectorizadamente y alimentan
+bosquejos de memoria acotada:
+  • HyperLogLog: nodos y aristas distintas (error ≈ 1.04/√2^p);
+  • Count-Min + candidatos: propiedades más frecuentes y nodos con más aristas;
+  • muestra de distintos por hash con umbral adaptativo: grados exactos de una
+    muestra uniforme de nodos, de la que salen los cuantiles;
+  • reservorio: aristas de ejemplo.
+Las aristas por dimensión se cuentan exactamente (son pocas categorías).
+
+Uso:
+    python estadisticas_flujo.py ../consulta_wiki/data/grafo_unificado_enlaces.csv
+    python estadisticas_flujo.py aristas.ndjson.gz --filas 500000
+    python estadisticas_flujo.py latest-all.json.bz2 --formato volcado
+"""
+
+import argparse
+import bz2
+import gzip
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grafo_disperso import DIMENSIONES_PROPIEDADES, mezclar
+
+COLUMNAS = ['source', 'target', 'property_id']      # como grafo_unificado_enlaces.csv
+MAXIMO = np.iinfo(np.uint64).max
+
+
+def hashear(valores):
+    """Hash uint64 vectorizado (SipHash de pandas) de un array de cadenas"""
+    return pd.util.hash_array(np.asarray(valores, dtype=object), categorize=False)
+
+
+class HyperLogLog:
+    """Cardinalidad aproximada con 2^p registros de un byte"""
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype=np.uint8)
+
+    def agregar(self, hashes):
+        bits = 64 - self.precision
+        indice = (hashes >> np.uint64(bits)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits) - 1)
+        # Posición del primer 1 en los `bits` bits restantes (resto < 2^53: frexp es exacto)
+        _, exponente = np.frexp(resto.astype(np.float64))
+        np.maximum.at(self.registros, indice, (bits + 1 - exponente).astype(np.uint8))
+
+    def unir(self, otro):
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        ceros = np.count_nonzero(self.registros == 0)
+        if estimacion <= 2.5 * m and ceros:
+            estimacion = m * np.log(m / ceros)       # conteo lineal en rango bajo
+        return float(estimacion)
+
+
+class CountMin:
+    """Frecuencias aproximadas (sobreestiman a lo sumo e/ancho · total) + candidatos a top-k"""
+    def __init__(self, ancho=1 << 16, profundidad=4, candidatos=200, semilla=42):
+        if ancho & (ancho - 1):
+            raise ValueError(f"ancho ({ancho}) debe ser potencia de 2")
+        self.ancho = ancho
+        self.tabla = np.zeros((profundidad, ancho), dtype=np.int64)
+        rng = np.random.default_rng(semilla)
+        self.multiplicadores = rng.integers(0, MAXIMO, profundidad, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self.capacidad = candidatos
+        self.candidatos = {}          # hash -> etiqueta
+        self.total = 0
+
+    def _columnas(self, hashes):
+        """Multiply-shift: una columna por fila de la tabla"""
+        with np.errstate(over='ignore'):
+            producto = hashes[None, :] * self.multiplicadores[:, None]
+        return (producto >> np.uint64(64 - self.ancho.bit_length() + 1)).astype(np.intp)
+
+    def agregar(self, hashes, etiquetas):
+        unicos, primero, cuentas = np.unique(hashes, return_index=True, return_counts=True)
+        for fila, columnas in zip(self.tabla, self._columnas(unicos)):
+            np.add.at(fila, columnas, cuentas)
+        self.total += len(hashes)
+
+        # Los más frecuentes del bloque compiten con los candidatos actuales
+        top = np.argsort(-cuentas, kind='stable')[:self.capacidad]
+        self.candidatos.update(zip(unicos[top].tolist(), np.asarray(etiquetas, dtype=object)[primero[top]]))
+        if len(self.candidatos) > 2 * self.capacidad:
+            self.candidatos = dict(self.mas_frecuentes(self.capacidad, claves=True))
+
+    def estimar(self, hashes):
+        columnas = self._columnas(np.asarray(hashes, dtype=np.uint64))
+        return np.take_along_axis(self.tabla, columnas, axis=1).min(axis=0)
+
+    def error(self):
+        """Cota del error aditivo (con probabilidad 1 - e^-profundidad)"""
+        return np.e / self.ancho * self.total
+
+    def mas_frecuentes(self, k=10, claves=False):
+        """[(etiqueta, frecuencia estimada)] de los k candidatos más frecuentes"""
+        if not self.candidatos:
+            return []
+        hashes = np.fromiter(self.candidatos, dtype=np.uint64, count=len(self.candidatos))
+        estimadas = self.estimar(hashes)
+        orden = np.argsort(-estimadas, kind='stable')[:k]
+        if claves:
+            return [(int(hashes[i]), self.candidatos[int(hashes[i])]) for i in orden]
+        return [(self.candidatos[int(hashes[i])], int(estimadas[i])) for i in orden]
+
+
+class MuestraDistintos:
+    """Muestra uniforme de nodos por hash (umbral que se reduce a la mitad al llenarse)
+
+    Un nodo entra si su hash no supera el umbral; como el umbral solo baja,
+    todo nodo que sigue en la muestra estuvo en ella desde su primera arista y
+    su conteo es exacto.
+    """
+    def __init__(self, capacidad=1 << 16):
+        self.capacidad = capacidad
+        self.umbral = MAXIMO
+        self.claves = np.zeros(0, dtype=np.uint64)
+        self.cuentas = np.zeros(0, dtype=np.int64)
+
+    def agregar(self, hashes):
+        dentro = hashes[hashes <= self.umbral]
+        claves, inversa = np.unique(np.concatenate([self.claves, dentro]), return_inverse=True)
+        pesos = np.concatenate([self.cuentas, np.ones(len(dentro), dtype=np.int64)])
+        self.claves, self.cuentas = claves, np.bincount(inversa, weights=pesos).astype(np.int64)
+        while len(self.claves) > self.capacidad:
+            self.umbral >>= np.uint64(1)
+            quedan = self.claves <= self.umbral
+            self.claves, self.cuentas = self.claves[quedan], self.cuentas[quedan]
+
+    def fraccion(self):
+        return (float(self.umbral) + 1) / 2.0 ** 64
+
+
+class Reservorio:
+    """k filas uniformes del flujo (algoritmo R, decidido por bloques)"""
+    def __init__(self, k=10, semilla=42):
+        self.k = k
+        self.filas = []
+        self.vistas = 0
+        self.rng = np.random.default_rng(semilla)
+
+    def agregar(self, bloque):
+        filas = bloque.to_numpy(dtype=object)
+        libres = min(self.k - len(self.filas), len(filas))
+        self.filas.extend(map(tuple, filas[:libres]))
+        resto = filas[libres:]
+        if len(resto):
+            posicion = self.vistas + libres + np.arange(len(resto))
+            ranura = self.rng.integers(0, posicion + 1)
+            for j, fila in zip(ranura[ranura < self.k], resto[ranura < self.k]):
+                self.filas[j] = tuple(fila)
+        self.vistas += len(filas)
+
+
+class BosquejoFlujo:
+    """Todos los bosquejos de un flujo de aristas (source, target, property_id)"""
+    def __init__(self, precision=14, ancho=1 << 16, muestra=1 << 16, ejemplos=10, semilla=42):
+        self.aristas = 0
+        self.nodos = HyperLogLog(precision)
+        self.aristas_distintas = HyperLogLog(precision)
+        self.propiedades = CountMin(ancho, semilla=semilla)
+        self.hubs = CountMin(ancho, semilla=semilla + 1)
+        self.grados = MuestraDistintos(muestra)
+        self.ejemplos = Reservorio(ejemplos, semilla)
+        self.dimensiones = Counter()
+
+    def agregar(self, bloque):
+        bloque = bloque[COLUMNAS].dropna(subset=['source', 'target']).fillna({'property_id': 'N/A'})
+        extremos = np.concatenate([bloque['source'].to_numpy(object), bloque['target'].to_numpy(object)])
+        h_extremos = hashear(extremos)
+        h_propiedades = hashear(bloque['property_id'])
+        h_origen, h_destino = np.split(h_extremos, 2)
+
+        self.aristas += len(bloque)
+        self.nodos.agregar(h_extremos)
+        self.aristas_distintas.agregar(mezclar(mezclar(h_origen) ^ h_destino) ^ h_propiedades)
+        self.propiedades.agregar(h_propiedades, bloque['property_id'].to_numpy(object))
+        self.hubs.agregar(h_extremos, extremos)
+        self.grados.agregar(h_extremos)
+        self.ejemplos.agregar(bloque)
+        self.dimensiones.update(bloque['property_id'].map(DIMENSIONES_PROPIEDADES).fillna('N/A').value_counts().to_dict())
+
+    def resumen(self, cuantiles=(0.5, 0.9, 0.99)):
+        nodos = self.nodos.estimar()
+        grados = self.grados.cuentas
+        return {
+            'aristas': self.aristas,
+            'aristas_distintas': self.aristas_distintas.estimar(),
+            'nodos': nodos,
+            'densidad': self.aristas / (nodos * (nodos - 1)) if nodos > 1 else 0.0,
+            'grado_medio': 2 * self.aristas / nodos if nodos else 0.0,
+            'grado_cuantiles': dict(zip(cuantiles, np.quantile(grados, cuantiles))) if len(grados) else {},
+            'grado_minimo': int(grados.min()) if len(grados) else 0,
+            'nodos_muestreados': len(grados),
+            'nodos_por_muestra': len(grados) / self.grados.fraccion(),
+        }
+
+
+def _abrir(ruta):
+    """Abre texto plano, .gz o .bz2 en streaming"""
+    sufijo = Path(ruta).suffix
+    abridor = {'.gz': gzip.open, '.bz2': bz2.open}.get(sufijo, open)
+    return abridor(ruta, 'rt', encoding='utf-8')
+
+
+def detectar_formato(ruta):
+    """'csv', 'ndjson' o 'volcado' según la extensión (ignorando .gz/.bz2)"""
+    ruta = Path(ruta)
+    if ruta.suffix in ('.gz', '.bz2'):
+        ruta = ruta.with_suffix('')
+    return {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}.get(ruta.suffix, 'volcado')
+
+
+def _bloques_volcado(ruta, filas):
+    """Aristas entidad -> entidad de un volcado JSON de Wikidata (una entidad por línea)"""
+    aristas = []
+    with _abrir(ruta) as f:
+        for linea in f:
+            linea = linea.strip().rstrip(',')
+            if len(linea) < 2:        # '[' y ']' del array
+                continue
+            entidad = json.loads(linea)
+            for propiedad, afirmaciones in entidad.get('claims', {}).items():
+                for afirmacion in afirmaciones:
+                    valor = afirmacion['mainsnak'].get('datavalue', {})
+                    if valor.get('type') == 'wikibase-entityid':
+                        aristas.append((entidad['id'], valor['value']['id'], propiedad))
+            if len(aristas) >= filas:
+                yield pd.DataFrame(aristas, columns=COLUMNAS)
+                aristas = []
+    if aristas:
+        yield pd.DataFrame(aristas, columns=COLUMNAS)
+
+
+def leer_aristas(ruta, formato=None, filas=1_000_000):
+    """Generador de DataFrames (source, target, property_id) de ~`filas` aristas"""
+    formato = formato or detectar_formato(ruta)
+    if formato == 'csv':
+        return pd.read_csv(ruta, usecols=COLUMNAS, dtype=str, chunksize=filas, encoding='utf-8-sig')
+    if formato == 'ndjson':
+        return pd.read_json(ruta, lines=True, dtype=False, chunksize=filas)
+    if formato == 'volcado':
+        return _bloques_volcado(ruta, filas)
+    raise ValueError(f"Formato desconocido: {formato}")
+
+
+def bosquejar(ruta, formato=None, filas=1_000_000, **opciones):
+    """Una pasada sobre el flujo; devuelve el BosquejoFlujo lleno"""
+    bosquejo = BosquejoFlujo(**opciones)
+    for bloque in leer_aristas(ruta, formato, filas):
+        bosquejo.agregar(bloque)
+    return bosquejo
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Estadísticas aproximadas de una pasada sobre un flujo de aristas")
+    ap.add_argument("ruta", help="Aristas en CSV, NDJSON o volcado JSON de Wikidata (admite .gz/.bz2)")
+    ap.add_argument("--formato", choices=['csv', 'ndjson', 'volcado'], default=None,
+                    help="Formato de entrada (default: según la extensión)")
+    ap.add_argument("--filas", type=int, default=1_000_000, help="Aristas por bloque (default: 1.000.000)")
+    ap.add_argument("--ejemplos", type=int, default=10, help="Aristas de ejemplo (default: 10)")
+    args = ap.parse_args()
+
+    inicio = time.perf_counter()
+    bosquejo = bosquejar(args.ruta, args.formato, args.filas, ejemplos=args.ejemplos)
+    segundos = time.perf_counter() - inicio
+    r = bosquejo.resumen()
+
+    print("\n1. 📈 ESTADÍSTICAS BÁSICAS (aproximadas)")
+    print("-" * 30)
+    print(f"• Aristas leídas: {r['aristas']:,}")
+    print(f"• Aristas distintas: ≈{r['aristas_distintas']:,.0f}")
+    print(f"• Nodos distintos: ≈{r['nodos']:,.0f} (±{1.04 / np.sqrt(2 ** bosquejo.nodos.precision):.1%})")
+    print(f"• Densidad: ≈{r['densidad']:.6f}")
+
+    print("\n4. 📊 DISTRIBUCIÓN DE GRADOS")
+    print("-" * 30)
+    print(f"• Grado promedio: ≈{r['grado_medio']:.2f}")
+    for q, valor in r['grado_cuantiles'].items():
+        print(f"• Percentil {q * 100:g}: {valor:.0f}")
+    print(f"• Grado mínimo: {r['grado_minimo']} (muestra de {r['nodos_muestreados']:,} nodos)")
+    print(f"• Nodos con más aristas (±{bosquejo.hubs.error():,.0f}):")
+    for nodo, grado in bosquejo.hubs.mas_frecuentes(10):
+        print(f"   {nodo}: ≈{grado:,}")
+
+    print("\n5. 🌐 ARISTAS POR DIMENSIÓN")
+    print("-" * 30)
+    for dim, count in bosquejo.dimensiones.most_common():
+        print(f"• {dim}: {count:,} aristas ({count / max(r['aristas'], 1) * 100:.1f}%)")
+
+    print("\n7. 🔗 PROPIEDADES MÁS FRECUENTES")
+    print("-" * 30)
+    print(f"Top propiedades (±{bosquejo.propiedades.error():,.0f}):")
+    for prop, count in bosquejo.propiedades.mas_frecuentes(10):
+        print(f"• {prop}: ≈{count:,} aristas")
+
+    print("\n🎲 Aristas de ejemplo (muestreo por reservorio):")
+    for origen, destino, propiedad in bosquejo.ejemplos.filas:
+        print(f"   {origen} --{propiedad}--> {destino}")
+
+    print(f"\n⏱️  {r['aristas']:,} aristas en {segundos:.2f}s ({r['aristas'] / max(segundos, 1e-9):,.0f} aristas/s)")
+
+
+if __name__ == "__main__":
+    main()
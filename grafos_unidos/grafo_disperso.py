@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+grafo_disperso.py - Representación dispersa (arrays de aristas + CSR) de los grafos de Wikidata
+
+Los QIDs se internan una sola vez en una tabla índice -> QID y las aristas se
+guardan como arrays numpy (origen, destino, código de dimensión). A partir de
+ahí las matrices de adyacencia scipy se construyen una vez y se cachean.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DIMENSION_DESCONOCIDA = 'N/A'
+# Dimensión de cada propiedad de Wikidata (las no listadas son DIMENSION_DESCONOCIDA)
+DIMENSIONES_PROPIEDADES = {
+    'P17': 'Geográfica', 'P131': 'Geográfica', 'P276': 'Geográfica', 'P625': 'Geográfica',
+    'P135': 'Cultural', 'P361': 'Cultural', 'P921': 'Cultural', 'P136': 'Cultural',
+    'P31': 'Identidad', 'P495': 'Identidad',
+    'P1435': 'Patrimonio', 'P2184': 'Patrimonio', 'P8415': 'Patrimonio',
+    'P571': 'Temporal', 'P585': 'Temporal', 'P580': 'Temporal',
+    'P112': 'Social', 'P710': 'Social', 'P127': 'Social',
+    'P140': 'Religioso', 'P417': 'Religioso', 'P2925': 'Religioso',
+    'P18': 'Digital', 'P856': 'Digital', 'P953': 'Digital'
+}
+# Sufijo propio del formato binario: los índices que se guardan junto a cada
+# grafo (.disposicion.npz, .metricas.npz, .minhash.npz...) también son .npz
+SUFIJO_GRAFO = ".grafo.npz"
+
+
+class GrafoDisperso:
+    def __init__(self, nodos, origen, destino, dimension_arista=None, dimensiones=None):
+        self.nodos = list(nodos)                                   # índice -> QID
+        self.indice = {q: i for i, q in enumerate(self.nodos)}     # QID -> índice
+        self.origen = np.asarray(origen, dtype=np.int32)
+        self.destino = np.asarray(destino, dtype=np.int32)
+        self.dimensiones = list(dimensiones) if dimensiones else [DIMENSION_DESCONOCIDA]
+        if dimension_arista is None:
+            dimension_arista = np.zeros(len(self.origen), dtype=np.int16)
+        self.dimension_arista = np.asarray(dimension_arista, dtype=np.int16)
+        self._adyacencias = {}
+
+    @classmethod
+    def desde_networkx(cls, grafo, atributo_dimension='dimension'):
+        """Construye la representación dispersa desde un grafo networkx (Di/Multi)"""
+        nodos = list(grafo.nodes())
+        indice = {q: i for i, q in enumerate(nodos)}
+        dimensiones = [DIMENSION_DESCONOCIDA]
+        codigos = {DIMENSION_DESCONOCIDA: 0}
+
+        m = grafo.number_of_edges()
+        origen = np.empty(m, dtype=np.int32)
+        destino = np.empty(m, dtype=np.int32)
+        dimension_arista = np.empty(m, dtype=np.int16)
+        for k, (u, v, data) in enumerate(grafo.edges(data=True)):
+            dim = data.get(atributo_dimension) or DIMENSION_DESCONOCIDA
+            codigo = codigos.get(dim)
+            if codigo is None:
+                codigo = codigos[dim] = len(dimensiones)
+                dimensiones.append(dim)
+            origen[k] = indice[u]
+            destino[k] = indice[v]
+            dimension_arista[k] = codigo
+
+        return cls(nodos, origen, destino, dimension_arista, dimensiones)
+
+    @classmethod
+    def desde_aristas(cls, nodos, aristas):
+        """Construye la representación dispersa desde QIDs y tuplas (origen, destino, dimension)"""
+        indice = {q: i for i, q in enumerate(nodos)}
+        dimensiones = [DIMENSION_DESCONOCIDA]
+        codigos = {DIMENSION_DESCONOCIDA: 0}
+        origen, destino, dimension_arista = [], [], []
+        for u, v, dim in aristas:
+            dim = dim or DIMENSION_DESCONOCIDA
+            if dim not in codigos:
+                codigos[dim] = len(dimensiones)
+                dimensiones.append(dim)
+            origen.append(indice[u])
+            destino.append(indice[v])
+            dimension_arista.append(codigos[dim])
+        return cls(nodos, origen, destino, dimension_arista, dimensiones)
+
+    def guardar(self, filename):
+        """Formato binario (.grafo.npz, ver ruta_grafo_disperso): tabla de nodos y arrays de aristas tal cual"""
+        np.savez_compressed(filename, nodos=np.array(self.nodos, dtype=str), origen=self.origen,
+                            destino=self.destino, dimension_arista=self.dimension_arista,
+                            dimensiones=np.array(self.dimensiones, dtype=str))
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        return cls(datos['nodos'].tolist(), datos['origen'], datos['destino'],
+                   datos['dimension_arista'], datos['dimensiones'].tolist())
+
+    @staticmethod
+    def es_grafo(ruta):
+        """True si la ruta tiene el sufijo del formato binario (y no es un índice .npz junto a un grafo)"""
+        return Path(ruta).name.endswith(SUFIJO_GRAFO)
+
+    @property
+    def n(self):
+        return len(self.nodos)
+
+    @property
+    def m(self):
+        return len(self.origen)
+
+    def pesos_aristas(self, pesos_dimension=None):
+        """Peso de cada arista según su dimensión (1.0 para dimensiones no listadas)"""
+        if not pesos_dimension:
+            return np.ones(self.m, dtype=np.float64)
+        por_codigo = np.array([float(pesos_dimension.get(d, 1.0)) for d in self.dimensiones])
+        return por_codigo[self.dimension_arista]
+
+    def adyacencia(self, pesos_dimension=None, no_dirigida=False):
+        """Matriz CSR n x n (fila = origen). Las aristas paralelas suman su peso."""
+        clave = (tuple(sorted((pesos_dimension or {}).items())), no_dirigida)
+        A = self._adyacencias.get(clave)
+        if A is not None:
+            return A
+
+        pesos = self.pesos_aristas(pesos_dimension)
+        filas, columnas = self.origen, self.destino
+        if no_dirigida:
+            filas = np.concatenate([self.origen, self.destino])
+            columnas = np.concatenate([self.destino, self.origen])
+            pesos = np.concatenate([pesos, pesos])
+        A = sp.csr_matrix((pesos, (filas, columnas)), shape=(self.n, self.n))
+        A.sum_duplicates()
+        self._adyacencias[clave] = A
+        return A
+
+
+def mezclar(x):
+    """Finalizador splitmix64 (uint64 -> uint64, aritmética módulo 2^64)"""
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def huella(gd):
+    """Hash del conjunto de nodos y de aristas no dirigidas (independiente del orden)
+
+    La usan la caché de disposicion y el índice MinHash de similitud para saber
+    si un grafo guardado cambió.
+    """
+    h_nodos = pd.util.hash_array(np.array([str(q) for q in gd.nodos], dtype=object), categorize=False)
+    u, v = h_nodos[gd.origen], h_nodos[gd.destino]
+    h_aristas = mezclar(np.minimum(u, v)) ^ np.maximum(u, v)
+    return hashlib.blake2b(np.sort(h_nodos).tobytes() + np.unique(h_aristas).tobytes(), digest_size=16).hexdigest()
+
+
+def ruta_grafo_disperso(ruta):
+    """Ruta del formato binario junto a otro grafo: grafo_combinado.pkl -> grafo_combinado.grafo.npz"""
+    return Path(ruta).with_suffix(SUFIJO_GRAFO)
@@ -9,6 +9,11 @@ import pandas as pd
 from SPARQLWrapper import SPARQLWrapper, JSON
 import matplotlib.pyplot as plt
 
+from grafo_disperso import DIMENSIONES_PROPIEDADES
+from disposicion import disposicion, ruta_disposicion
+from vista_agregada import dibujar_vista_agregada, NODOS_VISTA_DETALLADA
+
+
 class GrafoManager:
     def __init__(self, entidad_wikidata):
         self.entidad_wikidata = entidad_wikidata
@@ -17,17 +22,7 @@ class GrafoManager:
         
     def determinar_dimension(self, propiedad):
         """Determina la dimensión basada en la propiedad"""
-        dimensiones_propiedades = {
-            'P17': 'Geográfica', 'P131': 'Geográfica', 'P276': 'Geográfica', 'P625': 'Geográfica',
-            'P135': 'Cultural', 'P361': 'Cultural', 'P921': 'Cultural', 'P136': 'Cultural',
-            'P31': 'Identidad', 'P495': 'Identidad',
-            'P1435': 'Patrimonio', 'P2184': 'Patrimonio', 'P8415': 'Patrimonio',
-            'P571': 'Temporal', 'P585': 'Temporal', 'P580': 'Temporal',
-            'P112': 'Social', 'P710': 'Social', 'P127': 'Social',
-            'P140': 'Religioso', 'P417': 'Religioso', 'P2925': 'Religioso',
-            'P18': 'Digital', 'P856': 'Digital', 'P953': 'Digital'
-        }
-        return dimensiones_propiedades.get(propiedad, 'N/A')
+        return DIMENSIONES_PROPIEDADES.get(propiedad, 'N/A')
     
     def ejecutar_consulta_wikidata(self, query):
         """Ejecuta consulta SPARQL a Wikidata"""
@@ -135,14 +130,26 @@ class GrafoManager:
         print(f"✓ Resultados exportados a: {filename}")
         return df_nodes
     
-    def visualizar_grafo(self, filename=None):
-        """Visualiza y guarda el grafo"""
+    def visualizar_grafo(self, filename=None, agrupar=None, expandir=()):
+        """Visualiza y guarda el grafo
+
+        agrupar: 'dimension' o 'comunidad' para la vista agregada (super-nodos);
+        por defecto se usa 'dimension' si el grafo supera NODOS_VISTA_DETALLADA.
+        """
         if filename is None:
             filename = f"grafo_{self.q_id}.png"
+        if agrupar is None and self.grafo.number_of_nodes() > NODOS_VISTA_DETALLADA:
+            agrupar = 'dimension'
         
         try:
+            if agrupar:
+                dibujar_vista_agregada(self.grafo, filename, agrupar, expandir,
+                                       titulo=f'Grafo de {self.q_id} en Wikidata (2do grado), por {agrupar}\n')
+                print(f"✓ Visualización agregada por {agrupar} guardada como: {filename}")
+                return
+            
             plt.figure(figsize=(16, 14))
-            pos = nx.spring_layout(self.grafo, k=1, iterations=50)
+            pos = disposicion(self.grafo, cache=ruta_disposicion(f"grafo_{self.q_id}.pkl"))
             
             node_colors = []
             node_sizes = []
@@ -183,12 +190,17 @@ class GrafoManager:
         return filename
 
 # Función de conveniencia
-def crear_y_guardar_grafo(q_id):
-    """Función helper para crear y guardar grafo"""
+def crear_y_guardar_grafo(q_id, visualizar=True):
+    """Función helper para crear y guardar grafo
+
+    visualizar=False deja el dibujo para render_lote.py, que renderiza
+    muchas semillas en paralelo.
+    """
     manager = GrafoManager(q_id)
     if manager.crear_grafo_grado2():
         manager.exportar_a_csv()
-        manager.visualizar_grafo()
+        if visualizar:
+            manager.visualizar_grafo()
         manager.guardar_pkl()
         return manager
     return None
\ No newline at end of file
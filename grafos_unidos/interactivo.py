@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+interactivo.py - Exportación HTML/WebGL interactiva con datos binarios por trozos
+
+Un solo archivo .html, abrible con file:// y sin dependencias, con búsqueda,
+zoom, desplazamiento y detalle del nodo bajo el cursor. Los datos no van como
+JSON sino como trozos binarios (typed arrays little-endian en base64) dentro
+de etiquetas <script type="application/octet-stream">:
+    posiciones     Float32 (n x 2), layout ya calculado en Python
+    grupo          Uint8/Uint16: código de dimensión (diccionario aparte)
+    tamano         Uint8: radio del nodo en px
+    aristas.k      Uint32 (pares origen, destino), TROZO_ARISTAS aristas por trozo
+    etiquetas      Uint32: código en el diccionario de etiquetas
+    *_dic / ids    texto UTF-8 separado por saltos de línea
+El navegador decodifica primero los nodos (se dibujan de inmediato), luego
+las aristas trozo a trozo y por último etiquetas e ids, cediendo el hilo
+entre trozos para que la página responda desde el primer momento.
+
+Uso:
+    python interactivo.py --benchmark      # 100k nodos / 300k aristas sintéticos
+    (desde un grafo: python ../consulta_wiki/visualizar_grafo.py -i data/grafo_unificado.json --html)
+"""
+
+import argparse
+import base64
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TROZO_ARISTAS = 65_536
+PALETA = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f",
+          "#bcbd22", "#17becf", "#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94"]
+
+
+def _trozo(nombre, datos):
+    """<script> con un array (typed array en el navegador) o un texto UTF-8, en base64"""
+    if isinstance(datos, str):
+        tipo, crudo = "texto", datos.encode("utf-8")
+    else:
+        datos = np.ascontiguousarray(datos)
+        datos = datos.astype(datos.dtype.newbyteorder("<"), copy=False)
+        tipo = {"f4": "f32", "u4": "u32", "u2": "u16", "u1": "u8"}[datos.dtype.str.lstrip("<|")]
+        crudo = datos.tobytes()
+    codificado = base64.b64encode(crudo).decode("ascii")
+    return f'<script type="application/octet-stream" data-nombre="{nombre}" data-tipo="{tipo}">{codificado}</script>\n'
+
+
+def _diccionario(valores):
+    """(códigos, texto del diccionario): cada valor distinto aparece una sola vez"""
+    codigos, unicos = pd.factorize(pd.Series(valores, dtype=object).fillna("").astype(str), sort=False)
+    texto = "\n".join(u.replace("\n", " ") for u in unicos)
+    tipo = np.uint8 if len(unicos) <= 0xFF else np.uint16 if len(unicos) <= 0xFFFF else np.uint32
+    return codigos.astype(tipo), texto
+
+
+def trozos_grafo(P, origen, destino, etiquetas=None, grupos=None, ids=None, tamanos=None):
+    """Lista de etiquetas <script> en el orden de carga del visor"""
+    n = len(P)
+    P = np.asarray(P, dtype=np.float64)
+    if n:
+        P = P - (P.min(axis=0) + P.max(axis=0)) / 2
+        P = P / max(np.abs(P).max(), 1e-12)
+    grupo, grupos_dic = _diccionario(grupos if grupos is not None else [""] * n)
+    tamanos = np.full(n, 3) if tamanos is None else np.asarray(tamanos)
+    pares = np.column_stack([origen, destino]).astype(np.uint32)
+
+    trozos = [_trozo("posiciones", P.astype("<f4")),
+              _trozo("grupo", grupo),
+              _trozo("grupos_dic", grupos_dic),
+              _trozo("tamano", np.clip(np.rint(tamanos), 1, 255).astype(np.uint8))]
+    for i in range(0, len(pares), TROZO_ARISTAS):
+        trozos.append(_trozo(f"aristas.{i // TROZO_ARISTAS}", pares[i:i + TROZO_ARISTAS]))
+    codigos, etiquetas_dic = _diccionario(etiquetas if etiquetas is not None else [""] * n)
+    trozos += [_trozo("etiquetas", codigos),
+               _trozo("etiquetas_dic", etiquetas_dic)]
+    if ids is not None:
+        trozos.append(_trozo("ids", "\n".join(map(str, ids))))
+    return trozos
+
+
+def exportar_html(ruta, P, origen, destino, etiquetas=None, grupos=None, ids=None, tamanos=None, titulo="Grafo"):
+    """Escribe el visor interactivo autocontenido; devuelve la ruta"""
+    config = dict(titulo=titulo, nodos=len(P), aristas=len(origen), paleta=PALETA)
+    html = VISOR_HTML.replace("__TITULO__", titulo.replace("<", "&lt;"))
+    html = html.replace("__CONFIG__", json.dumps(config, ensure_ascii=False).replace("</", "<\\/"))
+    html = html.replace("__TROZOS__", "".join(trozos_grafo(P, origen, destino, etiquetas, grupos, ids, tamanos)))
+    ruta = Path(ruta)
+    ruta.write_text(html, encoding="utf-8")
+    return ruta
+
+
+VISOR_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>__TITULO__</title>
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; background: #fff; font-family: sans-serif; }
+  canvas { position: absolute; inset: 0; width: 100%; height: 100%; cursor: grab; }
+  #panel { position: absolute; left: 8px; top: 8px; background: rgba(255,255,255,.92); padding: 6px 8px;
+           font-size: 13px; border-radius: 4px; box-shadow: 0 1px 4px rgba(0,0,0,.2); max-width: 340px; }
+  #buscar { width: 100%; box-sizing: border-box; margin-top: 4px; }
+  #resultados div { cursor: pointer; padding: 1px 0; }
+  #resultados div:hover { text-decoration: underline; }
+  #leyenda span { display: inline-block; margin-right: 8px; white-space: nowrap; }
+  #leyenda i { display: inline-block; width: 10px; height: 10px; border-radius: 5px; margin-right: 3px; }
+  #detalle { position: absolute; pointer-events: none; background: #fff; border: 1px solid #999;
+             padding: 2px 5px; font-size: 12px; display: none; border-radius: 3px; }
+</style>
+</head>
+<body>
+<canvas id="lienzo"></canvas>
+<div id="panel">
+  <b id="titulo"></b><div id="estado">Cargando…</div>
+  <input id="buscar" placeholder="Buscar etiqueta o QID…" disabled>
+  <div id="resultados"></div>
+  <div id="leyenda"></div>
+</div>
+<div id="detalle"></div>
+__TROZOS__
+<script>
+const CONFIG = __CONFIG__;
+const lienzo = document.getElementById('lienzo');
+const gl = lienzo.getContext('webgl', { antialias: true });
+const estado = document.getElementById('estado');
+document.getElementById('titulo').textContent = CONFIG.titulo;
+
+// ---- Trozos binarios ----
+const TIPOS = { f32: Float32Array, u32: Uint32Array, u16: Uint16Array, u8: Uint8Array };
+function decodificar(script) {
+  const binario = atob(script.textContent);
+  const bytes = new Uint8Array(binario.length);
+  for (let i = 0; i < binario.length; i++) bytes[i] = binario.charCodeAt(i);
+  const tipo = script.dataset.tipo;
+  if (tipo === 'texto') return new TextDecoder().decode(bytes).split('\\n');
+  return new TIPOS[tipo](bytes.buffer);
+}
+const trozos = Array.from(document.querySelectorAll('script[type="application/octet-stream"]'));
+const datos = {};
+function trozo(nombre) { return decodificar(trozos.find(s => s.dataset.nombre === nombre)); }
+const ceder = () => new Promise(r => setTimeout(r, 0));
+
+// ---- WebGL ----
+function programa(vertice, fragmento) {
+  const p = gl.createProgram();
+  for (const [tipo, codigo] of [[gl.VERTEX_SHADER, vertice], [gl.FRAGMENT_SHADER, fragmento]]) {
+    const s = gl.createShader(tipo);
+    gl.shaderSource(s, codigo); gl.compileShader(s); gl.attachShader(p, s);
+  }
+  gl.linkProgram(p);
+  return p;
+}
+const pNodos = programa(`
+  attribute vec2 p; attribute float g; attribute float s;
+  uniform vec2 centro; uniform vec2 escala; uniform float zoom; uniform vec3 paleta[16];
+  varying vec3 color;
+  void main() {
+    gl_Position = vec4((p - centro) * escala, 0.0, 1.0);
+    gl_PointSize = max(2.0, s * sqrt(min(zoom, 16.0)));
+    color = paleta[int(mod(g, 16.0))];
+  }`, `
+  precision mediump float; varying vec3 color;
+  void main() {
+    vec2 d = gl_PointCoord - 0.5; float r = length(d);
+    if (r > 0.5) discard;
+    gl_FragColor = vec4(r > 0.38 ? color * 0.55 : color, 1.0);
+  }`);
+const pAristas = programa(`
+  attribute vec2 p; uniform vec2 centro; uniform vec2 escala;
+  void main() { gl_Position = vec4((p - centro) * escala, 0.0, 1.0); }`, `
+  precision mediump float; uniform vec4 color;
+  void main() { gl_FragColor = color; }`);
+
+function buffer(array) {
+  const b = gl.createBuffer();
+  gl.bindBuffer(gl.ARRAY_BUFFER, b); gl.bufferData(gl.ARRAY_BUFFER, array, gl.STATIC_DRAW);
+  return b;
+}
+function atributo(prog, nombre, b, tam) {
+  const a = gl.getAttribLocation(prog, nombre);
+  gl.bindBuffer(gl.ARRAY_BUFFER, b); gl.enableVertexAttribArray(a);
+  gl.vertexAttribPointer(a, tam, gl.FLOAT, false, 0, 0);
+}
+const paleta = new Float32Array(CONFIG.paleta.flatMap(h => [1, 3, 5].map(i => parseInt(h.substr(i, 2), 16) / 255)));
+
+// ---- Vista ----
+let centro = [0, 0], zoom = 1, seleccion = -1;
+const bufAristas = [];
+let bufNodos = null;
+function escala() {
+  const r = Math.min(lienzo.width, lienzo.height) * 0.95;
+  return [zoom * r / lienzo.width, zoom * r / lienzo.height];
+}
+function uniformes(prog) {
+  gl.useProgram(prog);
+  gl.uniform2fv(gl.getUniformLocation(prog, 'centro'), centro);
+  gl.uniform2fv(gl.getUniformLocation(prog, 'escala'), escala());
+}
+let pendiente = false;
+function redibujar() {
+  if (pendiente) return;
+  pendiente = true;
+  requestAnimationFrame(() => {
+    pendiente = false;
+    gl.viewport(0, 0, lienzo.width, lienzo.height);
+    gl.clearColor(1, 1, 1, 1); gl.clear(gl.COLOR_BUFFER_BIT);
+    gl.enable(gl.BLEND); gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+    uniformes(pAristas);
+    const alpha = Math.min(0.5, Math.max(0.04, 20000 / Math.max(CONFIG.aristas, 1) * zoom));
+    gl.uniform4f(gl.getUniformLocation(pAristas, 'color'), 0, 0, 0, alpha);
+    for (const [b, k] of bufAristas) { atributo(pAristas, 'p', b, 2); gl.drawArrays(gl.LINES, 0, k); }
+    if (!bufNodos) return;
+    uniformes(pNodos);
+    gl.uniform1f(gl.getUniformLocation(pNodos, 'zoom'), zoom * devicePixelRatio);
+    gl.uniform3fv(gl.getUniformLocation(pNodos, 'paleta'), paleta);
+    atributo(pNodos, 'p', bufNodos.p, 2); atributo(pNodos, 'g', bufNodos.g, 1); atributo(pNodos, 's', bufNodos.s, 1);
+    gl.drawArrays(gl.POINTS, 0, CONFIG.nodos);
+    if (seleccion >= 0) {
+      const u = gl.getAttribLocation(pNodos, 's');
+      gl.disableVertexAttribArray(u); gl.vertexAttrib1f(u, 3 * datos.tamano[seleccion] + 6);
+      gl.drawArrays(gl.POINTS, seleccion, 1);
+    }
+  });
+}
+function ajustar() {
+  lienzo.width = innerWidth * devicePixelRatio; lienzo.height = innerHeight * devicePixelRatio;
+  redibujar();
+}
+function mundo(x, y) {
+  const [ex, ey] = escala();
+  return [centro[0] + (2 * x * devicePixelRatio / lienzo.width - 1) / ex,
+          centro[1] - (2 * y * devicePixelRatio / lienzo.height - 1) / ey];
+}
+
+lienzo.addEventListener('wheel', (e) => {
+  e.preventDefault();
+  const antes = mundo(e.clientX, e.clientY);
+  zoom = Math.min(Math.max(zoom * Math.exp(-e.deltaY * 0.0015), 0.2), 5000);
+  const despues = mundo(e.clientX, e.clientY);
+  centro = [centro[0] + antes[0] - despues[0], centro[1] + antes[1] - despues[1]];
+  redibujar();
+}, { passive: false });
+let arrastre = null;
+lienzo.addEventListener('pointerdown', (e) => { arrastre = mundo(e.clientX, e.clientY); lienzo.style.cursor = 'grabbing'; });
+addEventListener('pointerup', () => { arrastre = null; lienzo.style.cursor = 'grab'; });
+addEventListener('pointermove', (e) => {
+  if (arrastre) {
+    const ahora = mundo(e.clientX, e.clientY);
+    centro = [centro[0] + arrastre[0] - ahora[0], centro[1] + arrastre[1] - ahora[1]];
+    redibujar();
+  } else mostrarDetalle(e);
+});
+addEventListener('resize', ajustar);
+
+// ---- Rejilla para el nodo bajo el cursor ----
+const CELDAS = 256;
+let rejilla = null;
+function construirRejilla() {
+  const P = datos.posiciones;
+  const clave = new Uint32Array(CONFIG.nodos);
+  for (let i = 0; i < CONFIG.nodos; i++) {
+    const cx = Math.min(CELDAS - 1, Math.floor((P[2 * i] + 1) / 2 * CELDAS));
+    const cy = Math.min(CELDAS - 1, Math.floor((P[2 * i + 1] + 1) / 2 * CELDAS));
+    clave[i] = cx * CELDAS + cy;
+  }
+  const orden = new Uint32Array(CONFIG.nodos).map((_, i) => i).sort((a, b) => clave[a] - clave[b]);
+  const inicio = new Uint32Array(CELDAS * CELDAS + 1);
+  for (let i = 0; i < CONFIG.nodos; i++) inicio[clave[i] + 1]++;
+  for (let c = 0; c < CELDAS * CELDAS; c++) inicio[c + 1] += inicio[c];
+  rejilla = { orden, inicio };
+}
+function nodoEn(x, y) {
+  if (!rejilla) return -1;
+  const [wx, wy] = mundo(x, y);
+  const radio = 8 / (escala()[0] * lienzo.width / 2) * devicePixelRatio;   // 8 px en unidades del mundo
+  const P = datos.posiciones;
+  let mejor = -1, dmin = radio * radio;
+  const c0 = Math.max(0, Math.floor((wx - radio + 1) / 2 * CELDAS)), c1 = Math.min(CELDAS - 1, Math.floor((wx + radio + 1) / 2 * CELDAS));
+  const f0 = Math.max(0, Math.floor((wy - radio + 1) / 2 * CELDAS)), f1 = Math.min(CELDAS - 1, Math.floor((wy + radio + 1) / 2 * CELDAS));
+  for (let cx = c0; cx <= c1; cx++) for (let cy = f0; cy <= f1; cy++) {
+    const c = cx * CELDAS + cy;
+    for (let k = rejilla.inicio[c]; k < rejilla.inicio[c + 1]; k++) {
+      const i = rejilla.orden[k], dx = P[2 * i] - wx, dy = P[2 * i + 1] - wy, d = dx * dx + dy * dy;
+      if (d < dmin) { dmin = d; mejor = i; }
+    }
+  }
+  return mejor;
+}
+const detalle = document.getElementById('detalle');
+function texto(i) {
+  const partes = [];
+  if (datos.etiquetas) partes.push(datos.etiquetas_dic[datos.etiquetas[i]]);
+  if (datos.ids) partes.push(datos.ids[i]);
+  partes.push(datos.grupos_dic[datos.grupo[i]] || '');
+  return partes.filter(Boolean).join(' · ');
+}
+function mostrarDetalle(e) {
+  const i = nodoEn(e.clientX, e.clientY);
+  if (i < 0) { detalle.style.display = 'none'; return; }
+  detalle.textContent = texto(i);
+  detalle.style.left = (e.clientX + 12) + 'px'; detalle.style.top = (e.clientY + 12) + 'px';
+  detalle.style.display = 'block';
+}
+
+// ---- Búsqueda ----
+const buscar = document.getElementById('buscar'), resultados = document.getElementById('resultados');
+const normalizar = s => s.normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').toLowerCase();
+function ir(i) {
+  seleccion = i;
+  centro = [datos.posiciones[2 * i], datos.posiciones[2 * i + 1]];
+  zoom = Math.max(zoom, 8);
+  redibujar();
+}
+buscar.addEventListener('input', () => {
+  const q = normalizar(buscar.value.trim());
+  resultados.innerHTML = '';
+  if (q.length < 2) return;
+  // Primero el diccionario (cada etiqueta distinta una vez), luego los nodos de las que coinciden
+  const dic = datos.etiquetas_norm, coinciden = new Set();
+  for (let c = 0; c < dic.length; c++) if (dic[c].includes(q)) coinciden.add(c);
+  let mostrados = 0;
+  for (let i = 0; i < CONFIG.nodos && mostrados < 30; i++) {
+    if (!coinciden.has(datos.etiquetas[i]) && !(datos.ids && normalizar(datos.ids[i]) === q)) continue;
+    const fila = document.createElement('div');
+    fila.textContent = texto(i);
+    fila.onclick = () => ir(i);
+    resultados.appendChild(fila);
+    mostrados++;
+  }
+});
+
+// ---- Carga progresiva ----
+async function cargar() {
+  const t0 = performance.now();
+  ajustar();
+  for (const nombre of ['posiciones', 'grupo', 'grupos_dic', 'tamano']) datos[nombre] = trozo(nombre);
+  bufNodos = { p: buffer(datos.posiciones), g: buffer(Float32Array.from(datos.grupo)),
+               s: buffer(Float32Array.from(datos.tamano)) };
+  document.getElementById('leyenda').innerHTML = datos.grupos_dic.filter(Boolean).map((g, c) =>
+    `<span><i style="background:${CONFIG.paleta[datos.grupos_dic.indexOf(g) % 16]}"></i>${g}</span>`).join('');
+  redibujar();
+  estado.textContent = `${CONFIG.nodos} nodos; cargando aristas…`;
+  await ceder();
+
+  const P = datos.posiciones;
+  for (const s of trozos.filter(s => s.dataset.nombre.startsWith('aristas.'))) {
+    const pares = decodificar(s);
+    const segmentos = new Float32Array(pares.length * 2);
+    for (let k = 0; k < pares.length; k++) {
+      segmentos[2 * k] = P[2 * pares[k]];
+      segmentos[2 * k + 1] = P[2 * pares[k] + 1];
+    }
+    bufAristas.push([buffer(segmentos), pares.length]);
+    redibujar();
+    await ceder();
+  }
+  estado.textContent = `${CONFIG.nodos} nodos, ${CONFIG.aristas} aristas; cargando etiquetas…`;
+  await ceder();
+
+  datos.etiquetas = trozo('etiquetas');
+  datos.etiquetas_dic = trozo('etiquetas_dic');
+  datos.etiquetas_norm = datos.etiquetas_dic.map(normalizar);
+  if (trozos.some(s => s.dataset.nombre === 'ids')) datos.ids = trozo('ids');
+  construirRejilla();
+  buscar.disabled = false;
+  estado.textContent = `${CONFIG.nodos} nodos, ${CONFIG.aristas} aristas (${Math.round(performance.now() - t0)} ms)`;
+}
+cargar();
+</script>
+</body>
+</html>
+"""
+
+
+def benchmark(n=100_000, m=300_000, semilla=42):
+    """Tamaño y tiempo de escritura del HTML para una malla con aristas locales"""
+    import tempfile
+
+    rng = np.random.default_rng(semilla)
+    lado = int(np.sqrt(n))
+    P = np.column_stack([np.arange(n) % lado, np.arange(n) // lado]) + rng.normal(scale=0.5, size=(n, 2))
+    origen = rng.integers(0, n, m)
+    destino = np.clip(origen + rng.integers(-3, 4, m) + lado * rng.integers(-3, 4, m), 0, n - 1)
+    etiquetas = [f"entidad {i % 20_000}" for i in range(n)]
+    grupos = rng.choice(["Geográfica", "Cultural", "Religioso", "Patrimonio", "N/A"], n)
+    print(f"🧪 Benchmark HTML: {n:,} nodos, {m:,} aristas")
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        ruta = exportar_html(Path(carpeta) / "grafo.html", P, origen, destino, etiquetas, grupos,
+                             [f"Q{i}" for i in range(n)], tamanos=np.full(n, 3))
+        print(f"⏱️  {ruta.stat().st_size / 1e6:.1f} MB escritos en {time.perf_counter() - inicio:.2f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Exportación HTML/WebGL interactiva de un grafo")
+    ap.add_argument("--benchmark", action="store_true", help="Grafo sintético de 100k nodos / 300k aristas")
+    ap.add_argument("--nodos", type=int, default=100_000)
+    ap.add_argument("--aristas", type=int, default=300_000)
+    args = ap.parse_args()
+    if args.benchmark:
+        benchmark(args.nodos, args.aristas)
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
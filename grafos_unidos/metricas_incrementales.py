@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+metricas_incrementales.py - Métricas que se mantienen al agregar nodos y aristas
+
+Al profundizar se agregan pocos nodos a un grafo ya analizado. En lugar de
+recalcular todo:
+  • el grado (entrada/salida) se guarda sin normalizar y se actualiza solo en
+    los nodos tocados por las aristas nuevas; la centralidad de grado
+    (grado / (n - 1)) se obtiene al exportar con una operación vectorizada;
+  • el PageRank arranca en caliente desde la solución anterior, por lo que
+    converge en pocas iteraciones cuando el cambio es pequeño;
+  • el estado (aristas, grados y PageRank) se guarda junto al grafo base
+    (.metricas.npz) con la huella de ese archivo: la siguiente ejecución lo
+    carga tal cual y solo agrega las aristas que aún no tenía.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from centralidad import pagerank
+
+
+class _ArrayCreciente:
+    """Array numpy con capacidad que se duplica (append amortizado O(1))"""
+    def __init__(self, dtype, valores=()):
+        valores = np.asarray(valores, dtype=dtype)
+        self._datos = np.zeros(max(16, 2 * len(valores)), dtype=dtype)
+        self._datos[:len(valores)] = valores
+        self._n = len(valores)
+
+    def extender(self, valores):
+        valores = np.asarray(valores, dtype=self._datos.dtype)
+        requerido = self._n + len(valores)
+        if requerido > len(self._datos):
+            nuevos = np.zeros(max(requerido, 2 * len(self._datos)), dtype=self._datos.dtype)
+            nuevos[:self._n] = self._datos[:self._n]
+            self._datos = nuevos
+        self._datos[self._n:requerido] = valores
+        self._n = requerido
+
+    @property
+    def valores(self):
+        return self._datos[:self._n]
+
+    def __len__(self):
+        return self._n
+
+
+def _claves(origen, destino):
+    """Arista (i, j) -> entero único i·2^32 + j"""
+    return (np.asarray(origen, dtype=np.int64) << 32) | np.asarray(destino, dtype=np.int64)
+
+
+class MetricasIncrementales:
+    def __init__(self, nodos, origen=(), destino=(), pagerank_previo=None, grados=None, claves=None):
+        """grados (entrada, salida) y claves (aristas ordenadas) se pasan al cargar un estado guardado"""
+        self.nodos = list(nodos)
+        self.indice = {q: i for i, q in enumerate(self.nodos)}
+        self._origen = _ArrayCreciente(np.int32, origen)
+        self._destino = _ArrayCreciente(np.int32, destino)
+        # Aristas existentes como claves ordenadas (búsqueda binaria) + las agregadas después
+        self._claves = np.unique(_claves(self._origen.valores, self._destino.valores)) if claves is None else claves
+        self._claves_nuevas = set()
+
+        n = len(self.nodos)
+        if grados is None:
+            grados = (np.bincount(self._destino.valores, minlength=n), np.bincount(self._origen.valores, minlength=n))
+        self._grado_entrada = _ArrayCreciente(np.int64, grados[0])
+        self._grado_salida = _ArrayCreciente(np.int64, grados[1])
+        self._pagerank = None if pagerank_previo is None else np.asarray(pagerank_previo, dtype=np.float64)
+        self.huella = None      # huella del grafo base del que se partió (ver huella_archivo)
+
+    @classmethod
+    def desde_networkx(cls, grafo, pagerank_previo=None):
+        """pagerank_previo: dict QID -> valor (p.ej. la columna 'pagerank' de un CSV anterior)"""
+        nodos = list(grafo.nodes())
+        indice = {q: i for i, q in enumerate(nodos)}
+        origen = [indice[u] for u, v in grafo.edges()]
+        destino = [indice[v] for u, v in grafo.edges()]
+        previo = None
+        if pagerank_previo:
+            previo = np.array([pagerank_previo.get(q, 0.0) for q in nodos], dtype=np.float64)
+        return cls(nodos, origen, destino, previo)
+
+    @property
+    def n(self):
+        return len(self.nodos)
+
+    def _internar(self, qid):
+        i = self.indice.get(qid)
+        if i is None:
+            i = self.indice[qid] = len(self.nodos)
+            self.nodos.append(qid)
+            self._grado_entrada.extender([0])
+            self._grado_salida.extender([0])
+        return i
+
+    def agregar_aristas(self, aristas):
+        """Agrega aristas (origen, destino) por QID; devuelve los índices de nodos cuyo grado cambió"""
+        nuevas_u, nuevas_v = [], []
+        for u, v in aristas:
+            i, j = self._internar(u), self._internar(v)
+            clave = (i << 32) | j
+            if clave in self._claves_nuevas:
+                continue
+            k = np.searchsorted(self._claves, clave)
+            if k < len(self._claves) and self._claves[k] == clave:
+                continue
+            self._claves_nuevas.add(clave)
+            nuevas_u.append(i)
+            nuevas_v.append(j)
+
+        if not nuevas_u:
+            return np.zeros(0, dtype=np.int64)
+
+        self._origen.extender(nuevas_u)
+        self._destino.extender(nuevas_v)
+        np.add.at(self._grado_salida.valores, nuevas_u, 1)
+        np.add.at(self._grado_entrada.valores, nuevas_v, 1)
+        return np.unique(np.concatenate([nuevas_u, nuevas_v]))
+
+    def aristas(self):
+        """(origen, destino) como índices de nodos"""
+        return self._origen.valores, self._destino.valores
+
+    def grados(self):
+        return self._grado_entrada.valores, self._grado_salida.valores
+
+    def centralidad_grado(self):
+        """Igual que nx.degree_centrality sobre el grafo actual"""
+        entrada, salida = self.grados()
+        if self.n <= 1:
+            return np.ones(self.n)
+        return (entrada + salida) / (self.n - 1)
+
+    def pagerank(self, alpha=0.85, tol=1.0e-6, max_iter=100):
+        """PageRank del grafo actual; arranca desde la solución anterior si existe"""
+        A = sp.csr_matrix(
+            (np.ones(len(self._origen)), (self._origen.valores, self._destino.valores)),
+            shape=(self.n, self.n))
+
+        x0 = None
+        if self._pagerank is not None and self._pagerank.sum() > 0:
+            # Los nodos nuevos parten con la masa uniforme; se renormaliza dentro de pagerank()
+            x0 = np.full(self.n, 1.0 / self.n)
+            x0[:len(self._pagerank)] = self._pagerank[:self.n]
+
+        self._pagerank = pagerank(A, alpha=alpha, tol=tol, max_iter=max_iter, x0=x0)
+        return self._pagerank
+
+    def pagerank_actual(self):
+        """Último PageRank calculado (o el previo cargado), alineado con nodos; None si no hay"""
+        return self._pagerank
+
+    def guardar(self, filename):
+        entrada, salida = self.grados()
+        claves = np.union1d(self._claves, np.fromiter(self._claves_nuevas, dtype=np.int64))
+        np.savez_compressed(filename, nodos=np.array(self.nodos, dtype=str), origen=self._origen.valores,
+                            destino=self._destino.valores, grado_entrada=entrada, grado_salida=salida,
+                            claves=claves, huella=str(self.huella or ''),
+                            pagerank=np.zeros(0) if self._pagerank is None else self._pagerank)
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        pagerank = datos['pagerank'] if len(datos['pagerank']) else None
+        metricas = cls(datos['nodos'].tolist(), datos['origen'], datos['destino'], pagerank,
+                       grados=(datos['grado_entrada'], datos['grado_salida']), claves=datos['claves'])
+        metricas.huella = str(datos['huella']) or None
+        return metricas
+
+
+def huella_archivo(ruta):
+    """Hash del contenido del archivo del grafo base (cambia si se vuelve a descargar)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def ruta_metricas(ruta_grafo):
+    """El estado se guarda junto al grafo base: qoyllur_riti_grado2.json -> qoyllur_riti_grado2.metricas.npz"""
+    return Path(ruta_grafo).with_suffix(".metricas.npz")
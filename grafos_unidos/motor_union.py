@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+motor_union.py - Unión de N grafos semilla en una sola pasada
+
+Generaliza la unión de dos pickles con nx.compose: los QIDs de todos los
+grafos se internan en una única tabla, los atributos en conflicto se resuelven
+con reglas explícitas (REGLAS_POR_DEFECTO para nodos, REGLAS_ARISTAS para
+aristas; lo no listado gana el último valor, como en nx.compose) y se construye un índice de
+pertenencia nodo -> semillas como bitset (uint64), con el que los nodos
+compartidos entre cualquier par o subconjunto de semillas se cuentan con
+popcounts vectorizados.
+"""
+
+import numpy as np
+import networkx as nx
+
+# Prioridad de 'type' cuando un nodo tiene papeles distintos en cada semilla
+PRIORIDAD_TIPO = {'central': 0, 'intermediate': 1, 'target': 2}
+
+
+def _regla_tipo(actual, nuevo):
+    """Gana el papel más estructural (central > intermediate > target)"""
+    return min(actual, nuevo, key=lambda t: PRIORIDAD_TIPO.get(t, len(PRIORIDAD_TIPO)))
+
+
+def _regla_informativo(actual, nuevo):
+    """Se conserva el primer valor informativo; 'N/A' o vacío ceden ante uno real"""
+    if actual in (None, '', 'N/A'):
+        return nuevo
+    return actual
+
+
+def _regla_ultimo(actual, nuevo):
+    """Gana el valor de la última semilla (lo que hacía nx.compose)"""
+    return nuevo
+
+
+# atributo de nodo -> regla(actual, nuevo) -> valor; los no listados usan _regla_ultimo
+REGLAS_POR_DEFECTO = {
+    'type': _regla_tipo,
+    'dimension': _regla_informativo,
+    'label': _regla_informativo,
+    'prop_label': _regla_informativo,
+}
+# En las aristas 'label' es la propiedad (P47, P530...): una arista repetida
+# conserva la de la última semilla, como con nx.compose
+REGLAS_ARISTAS = {}
+
+
+def _popcount(palabras):
+    """Bits a 1 por elemento de un array uint64"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(palabras)
+    return np.unpackbits(palabras.view(np.uint8).reshape(*palabras.shape, 8), axis=-1).sum(axis=-1)
+
+
+class IndicePertenencia:
+    """Bitset nodo -> semillas: fila i = palabras uint64 con un bit por semilla"""
+    def __init__(self, nodos, semillas, bits):
+        self.nodos = list(nodos)
+        self.semillas = list(semillas)
+        self.bits = bits
+
+    def _mascara(self, semillas):
+        mascara = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for s in semillas:
+            k = self.semillas.index(s)
+            mascara[k // 64] |= np.uint64(1) << np.uint64(k % 64)
+        return mascara
+
+    def multiplicidad(self):
+        """Número de semillas a las que pertenece cada nodo"""
+        return _popcount(self.bits).sum(axis=1)
+
+    def en_todas(self, semillas):
+        """Máscara booleana de los nodos presentes en todas las semillas indicadas"""
+        mascara = self._mascara(semillas)
+        objetivo = int(_popcount(mascara).sum())
+        return _popcount(self.bits & mascara).sum(axis=1) == objetivo
+
+    def compartidos(self, semillas):
+        """Nodos presentes en todas las semillas del subconjunto"""
+        return int(self.en_todas(semillas).sum())
+
+    def matriz_compartidos(self):
+        """Matriz k x k de nodos compartidos por cada par (la diagonal = tamaño de cada semilla)"""
+        k = len(self.semillas)
+        # Los patrones de pertenencia distintos suelen ser pocos: se cuentan una vez
+        patrones, conteos = np.unique(self.bits, axis=0, return_counts=True)
+        columnas = np.arange(k)
+        B = ((patrones[:, columnas // 64] >> (columnas % 64).astype(np.uint64)) & np.uint64(1)).astype(np.int64)
+        return B.T @ (B * conteos[:, None])
+
+    def guardar(self, filename):
+        np.savez_compressed(filename, nodos=np.array(self.nodos), semillas=np.array(self.semillas), bits=self.bits)
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        return cls(datos['nodos'].tolist(), datos['semillas'].tolist(), datos['bits'])
+
+
+def unir_n_grafos(grafos, reglas=None, reglas_aristas=None):
+    """Une un dict semilla -> grafo en un nx.DiGraph nuevo; devuelve (grafo, IndicePertenencia)"""
+    reglas = {**REGLAS_POR_DEFECTO, **(reglas or {})}
+    reglas_aristas = {**REGLAS_ARISTAS, **(reglas_aristas or {})}
+    semillas = list(grafos)
+    palabras = max(1, (len(semillas) + 63) // 64)
+
+    indice = {}                 # QID -> id internado
+    atributos_nodo = []         # id -> dict
+    pertenencia = []            # id -> máscara de semillas (int de Python, un bit por semilla)
+    aristas = {}                # (id_u, id_v) -> dict
+
+    def fusionar(destino, origen, reglas):
+        for clave, valor in origen.items():
+            if clave in destino:
+                destino[clave] = reglas.get(clave, _regla_ultimo)(destino[clave], valor)
+            else:
+                destino[clave] = valor
+
+    for k, semilla in enumerate(semillas):
+        bit = 1 << k
+        grafo = grafos[semilla]
+
+        for nodo, data in grafo.nodes(data=True):
+            i = indice.get(nodo)
+            if i is None:
+                i = indice[nodo] = len(atributos_nodo)
+                atributos_nodo.append(dict(data))
+                pertenencia.append(0)
+            else:
+                fusionar(atributos_nodo[i], data, reglas)
+            pertenencia[i] |= bit
+
+        for u, v, data in grafo.edges(data=True):
+            clave = (indice[u], indice[v])
+            if clave in aristas:
+                fusionar(aristas[clave], data, reglas_aristas)
+            else:
+                aristas[clave] = dict(data)
+
+    nodos = list(indice)
+    combinado = nx.DiGraph()
+    combinado.add_nodes_from(zip(nodos, atributos_nodo))
+    combinado.add_edges_from((nodos[i], nodos[j], data) for (i, j), data in aristas.items())
+
+    # Máscaras -> palabras uint64 (columna w = bits 64w .. 64w+63)
+    bits = np.zeros((len(nodos), palabras), dtype=np.uint64)
+    for w in range(palabras):
+        bits[:, w] = [(m >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for m in pertenencia]
+    return combinado, IndicePertenencia(nodos, semillas, bits)
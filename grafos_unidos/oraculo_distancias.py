@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+oraculo_distancias.py - Índice de landmarks para consultas rápidas de distancia entre entidades
+
+Se eligen los nodos de mayor grado como landmarks y se hace un BFS desde cada
+uno; las distancias se guardan como arrays uint8/uint16 (L x n). Con la
+desigualdad triangular cada consulta devuelve cotas [inferior, superior] de la
+distancia en saltos en microsegundos, y el camino exacto se recupera con un
+BFS bidireccional cuya profundidad está acotada por la cota superior.
+
+Uso:
+    python oraculo_distancias.py Q2408955 Q60643381
+    python oraculo_distancias.py --grafo grafo_combinado.pkl      # consultas por stdin: "Q1 Q2"
+"""
+
+import argparse
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+from grafo_disperso import GrafoDisperso
+
+
+class OraculoDistancias:
+    def __init__(self, gd, num_landmarks=16, dirigido=False):
+        self.gd = gd
+        self.dirigido = dirigido
+        A = gd.adyacencia(no_dirigida=not dirigido)
+        AT = A.T.tocsr() if dirigido else A
+        # Listas de Python para el BFS bidireccional (acceso escalar rápido)
+        self._adelante = (A.indptr.tolist(), A.indices.tolist())
+        self._atras = (AT.indptr.tolist(), AT.indices.tolist())
+
+        grado = np.diff(A.indptr) + np.diff(AT.indptr)
+        k = min(num_landmarks, gd.n)
+        self.landmarks = np.argpartition(-grado, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+
+        # desde[l, x] = d(landmark_l, x); hacia[l, x] = d(x, landmark_l)
+        self.desde = self._comprimir(shortest_path(A, directed=dirigido, unweighted=True, indices=self.landmarks))
+        self.hacia = self.desde
+        if dirigido:
+            self.hacia = self._comprimir(shortest_path(AT, directed=True, unweighted=True, indices=self.landmarks))
+
+    @staticmethod
+    def _comprimir(distancias):
+        """float (inf = inalcanzable) -> uint8/uint16 con el máximo del tipo como centinela"""
+        finitas = distancias[np.isfinite(distancias)]
+        tipo = np.uint8 if finitas.size == 0 or finitas.max() < np.iinfo(np.uint8).max else np.uint16
+        centinela = np.iinfo(tipo).max
+        return np.where(np.isfinite(distancias), distancias, centinela).astype(tipo)
+
+    def cotas(self, u, v):
+        """(inferior, superior) de la distancia en saltos de u a v; superior = inf si no se puede acotar"""
+        s, t = self.gd.indice[u], self.gd.indice[v]
+        if s == t:
+            return 0, 0
+
+        centinela = np.iinfo(self.desde.dtype).max
+        hacia_s, desde_s = self.hacia[:, s].astype(np.int32), self.desde[:, s].astype(np.int32)
+        hacia_t, desde_t = self.hacia[:, t].astype(np.int32), self.desde[:, t].astype(np.int32)
+
+        # Superior: u -> L -> v
+        validos = (hacia_s != centinela) & (desde_t != centinela)
+        superior = int((hacia_s[validos] + desde_t[validos]).min()) if validos.any() else float('inf')
+
+        # Inferior: d(L,v) - d(L,u) y d(u,L) - d(v,L) (desigualdad triangular)
+        inferior = 1
+        ambos = (desde_s != centinela) & (desde_t != centinela)
+        if ambos.any():
+            inferior = max(inferior, int((desde_t[ambos] - desde_s[ambos]).max()))
+        ambos = (hacia_s != centinela) & (hacia_t != centinela)
+        if ambos.any():
+            inferior = max(inferior, int((hacia_s[ambos] - hacia_t[ambos]).max()))
+        # Un landmark que alcanza u pero no v demuestra que no hay camino
+        if (((desde_s != centinela) & (desde_t == centinela)).any() or
+                ((hacia_t != centinela) & (hacia_s == centinela)).any()):
+            inferior = float('inf')
+        return inferior, superior
+
+    def camino(self, u, v, limite=None):
+        """Camino más corto exacto (lista de QIDs) con BFS bidireccional acotado; None si no hay"""
+        s, t = self.gd.indice[u], self.gd.indice[v]
+        if s == t:
+            return [u]
+
+        inferior, superior = self.cotas(u, v)
+        if inferior == float('inf'):
+            return None
+        if limite is None:
+            limite = superior if superior != float('inf') else self.gd.n
+
+        padres = ({s: -1}, {t: -1})
+        profundidad = ({s: 0}, {t: 0})
+        fronteras = ([s], [t])
+        vecinos = (self._adelante, self._atras)
+
+        while fronteras[0] and fronteras[1] and profundidad[0][fronteras[0][0]] + profundidad[1][fronteras[1][0]] < limite:
+            # Se expande el lado con la frontera más pequeña, nivel completo
+            lado = 0 if len(fronteras[0]) <= len(fronteras[1]) else 1
+            otro = 1 - lado
+            indptr, indices = vecinos[lado]
+            nivel = profundidad[lado][fronteras[lado][0]] + 1
+            siguiente = []
+            mejor = None
+            for x in fronteras[lado]:
+                for y in indices[indptr[x]:indptr[x + 1]]:
+                    if y in padres[lado]:
+                        continue
+                    padres[lado][y] = x
+                    profundidad[lado][y] = nivel
+                    siguiente.append(y)
+                    if y in padres[otro]:
+                        total = nivel + profundidad[otro][y]
+                        if mejor is None or total < mejor[0]:
+                            mejor = (total, y)
+            if mejor is not None:
+                return self._reconstruir(mejor[1], padres)
+            fronteras = (siguiente, fronteras[1]) if lado == 0 else (fronteras[0], siguiente)
+        return None
+
+    def _reconstruir(self, encuentro, padres):
+        izquierda = []
+        x = encuentro
+        while x != -1:
+            izquierda.append(x)
+            x = padres[0][x]
+        derecha = []
+        x = padres[1][encuentro]
+        while x != -1:
+            derecha.append(x)
+            x = padres[1][x]
+        return [self.gd.nodos[i] for i in izquierda[::-1] + derecha]
+
+    def guardar(self, filename):
+        np.savez_compressed(filename, nodos=np.array(self.gd.nodos), landmarks=self.landmarks,
+                            desde=self.desde, hacia=self.hacia, dirigido=self.dirigido)
+
+    @classmethod
+    def cargar(cls, filename, gd):
+        """Recupera un índice guardado para el mismo grafo (mismos nodos en el mismo orden)"""
+        datos = np.load(filename)
+        if datos['nodos'].tolist() != gd.nodos:
+            raise ValueError(f"El índice {filename} no corresponde a este grafo")
+        oraculo = cls.__new__(cls)
+        oraculo.gd = gd
+        oraculo.dirigido = bool(datos['dirigido'])
+        A = gd.adyacencia(no_dirigida=not oraculo.dirigido)
+        AT = A.T.tocsr() if oraculo.dirigido else A
+        oraculo._adelante = (A.indptr.tolist(), A.indices.tolist())
+        oraculo._atras = (AT.indptr.tolist(), AT.indices.tolist())
+        oraculo.landmarks = datos['landmarks']
+        oraculo.desde = datos['desde']
+        oraculo.hacia = datos['hacia']
+        return oraculo
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Distancias entre entidades con índice de landmarks")
+    ap.add_argument("qids", nargs="*", help="Pares de QIDs (origen destino ...); sin pares lee de stdin")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--landmarks", type=int, default=16, help="Nº de landmarks (default: 16)")
+    ap.add_argument("--dirigido", action="store_true", help="Respetar la dirección de las aristas")
+    args = ap.parse_args()
+
+    with open(args.grafo, 'rb') as f:
+        gd = GrafoDisperso.desde_networkx(pickle.load(f))
+
+    ruta_indice = Path(args.grafo).with_suffix(".dirigido.landmarks.npz" if args.dirigido else ".landmarks.npz")
+    try:
+        oraculo = OraculoDistancias.cargar(ruta_indice, gd)
+    except (FileNotFoundError, ValueError):
+        oraculo = OraculoDistancias(gd, args.landmarks, args.dirigido)
+        oraculo.guardar(ruta_indice)
+        print(f"💾 Índice de landmarks guardado en: {ruta_indice}")
+
+    pares = list(zip(args.qids[::2], args.qids[1::2])) if args.qids else (
+        linea.split()[:2] for linea in sys.stdin if len(linea.split()) >= 2)
+    for u, v in pares:
+        if u not in gd.indice or v not in gd.indice:
+            print(f"⚠️  {u} o {v} no está en el grafo")
+            continue
+        inferior, superior = oraculo.cotas(u, v)
+        camino = oraculo.camino(u, v)
+        print(f"• {u} → {v}: cotas [{inferior}, {superior}]", end="")
+        print(f", exacto {len(camino) - 1}: {' → '.join(camino)}" if camino else ", sin camino")
+
+
+if __name__ == "__main__":
+    main()
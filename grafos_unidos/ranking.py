@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+ranking.py - Top-k sin ordenar todo y un índice de métricas preordenado
+
+Los informes solo muestran los 10-15 primeros nodos de cada métrica, así que
+ordenar las n entradas (O(n log n)) sobra: top_k() elige los k mayores con
+np.partition en O(n) y solo ordena esos k. Los empates se resuelven como un
+sorted(..., reverse=True) estable: por una clave secundaria opcional y luego
+por orden de aparición. Los NaN (p.ej. intermediacion por encima de
+NODOS_INTERMEDIACION) van detrás de cualquier número, como en np.argsort.
+
+Para consultas repetidas, IndiceRanking guarda junto al grafo el orden
+completo de cada métrica (se paga una sola vez al exportar); cada top-k
+posterior es un corte O(k).
+
+Uso:
+    python ranking.py pagerank                    # top-10 de grafo_combinado.ranking.npz
+    python ranking.py intermediacion clustering --k 15
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _k_mayores(valores, k):
+    """(índices con valor > umbral, índices con valor == umbral), umbral = k-ésimo mayor"""
+    umbral = np.partition(valores, len(valores) - k)[len(valores) - k]
+    return np.flatnonzero(valores > umbral), np.flatnonzero(valores == umbral)
+
+
+def top_k(valores, k, secundaria=None):
+    """Índices de los k mayores, ya ordenados (desempate: secundaria mayor, luego índice menor)"""
+    valores = np.asarray(valores)
+    n = len(valores)
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.zeros(0, dtype=np.intp)
+    if valores.dtype.kind == 'f' and np.isnan(valores).any():
+        # np.partition llevaría los NaN arriba y el umbral sería NaN: se apartan y van al final
+        nan = np.isnan(valores)
+        validos = np.flatnonzero(~nan)
+        sub = None if secundaria is None else np.asarray(secundaria)[validos]
+        elegidos = validos[top_k(valores[validos], k, sub)]
+        return np.concatenate([elegidos, np.flatnonzero(nan)[:k - len(elegidos)]])
+    elegidos = np.arange(n)
+    if k < n:
+        seguros, empatados = _k_mayores(valores, k)
+        faltan = k - len(seguros)
+        if secundaria is not None and len(empatados) > faltan:
+            seguros_2, empatados_2 = _k_mayores(np.asarray(secundaria)[empatados], faltan)
+            empatados = np.concatenate([empatados[seguros_2], empatados[empatados_2]])
+        elegidos = np.concatenate([seguros, np.sort(empatados[:faltan])])
+
+    claves = [elegidos, -valores[elegidos]]
+    if secundaria is not None:
+        claves.insert(1, -np.asarray(secundaria)[elegidos])
+    return elegidos[np.lexsort(claves)]
+
+
+def top_k_dict(diccionario, k):
+    """[(clave, valor)] de los k mayores valores de un dict (p.ej. nx.degree_centrality)"""
+    claves = list(diccionario)
+    valores = np.fromiter(diccionario.values(), dtype=np.float64, count=len(claves))
+    return [(claves[i], diccionario[claves[i]]) for i in top_k(valores, k)]
+
+
+class IndiceRanking:
+    """Orden descendente (estable) de cada métrica numérica por nodo"""
+    def __init__(self, nodos, metricas, valores, ordenes):
+        self.nodos = np.asarray(nodos)
+        self.metricas = list(metricas)
+        self.valores = valores            # metricas x n (float64)
+        self.ordenes = ordenes            # metricas x n (posiciones en self.nodos)
+        self._posiciones = {}
+
+    @classmethod
+    def desde_tabla(cls, tabla, columnas=None):
+        """Índice de un DataFrame con índice = nodo_id (por defecto, todas sus columnas numéricas)"""
+        columnas = columnas or tabla.select_dtypes('number').columns.tolist()
+        valores = tabla[columnas].to_numpy(dtype=np.float64).T
+        ordenes = np.argsort(-valores, axis=1, kind='stable').astype(np.int32)   # NaN al final
+        return cls(np.asarray(tabla.index, dtype=str), columnas, valores, ordenes)
+
+    def orden(self, metrica):
+        """Posiciones de todos los nodos, de mayor a menor `metrica`"""
+        return self.ordenes[self.metricas.index(metrica)]
+
+    def top(self, metrica, k=10):
+        """Series nodo_id -> valor de los k primeros por `metrica` (O(k))"""
+        fila = self.metricas.index(metrica)
+        orden = self.ordenes[fila, :k]
+        return pd.Series(self.valores[fila, orden], index=pd.Index(self.nodos[orden], name='nodo_id'), name=metrica)
+
+    def posicion(self, qid, metrica):
+        """Puesto (1 = primero) de qid según `metrica`"""
+        if metrica not in self._posiciones:
+            inversa = np.empty(len(self.nodos), dtype=np.int32)
+            inversa[self.orden(metrica)] = np.arange(len(self.nodos), dtype=np.int32)
+            self._posiciones[metrica] = dict(zip(self.nodos.tolist(), inversa.tolist()))
+        return self._posiciones[metrica][qid] + 1
+
+    def guardar(self, filename):
+        np.savez_compressed(filename, nodos=self.nodos, metricas=np.array(self.metricas),
+                            valores=self.valores, ordenes=self.ordenes)
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        return cls(datos['nodos'], datos['metricas'].tolist(), datos['valores'], datos['ordenes'])
+
+
+def ruta_ranking(ruta_grafo):
+    """El índice se guarda junto al grafo: grafo_combinado.pkl -> grafo_combinado.ranking.npz"""
+    return Path(ruta_grafo).with_suffix(".ranking.npz")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Top-k de métricas por nodo desde el índice preordenado")
+    ap.add_argument("metricas", nargs="+", help="Métricas a consultar (columnas de analisis_completo_combinado.csv)")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--k", type=int, default=10, help="Nº de nodos por métrica (default: 10)")
+    args = ap.parse_args()
+
+    indice = IndiceRanking.cargar(ruta_ranking(args.grafo))
+    for metrica in args.metricas:
+        if metrica not in indice.metricas:
+            print(f"⚠️  {metrica} no está en el índice ({', '.join(indice.metricas)})")
+            continue
+        print(f"\n🔝 TOP {args.k} POR {metrica.upper()}:")
+        for i, (nodo, valor) in enumerate(indice.top(metrica, args.k).items(), 1):
+            print(f"   {i:2d}. {nodo}: {valor:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+render_lote.py - Render por lotes de muchos grafos (uno por semilla) en un pool de procesos
+
+crear_y_guardar_grafo dibuja una semilla tras otra en el proceso principal y
+cada plt.figure paga de nuevo la creación de la figura y la carga de fuentes.
+Aquí cada grafo guardado es una tarea independiente:
+    • un pool de procesos con backend Agg (sin pyplot ni GUI)
+    • cada trabajador crea UNA figura al arrancar, precalienta la caché de
+      fuentes y la reutiliza (se limpia) para todos los grafos que le tocan
+    • el layout sale de la caché .disposicion.npz junto a cada grafo
+    • cada grafo se compone una vez y se guarda en todos los formatos
+    • se informa el tiempo de carga, disposición y dibujo de cada grafo
+
+Entradas admitidas:
+    .pkl    grafo networkx (GrafoManager.guardar_pkl, unir_grafos)
+    .json   grafo de propiedades {nodes, edges} de consulta_wiki
+    .grafo.npz  formato binario de GrafoDisperso (GrafoDisperso.guardar)
+Los demás .npz (índices que la serie guarda junto a cada grafo: .disposicion,
+.metricas, .minhash, .ranking...) no son grafos y se saltan.
+
+Uso:
+    python render_lote.py grafo_*.pkl ../consulta_wiki/data/grafo_unificado.json
+    python render_lote.py grafo_*.pkl --salida renders --formatos png --procesos 4
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import glob
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from grafo_disperso import SUFIJO_GRAFO, GrafoDisperso
+from disposicion import disposicion_disperso, ruta_disposicion
+from dibujo import colocar_etiquetas, dibujar_aristas, dibujar_nodos, guardar_figura
+from ranking import top_k
+
+ETIQUETAS_MAXIMAS = 60
+COLORES_TIPO = {'central': 'red', 'intermediate': 'blue', 'target': 'green'}
+
+_RENDER = {}    # figura reutilizada por el trabajador (ver _iniciar_trabajador)
+
+
+def _iniciar_trabajador(figsize, dpi, formatos):
+    # Una figura por trabajador; el primer draw carga las fuentes una sola vez
+    figura = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figura)
+    figura.text(0.5, 0.5, "Qoyllur Rit'i", fontsize=9, fontweight='bold')
+    figura.canvas.draw()
+    _RENDER.update(figura=figura, dpi=dpi, formatos=formatos)
+
+
+def cargar_grafo(ruta):
+    """(GrafoDisperso, etiquetas, tipos) de un grafo guardado en .pkl, .json o .grafo.npz"""
+    ruta = Path(ruta)
+    if GrafoDisperso.es_grafo(ruta):
+        gd = GrafoDisperso.cargar(ruta)
+        return gd, list(gd.nodos), None
+    if ruta.suffix == '.npz':
+        raise ValueError(f"{ruta.name} no es un grafo (el formato binario usa {SUFIJO_GRAFO})")
+    if ruta.suffix == '.json':
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        nodos = {n['id']: n.get('label') or n['id'] for n in datos.get('nodes', []) if n.get('id')}
+        aristas = [(e['source'], e['target'], e.get('category')) for e in datos.get('edges', [])
+                   if e.get('source') and e.get('target')]
+        for u, v, _ in aristas:
+            nodos.setdefault(u, u)
+            nodos.setdefault(v, v)
+        gd = GrafoDisperso.desde_aristas(list(nodos), aristas)
+        return gd, list(nodos.values()), None
+    with open(ruta, 'rb') as f:
+        grafo = pickle.load(f)
+    gd = GrafoDisperso.desde_networkx(grafo)
+    etiquetas = [grafo.nodes[q].get('label') or q for q in gd.nodos]
+    return gd, etiquetas, [grafo.nodes[q].get('type') for q in gd.nodos]
+
+
+def renderizar(ruta, prefijo):
+    """Dibuja un grafo guardado en la figura del trabajador; devuelve sus tiempos"""
+    tiempos = {'grafo': str(ruta)}
+    inicio = time.perf_counter()
+    gd, etiquetas, tipos = cargar_grafo(ruta)
+    tiempos['carga_s'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    P = disposicion_disperso(gd, cache=ruta_disposicion(ruta))
+    tiempos['disposicion_s'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    figura, dpi = _RENDER['figura'], _RENDER['dpi']
+    figura.clear()
+    ax = figura.add_subplot()
+    grado = np.bincount(gd.origen, minlength=gd.n) + np.bincount(gd.destino, minlength=gd.n)
+    dibujar_aristas(ax, P, gd.origen, gd.destino, anchos=0.6, color='gray', alpha=0.5, dpi=dpi)
+    colores = 'tab:blue' if tipos is None else [COLORES_TIPO.get(t, 'green') for t in tipos]
+    dibujar_nodos(ax, P, tamanos=20 + 380 * grado / max(grado.max(initial=0), 1), colores=colores,
+                  alpha=0.9, bordes='black', grosor=0.4)
+    colocar_etiquetas(ax, P, etiquetas, orden=top_k(grado, gd.n), maximo=ETIQUETAS_MAXIMAS,
+                      fontsize=7, fontweight='bold')
+    ax.set_title(f"{Path(ruta).stem}: {gd.n} nodos, {gd.m} aristas", fontsize=14)
+    ax.set_axis_off()
+    rutas = guardar_figura(figura, prefijo, _RENDER['formatos'], dpi=dpi, bbox_inches='tight',
+                           facecolor='white')
+    tiempos['dibujo_s'] = time.perf_counter() - inicio
+    tiempos.update(nodos=gd.n, aristas=gd.m, salida=", ".join(str(r) for r in rutas), pid=os.getpid())
+    return tiempos
+
+
+def _tarea(ruta, prefijo):
+    try:
+        return renderizar(ruta, prefijo)
+    except Exception as e:          # un grafo roto no detiene el lote
+        return {'grafo': str(ruta), 'error': f"{type(e).__name__}: {e}", 'pid': os.getpid()}
+
+
+def render_lote(rutas, salida="renders", formatos=("png", "svg"), procesos=None, dpi=150,
+                figsize=(16, 14)):
+    """Renderiza cada grafo en <salida>/<nombre>.<formato>; DataFrame con los tiempos por grafo"""
+    salida = Path(salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    tareas = [(str(r), str(salida / Path(r).stem)) for r in rutas]
+    if not tareas:
+        return pd.DataFrame()
+    argumentos = (figsize, dpi, tuple(formatos))
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+
+    filas = []
+    if procesos <= 1:
+        _iniciar_trabajador(*argumentos)
+        for tarea in tareas:
+            filas.append(_tarea(*tarea))
+            _informar(filas[-1])
+    else:
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=argumentos) as ejecutor:
+            for futuro in as_completed([ejecutor.submit(_tarea, *t) for t in tareas]):
+                filas.append(futuro.result())
+                _informar(filas[-1])
+    return pd.DataFrame(filas)
+
+
+def _informar(fila):
+    if 'error' in fila:
+        print(f"❌ {fila['grafo']}: {fila['error']}")
+    else:
+        total = fila['carga_s'] + fila['disposicion_s'] + fila['dibujo_s']
+        print(f"🖼️  {fila['grafo']}: {fila['nodos']} nodos, {fila['aristas']} aristas en {total:.2f}s "
+              f"(carga {fila['carga_s']:.2f}s, disposición {fila['disposicion_s']:.2f}s, "
+              f"dibujo {fila['dibujo_s']:.2f}s) [pid {fila['pid']}]")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render por lotes (PNG/SVG) de grafos guardados en un pool de procesos")
+    ap.add_argument("grafos", nargs="+", help="Grafos .pkl/.json/.grafo.npz (se admiten patrones glob)")
+    ap.add_argument("--salida", default="renders", help="Carpeta de salida (default: renders)")
+    ap.add_argument("--formatos", nargs="+", default=["png", "svg"], help="Formatos (default: png svg)")
+    ap.add_argument("--procesos", type=int, default=None, help="Procesos (default: nº de CPUs)")
+    ap.add_argument("--dpi", type=int, default=150)
+    args = ap.parse_args()
+
+    rutas = [r for patron in args.grafos for r in (sorted(glob(patron)) or [patron])]
+    indices = [r for r in rutas if Path(r).suffix == '.npz' and not GrafoDisperso.es_grafo(r)]
+    if indices:
+        print(f"⏭️  {len(indices)} .npz sin sufijo {SUFIJO_GRAFO} saltados (índices junto a los grafos)")
+        rutas = [r for r in rutas if r not in indices]
+    inicio = time.perf_counter()
+    tiempos = render_lote(rutas, args.salida, args.formatos, args.procesos, args.dpi)
+    if tiempos.empty:
+        return
+    ruta_tiempos = Path(args.salida) / "tiempos_render.csv"
+    tiempos.to_csv(ruta_tiempos, index=False, encoding='utf-8')
+    correctos = int(tiempos['error'].isna().sum()) if 'error' in tiempos else len(tiempos)
+    print(f"✅ {correctos}/{len(tiempos)} grafos renderizados en {time.perf_counter() - inicio:.2f}s "
+          f"-> {args.salida}/ (tiempos en {ruta_tiempos})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+similitud.py - Índice MinHash/LSH de similitud entre entidades por sus vecindarios
+
+"¿Qué otras festividades se parecen a Qoyllur Rit'i?": la similitud de Jaccard
+entre conjuntos de vecinos (no dirigidos) se estima con firmas MinHash, una
+por nodo, calculadas vectorizadamente sobre la CSR (mínimo por fila de los
+hashes de los vecinos, permutados con multiply-add-shift). Un índice LSH por
+bandas (b bandas x r filas) agrupa las firmas en cubetas ordenadas; cada
+consulta solo compara con los nodos que comparten alguna cubeta, así que no
+recorre todos los pares.
+
+Los hashes se calculan sobre los QIDs (no sobre índices internos), por lo que
+las firmas son estables entre grafos: al unir una semilla nueva basta con
+tomar el mínimo elemento a elemento con las firmas de su grafo
+(MinHash(A ∪ B) = min(MinHash(A), MinHash(B))). Cada grafo plegado guarda
+su huella: los mínimos no permiten quitar aristas, así que si un grafo ya
+plegado cambia, el índice debe reconstruirse.
+
+Uso:
+    python similitud.py Q2408955                 # top-10 parecidos a Qoyllur Rit'i
+    python similitud.py Q2408955 Q60643381 --k 5 --grafo grafo_combinado.pkl
+"""
+
+import argparse
+import hashlib
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grafo_disperso import GrafoDisperso, mezclar
+
+VACIA = np.iinfo(np.uint32).max      # firma de un nodo sin vecinos
+ENTRADAS_POR_BLOQUE = 1 << 18        # vecinos x permutaciones procesados a la vez
+
+
+def hash_nodos(nodos):
+    """Hash de 64 bits estable de cada QID (independiente del orden de internado)"""
+    return np.fromiter((int.from_bytes(hashlib.blake2b(str(q).encode(), digest_size=8).digest(), 'little')
+                        for q in nodos), dtype=np.uint64, count=len(nodos))
+
+
+def firmas_minhash(A, hashes, permutaciones):
+    """Firma uint32 (n x k) de cada fila de A: mínimo de cada permutación sobre los vecinos"""
+    a, b = permutaciones
+    n, k = A.shape[0], len(a)
+    firmas = np.full((n, k), VACIA, dtype=np.uint32)
+    grado = np.diff(A.indptr)
+    filas = np.flatnonzero(grado)
+    if len(filas) == 0:
+        return firmas
+
+    # Bloques de filas completas con ~ENTRADAS_POR_BLOQUE valores hash cada uno
+    limite = max(1, ENTRADAS_POR_BLOQUE // k)
+    acumulado = A.indptr[filas + 1]
+    cortes = np.searchsorted(acumulado, np.arange(limite, acumulado[-1], limite), side='right')
+    for bloque in np.split(filas, np.unique(cortes)):
+        if len(bloque) == 0:
+            continue
+        inicio, fin = A.indptr[bloque[0]], A.indptr[bloque[-1] + 1]
+        vecinos = hashes[A.indices[inicio:fin]]
+        # h_j(x) = (a_j x + b_j mod 2^64) >> 32, con a_j impar
+        with np.errstate(over='ignore'):
+            h = ((vecinos[:, None] * a + b) >> np.uint64(32)).astype(np.uint32)
+        firmas[bloque] = np.minimum.reduceat(h, A.indptr[bloque] - inicio, axis=0)
+    return firmas
+
+
+class IndiceSimilitud:
+    """Firmas MinHash por nodo + índice LSH por bandas sobre ellas"""
+    def __init__(self, nodos, firmas, bandas=64, semilla=42, semillas_grafo=(), huellas=None):
+        self.nodos = list(nodos)
+        self.indice = {q: i for i, q in enumerate(self.nodos)}
+        self.firmas = firmas
+        self.bandas = bandas
+        self.semilla = semilla
+        self.semillas_grafo = list(semillas_grafo)
+        self.huellas = dict(huellas or {})      # grafo plegado -> huella (grafo_disperso.huella)
+        self._cubetas = None
+
+    @staticmethod
+    def _permutaciones(k, semilla):
+        """Coeficientes (a impar, b) de las k permutaciones multiply-add-shift"""
+        rng = np.random.default_rng(semilla)
+        maximo = np.iinfo(np.uint64).max
+        a = rng.integers(0, maximo, k, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        return a, rng.integers(0, maximo, k, dtype=np.uint64, endpoint=True)
+
+    @classmethod
+    def desde_grafo(cls, gd, permutaciones=128, bandas=64, semilla=42, semillas_grafo=()):
+        """Construye las firmas de todos los nodos de un GrafoDisperso (vecinos no dirigidos)"""
+        if permutaciones % bandas:
+            raise ValueError(f"permutaciones ({permutaciones}) debe ser múltiplo de bandas ({bandas})")
+        firmas = firmas_minhash(gd.adyacencia(no_dirigida=True), hash_nodos(gd.nodos),
+                                cls._permutaciones(permutaciones, semilla))
+        return cls(gd.nodos, firmas, bandas, semilla, semillas_grafo)
+
+    def agregar(self, gd, semillas_grafo=(), huellas=None):
+        """Une el grafo de una semilla nueva: min con las firmas existentes, nodos nuevos al final
+
+        huellas: {nombre: huella} del grafo plegado, para detectar después si cambió.
+        """
+        parcial = firmas_minhash(gd.adyacencia(no_dirigida=True), hash_nodos(gd.nodos),
+                                 self._permutaciones(self.firmas.shape[1], self.semilla))
+        posicion = np.fromiter((self.indice.get(q, -1) for q in gd.nodos), dtype=np.int64, count=gd.n)
+        existentes = posicion >= 0
+        np.minimum.at(self.firmas, posicion[existentes], parcial[existentes])
+
+        nuevos = [q for q, p in zip(gd.nodos, posicion) if p < 0]
+        for q in nuevos:
+            self.indice[q] = len(self.nodos)
+            self.nodos.append(q)
+        self.firmas = np.vstack([self.firmas, parcial[~existentes]])
+        self.semillas_grafo.extend(s for s in semillas_grafo if s not in self.semillas_grafo)
+        self.huellas.update(huellas or {})
+        self._cubetas = None
+        return int(existentes.sum()), len(nuevos)
+
+    def _claves_banda(self, firmas):
+        """Clave uint64 de cada banda (n x bandas) combinando sus r valores"""
+        r = firmas.shape[1] // self.bandas
+        bloques = firmas.reshape(len(firmas), self.bandas, r)
+        clave = mezclar(bloques[:, :, 0].astype(np.uint64))
+        for j in range(1, r):
+            clave = mezclar(clave ^ bloques[:, :, j].astype(np.uint64))
+        return clave
+
+    def _construir_cubetas(self):
+        """Por banda: claves ordenadas + nodos en ese orden (búsqueda binaria por consulta)"""
+        con_vecinos = np.flatnonzero(self.firmas[:, 0] != VACIA)
+        claves = np.ascontiguousarray(self._claves_banda(self.firmas[con_vecinos]).T)   # bandas x n
+        orden = np.argsort(claves, axis=1)
+        self._cubetas = (np.take_along_axis(claves, orden, axis=1), con_vecinos[orden])
+
+    def candidatos(self, qid):
+        """Nodos que comparten al menos una cubeta LSH con qid"""
+        if self._cubetas is None:
+            self._construir_cubetas()
+        claves_ordenadas, nodos_ordenados = self._cubetas
+        i = self.indice[qid]
+        if self.firmas[i, 0] == VACIA:
+            return np.zeros(0, dtype=np.int64)
+        claves = self._claves_banda(self.firmas[i:i + 1])[0]
+        encontrados = []
+        for b in range(self.bandas):
+            columna = claves_ordenadas[b]
+            lo = np.searchsorted(columna, claves[b], side='left')
+            hi = np.searchsorted(columna, claves[b], side='right')
+            encontrados.append(nodos_ordenados[b, lo:hi])
+        candidatos = np.unique(np.concatenate(encontrados))
+        return candidatos[candidatos != i]
+
+    def similares(self, qid, k=10):
+        """Series QID -> Jaccard estimada de los k nodos más parecidos a qid (descendente)"""
+        candidatos = self.candidatos(qid)
+        estimada = (self.firmas[candidatos] == self.firmas[self.indice[qid]]).mean(axis=1)
+        if len(candidatos) > k:
+            top = np.argpartition(-estimada, k - 1)[:k]
+            candidatos, estimada = candidatos[top], estimada[top]
+        orden = np.argsort(-estimada, kind='stable')
+        return pd.Series(estimada[orden], index=pd.Index([self.nodos[i] for i in candidatos[orden]], name='nodo_id'),
+                         name='jaccard')
+
+    def guardar(self, filename):
+        np.savez_compressed(filename, nodos=np.array(self.nodos), firmas=self.firmas, bandas=self.bandas,
+                            semilla=self.semilla, semillas_grafo=np.array(self.semillas_grafo, dtype=str),
+                            huellas_grafo=np.array(list(self.huellas), dtype=str),
+                            huellas=np.array(list(self.huellas.values()), dtype=str))
+
+    @classmethod
+    def cargar(cls, filename):
+        datos = np.load(filename)
+        huellas = {}
+        if 'huellas' in datos.files:     # índices anteriores no guardaban huellas
+            huellas = dict(zip(datos['huellas_grafo'].tolist(), datos['huellas'].tolist()))
+        return cls(datos['nodos'].tolist(), datos['firmas'], int(datos['bandas']), int(datos['semilla']),
+                   datos['semillas_grafo'].tolist(), huellas)
+
+
+def ruta_indice(ruta_grafo):
+    """El índice se guarda junto al grafo: grafo_combinado.pkl -> grafo_combinado.minhash.npz"""
+    return Path(ruta_grafo).with_suffix(".minhash.npz")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Entidades con vecindarios más parecidos (MinHash/LSH)")
+    ap.add_argument("qids", nargs="+", help="QIDs a consultar")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--k", type=int, default=10, help="Nº de resultados por consulta (default: 10)")
+    args = ap.parse_args()
+
+    try:
+        indice = IndiceSimilitud.cargar(ruta_indice(args.grafo))
+    except FileNotFoundError:
+        with open(args.grafo, 'rb') as f:
+            grafo = pickle.load(f)
+        indice = IndiceSimilitud.desde_grafo(GrafoDisperso.desde_networkx(grafo))
+        indice.guardar(ruta_indice(args.grafo))
+        print(f"💾 Índice MinHash guardado en: {ruta_indice(args.grafo)}")
+
+    for qid in args.qids:
+        if qid not in indice.indice:
+            print(f"⚠️  {qid} no está en el grafo")
+            continue
+        print(f"\n🔍 Más parecidos a {qid}:")
+        for i, (nodo, jaccard) in enumerate(indice.similares(qid, args.k).items(), 1):
+            print(f"   {i:2d}. {nodo}: {jaccard:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+teselas.py - Exportación en pirámide de teselas (deep zoom) para grafos grandes
+
+Una sola imagen a DPI alto de un grafo grande agota la memoria. Aquí el grafo
+ya dispuesto se dibuja como una pirámide de teselas de 256x256 px: el nivel z
+cubre el plano con 2^z x 2^z teselas (z = 0 es el grafo entero).
+    • cada arista y cada nodo se asigna, de forma vectorizada, a las teselas
+      que toca; las teselas sin geometría no se dibujan ni se guardan
+    • cada tesela se dibuja por separado (dibujo.py) en un pool de procesos;
+      la geometría completa se envía una vez a cada trabajador y cada tarea
+      solo lleva los índices de su tesela
+    • cada tesela etiqueta sus ETIQUETAS_POR_TESELA nodos de mayor prioridad
+      (p.ej. grado), así que al acercarse aparecen más etiquetas
+    • index.html es un visor estático (sin dependencias) que pide las teselas
+      visibles al desplazar y hacer zoom
+
+Salida:
+    <carpeta>/<z>/<x>/<y>.png     y crece hacia abajo, como en los mapas web
+    <carpeta>/index.html
+
+Uso:
+    python teselas.py --benchmark                 # 100k nodos / 300k aristas sintéticos
+    (desde un grafo: python ../consulta_wiki/visualizar_grafo.py -i data/grafo_unificado.json --teselas)
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from dibujo import dibujar_aristas, dibujar_nodos
+
+LADO_TESELA = 256
+MARGEN_MUNDO = 0.03          # margen relativo alrededor del grafo en el nivel 0
+ZOOM_MAXIMO = 8
+ETIQUETAS_POR_TESELA = 4      # nodos etiquetados por tesela (los de mayor prioridad que caen en ella)
+RADIO_NODO = 4                # px de holgura al asignar nodos a teselas
+RADIO_ETIQUETA = (128, 24)    # px (x, y) de holgura para nodos etiquetados: el texto desborda el nodo
+
+_ESCENA = {}
+
+
+def _iniciar_trabajador(Q, origen, destino, tamanos, etiquetas, estilo):
+    # Una figura por trabajador, reutilizada en todas sus teselas (crear ejes cuesta más que dibujar)
+    figura = Figure(figsize=(1, 1), dpi=LADO_TESELA)
+    FigureCanvasAgg(figura)
+    ax = figura.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    _ESCENA.update(Q=Q, origen=origen, destino=destino, tamanos=tamanos, etiquetas=etiquetas, estilo=estilo,
+                   figura=figura, ax=ax)
+
+
+def coordenadas_mundo(P):
+    """Posiciones -> [0, 1]^2 conservando la proporción; y crece hacia abajo"""
+    minimo, maximo = P.min(axis=0), P.max(axis=0)
+    lado = max((maximo - minimo).max(), 1e-12) / (1 - 2 * MARGEN_MUNDO)
+    Q = (P - (minimo + maximo) / 2) / lado + 0.5
+    Q[:, 1] = 1 - Q[:, 1]
+    return Q
+
+
+def zoom_automatico(n, nodos_por_tesela=64):
+    """Nivel máximo para que el nivel más profundo tenga del orden de `nodos_por_tesela`"""
+    return int(np.clip(np.ceil(np.log2(max(np.sqrt(n / nodos_por_tesela), 1))), 2, ZOOM_MAXIMO))
+
+
+def _agrupar(claves, elementos):
+    """{clave: array de elementos} con una sola ordenación"""
+    if len(claves) == 0:
+        return {}
+    orden = np.lexsort((elementos, claves))
+    claves, elementos = claves[orden], elementos[orden]
+    cortes = np.flatnonzero(np.diff(claves)) + 1
+    return dict(zip(claves[np.r_[0, cortes]].tolist(), np.split(elementos, cortes)))
+
+
+def _teselas_nodos(Q, z, radio_px):
+    """(nodo, clave de tesela) de cada nodo y las teselas vecinas que alcanza su radio (px, o (x, y))"""
+    teselas = 2 ** z
+    rx, ry = np.broadcast_to(np.asarray(radio_px, dtype=np.float64), (2,)) / (LADO_TESELA * teselas)
+    nodos, claves = [], []
+    for dx in (-1, 1):
+        for dy in (-1, 1):
+            tx = np.clip(np.floor((Q[:, 0] + dx * rx) * teselas), 0, teselas - 1).astype(np.int64)
+            ty = np.clip(np.floor((Q[:, 1] + dy * ry) * teselas), 0, teselas - 1).astype(np.int64)
+            nodos.append(np.arange(len(Q)))
+            claves.append(tx * teselas + ty)
+    pares = np.unique(np.concatenate(nodos) * teselas * teselas + np.concatenate(claves))
+    return pares // (teselas * teselas), pares % (teselas * teselas)
+
+
+def _teselas_aristas(Q, origen, destino, z, bloque=4_000_000):
+    """(arista, clave de tesela) de las teselas que cruza cada arista (muestreo cada media tesela)"""
+    teselas = 2 ** z
+    A, B = Q[origen] * teselas, Q[destino] * teselas
+    muestras = np.ceil(2 * np.abs(B - A).max(axis=1)).astype(np.int64) + 1
+    aristas, claves = [], []
+    acumuladas = np.cumsum(muestras)
+    inicio = 0
+    while inicio < len(muestras):
+        base = acumuladas[inicio - 1] if inicio else 0
+        fin = max(int(np.searchsorted(acumuladas, base + bloque, side='right')), inicio + 1)
+        cuenta = muestras[inicio:fin]
+        arista = np.repeat(np.arange(inicio, fin), cuenta)
+        paso = np.arange(len(arista)) - np.repeat(np.cumsum(cuenta) - cuenta, cuenta)
+        t = (paso / np.maximum(muestras[arista] - 1, 1))[:, None]
+        punto = np.clip(np.floor(A[arista] + t * (B[arista] - A[arista])), 0, teselas - 1).astype(np.int64)
+        pares = np.unique(arista * teselas * teselas + punto[:, 0] * teselas + punto[:, 1])
+        aristas.append(pares // (teselas * teselas))
+        claves.append(pares % (teselas * teselas))
+        inicio = fin
+    if not aristas:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(aristas), np.concatenate(claves)
+
+
+def _dibujar_tesela(ruta, z, x, y, aristas, nodos, etiquetados):
+    """Dibuja una tesela en coordenadas locales de píxel (y hacia arriba) y la guarda como PNG"""
+    escena = _ESCENA
+    escala = LADO_TESELA * 2 ** z
+
+    def local(indices):
+        puntos = escena['Q'][indices] * escala - (x * LADO_TESELA, y * LADO_TESELA)
+        puntos[:, 1] = LADO_TESELA - puntos[:, 1]
+        return puntos
+
+    ext = (0, LADO_TESELA, 0, LADO_TESELA)
+    estilo = escena['estilo']
+
+    figura, ax = escena['figura'], escena['ax']
+    for artista in [*ax.collections, *ax.images, *ax.texts]:
+        artista.remove()
+    if len(aristas):
+        extremos = local(np.concatenate([escena['origen'][aristas], escena['destino'][aristas]]))
+        k = len(aristas)
+        dibujar_aristas(ax, extremos, np.arange(k), np.arange(k, 2 * k), anchos=estilo['ancho'],
+                        color=estilo['color_aristas'], alpha=estilo['alpha'], dpi=LADO_TESELA, ext=ext)
+    ax.set_xlim(0, LADO_TESELA)
+    ax.set_ylim(0, LADO_TESELA)
+    if len(nodos):
+        dibujar_nodos(ax, local(nodos), tamanos=escena['tamanos'][nodos], colores=estilo['color_nodos'],
+                      grosor=0.3)
+    for i, (px, py) in zip(etiquetados, local(etiquetados)):
+        ax.text(px, py + 3, escena['etiquetas'][i], fontsize=4, ha='center', va='bottom',
+                bbox=dict(boxstyle="round,pad=0.15", fc="white", ec="none", alpha=0.7))
+    # PNG RGB con compresión rápida: la codificación domina el coste de las teselas ligeras
+    figura.canvas.draw()
+    rgb = Image.fromarray(np.asarray(figura.canvas.buffer_rgba())[..., :3])
+    rgb.save(ruta, compress_level=3)
+    return ruta
+
+
+def _dibujar_lote(tareas):
+    return [_dibujar_tesela(*tarea) for tarea in tareas]
+
+
+def etiquetados_nivel(Q, candidatos, prioridad, z):
+    """Candidatos con mayor prioridad de cada tesela del nivel z (a lo sumo ETIQUETAS_POR_TESELA)"""
+    teselas = 2 ** z
+    casa = np.clip(np.floor(Q[candidatos] * teselas), 0, teselas - 1).astype(np.int64)
+    clave = casa[:, 0] * teselas + casa[:, 1]
+    orden = np.lexsort((-prioridad[candidatos], clave))
+    clave = clave[orden]
+    inicio_grupo = np.r_[0, np.flatnonzero(np.diff(clave)) + 1]
+    rango = np.arange(len(clave)) - np.repeat(inicio_grupo, np.diff(np.r_[inicio_grupo, len(clave)]))
+    return candidatos[orden[rango < ETIQUETAS_POR_TESELA]]
+
+
+def tareas_nivel(Q, origen, destino, z, etiquetados, carpeta):
+    """Tareas (ruta, z, x, y, aristas, nodos, etiquetados) de las teselas con geometría del nivel z"""
+    teselas = 2 ** z
+    por_arista = _agrupar(*reversed(_teselas_aristas(Q, origen, destino, z)))
+    por_nodo = _agrupar(*reversed(_teselas_nodos(Q, z, RADIO_NODO)))
+    por_etiqueta = {}
+    if len(etiquetados):
+        nodos, claves = _teselas_nodos(Q[etiquetados], z, RADIO_ETIQUETA)
+        por_etiqueta = _agrupar(claves, etiquetados[nodos])
+
+    vacio = np.zeros(0, dtype=np.int64)
+    tareas = []
+    for clave in sorted(set(por_arista) | set(por_nodo)):
+        x, y = divmod(clave, teselas)
+        ruta = Path(carpeta) / str(z) / str(x) / f"{y}.png"
+        tareas.append((ruta, z, x, y, por_arista.get(clave, vacio), por_nodo.get(clave, vacio),
+                       por_etiqueta.get(clave, vacio)))
+    return tareas
+
+
+def exportar_teselas(P, origen, destino, carpeta, tamanos=None, etiquetas=None, prioridad=None,
+                     zoom_maximo=None, procesos=None, titulo="Grafo", lote=64,
+                     color_nodos="#1f78b4", color_aristas="black", ancho=0.4, alpha=0.35):
+    """Pirámide de teselas + visor index.html; devuelve {z: (teselas dibujadas, teselas del nivel)}
+
+    P: posiciones (n x 2); origen/destino: índices de aristas; tamanos: área de los
+    marcadores (pt²); etiquetas/prioridad: texto por nodo y orden de etiquetado.
+    """
+    P = np.asarray(P, dtype=np.float64)
+    n = len(P)
+    origen, destino = np.asarray(origen, dtype=np.int64), np.asarray(destino, dtype=np.int64)
+    Q = coordenadas_mundo(P) if n else np.zeros((0, 2))
+    zoom_maximo = zoom_automatico(n) if zoom_maximo is None else zoom_maximo
+    tamanos = np.broadcast_to(np.asarray(4.0 if tamanos is None else tamanos, dtype=np.float64), (n,))
+    etiquetas = np.asarray(etiquetas if etiquetas is not None else [""] * n, dtype=object)
+    prioridad = np.zeros(n) if prioridad is None else np.asarray(prioridad, dtype=np.float64)
+    con_texto = np.flatnonzero(etiquetas != "")
+    estilo = dict(color_nodos=color_nodos, color_aristas=color_aristas, ancho=ancho, alpha=alpha)
+
+    carpeta = Path(carpeta)
+    resumen, tareas = {}, []
+    for z in range(zoom_maximo + 1):
+        etiquetados = etiquetados_nivel(Q, con_texto, prioridad, z) if len(con_texto) else con_texto
+        nivel = tareas_nivel(Q, origen, destino, z, etiquetados, carpeta)
+        for columna in {t[2] for t in nivel}:
+            (carpeta / str(z) / str(columna)).mkdir(parents=True, exist_ok=True)
+        resumen[z] = (len(nivel), 4 ** z)
+        tareas.extend(nivel)
+
+    lotes = [tareas[i:i + lote] for i in range(0, len(tareas), lote)]
+    argumentos = (Q, origen, destino, np.ascontiguousarray(tamanos), etiquetas, estilo)
+    procesos = min(procesos or os.cpu_count() or 1, max(len(lotes), 1))
+    if procesos <= 1:
+        _iniciar_trabajador(*argumentos)
+        for bloque in lotes:
+            _dibujar_lote(bloque)
+    else:
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_trabajador, initargs=argumentos) as ejecutor:
+            list(ejecutor.map(_dibujar_lote, lotes))
+
+    escribir_visor(carpeta, zoom_maximo, titulo, n, len(origen))
+    return resumen
+
+
+VISOR_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>__TITULO__</title>
+<style>
+  html, body { margin: 0; height: 100%; overflow: hidden; background: #fff; font-family: sans-serif; }
+  #mapa { position: absolute; inset: 0; cursor: grab; }
+  #mapa img { position: absolute; width: 256px; height: 256px; image-rendering: auto; user-select: none; }
+  #info { position: absolute; left: 8px; top: 8px; background: rgba(255,255,255,.85); padding: 4px 8px;
+          font-size: 13px; border-radius: 4px; pointer-events: none; }
+</style>
+</head>
+<body>
+<div id="mapa"></div>
+<div id="info"></div>
+<script>
+const CONFIG = __CONFIG__;
+const LADO = CONFIG.lado;
+const mapa = document.getElementById('mapa');
+const info = document.getElementById('info');
+const teselas = new Map();
+// Vista: zoom continuo y centro en coordenadas del mundo [0, 1]^2
+let zoom = Math.log2(Math.max(1, Math.min(innerWidth, innerHeight) / LADO));
+let centro = [0.5, 0.5];
+
+function dibujar() {
+  const z = Math.max(0, Math.min(CONFIG.zoom_maximo, Math.round(zoom)));
+  const tam = LADO * Math.pow(2, zoom - z);           // px en pantalla de una tesela del nivel z
+  const mundo = LADO * Math.pow(2, zoom);             // px en pantalla del mundo completo
+  const x0 = innerWidth / 2 - centro[0] * mundo, y0 = innerHeight / 2 - centro[1] * mundo;
+  const n = Math.pow(2, z);
+  const minX = Math.max(0, Math.floor(-x0 / tam)), maxX = Math.min(n - 1, Math.floor((innerWidth - x0) / tam));
+  const minY = Math.max(0, Math.floor(-y0 / tam)), maxY = Math.min(n - 1, Math.floor((innerHeight - y0) / tam));
+  const visibles = new Set();
+  for (let x = minX; x <= maxX; x++) {
+    for (let y = minY; y <= maxY; y++) {
+      const clave = z + '/' + x + '/' + y;
+      visibles.add(clave);
+      let img = teselas.get(clave);
+      if (!img) {
+        img = new Image();
+        img.onerror = () => { img.style.display = 'none'; };   // tesela sin geometría: no existe
+        img.src = clave + '.png';
+        img.draggable = false;
+        teselas.set(clave, img);
+        mapa.appendChild(img);
+      }
+      img.style.left = (x0 + x * tam) + 'px';
+      img.style.top = (y0 + y * tam) + 'px';
+      img.style.width = img.style.height = tam + 'px';
+    }
+  }
+  for (const [clave, img] of teselas) {
+    if (!visibles.has(clave)) { img.remove(); teselas.delete(clave); }
+  }
+  info.textContent = CONFIG.titulo + ' • ' + CONFIG.nodos + ' nodos • ' + CONFIG.aristas +
+                     ' aristas • zoom ' + zoom.toFixed(1) + ' (nivel ' + z + '/' + CONFIG.zoom_maximo + ')';
+}
+
+mapa.addEventListener('wheel', (e) => {
+  e.preventDefault();
+  const mundo = LADO * Math.pow(2, zoom);
+  // El punto bajo el cursor queda fijo
+  const px = centro[0] + (e.clientX - innerWidth / 2) / mundo, py = centro[1] + (e.clientY - innerHeight / 2) / mundo;
+  zoom = Math.max(-1, Math.min(CONFIG.zoom_maximo + 2, zoom - e.deltaY * 0.002));
+  const nuevo = LADO * Math.pow(2, zoom);
+  centro = [px - (e.clientX - innerWidth / 2) / nuevo, py - (e.clientY - innerHeight / 2) / nuevo];
+  dibujar();
+}, { passive: false });
+
+let arrastre = null;
+mapa.addEventListener('pointerdown', (e) => { arrastre = [e.clientX, e.clientY]; mapa.style.cursor = 'grabbing'; });
+addEventListener('pointerup', () => { arrastre = null; mapa.style.cursor = 'grab'; });
+addEventListener('pointermove', (e) => {
+  if (!arrastre) return;
+  const mundo = LADO * Math.pow(2, zoom);
+  centro = [centro[0] - (e.clientX - arrastre[0]) / mundo, centro[1] - (e.clientY - arrastre[1]) / mundo];
+  arrastre = [e.clientX, e.clientY];
+  dibujar();
+});
+addEventListener('resize', dibujar);
+dibujar();
+</script>
+</body>
+</html>
+"""
+
+
+def escribir_visor(carpeta, zoom_maximo, titulo, nodos, aristas):
+    """index.html con la configuración incrustada (funciona abriéndolo con file://)"""
+    config = dict(lado=LADO_TESELA, zoom_maximo=zoom_maximo, titulo=titulo, nodos=nodos, aristas=aristas)
+    html = VISOR_HTML.replace("__CONFIG__", json.dumps(config, ensure_ascii=False))
+    html = html.replace("__TITULO__", titulo.replace("<", "&lt;"))
+    ruta = Path(carpeta) / "index.html"
+    ruta.write_text(html, encoding="utf-8")
+    return ruta
+
+
+def benchmark(n=100_000, m=300_000, procesos=None, semilla=42):
+    """Tiempo de la pirámide para una malla con ruido y aristas locales (como tras un layout)"""
+    import tempfile
+
+    rng = np.random.default_rng(semilla)
+    lado = int(np.sqrt(n))
+    P = np.column_stack([np.arange(n) % lado, np.arange(n) // lado]) + rng.normal(scale=0.5, size=(n, 2))
+    origen = rng.integers(0, n, m)
+    destino = np.clip(origen + rng.integers(-3, 4, m) + lado * rng.integers(-3, 4, m), 0, n - 1)
+    print(f"🧪 Benchmark teselas: {n:,} nodos, {m:,} aristas")
+    with tempfile.TemporaryDirectory() as carpeta:
+        inicio = time.perf_counter()
+        resumen = exportar_teselas(P, origen, destino, carpeta, procesos=procesos,
+                                   etiquetas=[f"n{i}" for i in range(n)], prioridad=np.bincount(origen, minlength=n))
+        duracion = time.perf_counter() - inicio
+        tamano = sum(f.stat().st_size for f in Path(carpeta).rglob("*.png")) / 1e6
+    for z, (dibujadas, total) in resumen.items():
+        print(f"   • z={z}: {dibujadas:,} / {total:,} teselas")
+    print(f"⏱️  {sum(d for d, _ in resumen.values()):,} teselas en {duracion:.2f}s ({tamano:.1f} MB)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pirámide de teselas (deep zoom) de un grafo")
+    ap.add_argument("--benchmark", action="store_true", help="Grafo sintético de 100k nodos / 300k aristas")
+    ap.add_argument("--nodos", type=int, default=100_000)
+    ap.add_argument("--aristas", type=int, default=300_000)
+    ap.add_argument("--procesos", type=int, default=None, help="Procesos trabajadores (default: todos)")
+    args = ap.parse_args()
+    if args.benchmark:
+        benchmark(args.nodos, args.aristas, args.procesos)
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,50 @@
 # -*- coding: utf-8 -*-
 """
 unir_grafos.py - Une y analiza COMPLETAMENTE los grafos de Qoyllur Riti y Celebración a la Virgen
+
+Uso:
+    python unir_grafos.py                      # semillas por defecto
+    python unir_grafos.py Q2408955 Q60643381 Q...   # cualquier número de semillas
 """
 
 import pickle
+import argparse
+from itertools import combinations
 import networkx as nx
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from collections import Counter
 
+from grafo_disperso import GrafoDisperso, huella
+from centralidad import calcular_centralidades
+from motor_union import unir_n_grafos
+from oraculo_distancias import OraculoDistancias
+from excentricidad import diametro_radio_por_componente
+from componentes import agrupar_por_componente, componentes_grafo
+from comunidades import comunidades_grafo, tabla_contingencia
+from similitud import IndiceSimilitud, ruta_indice
+from embeddings import Embeddings, ruta_embeddings
+from motivos import analizar_motivos, TRIADAS_CONEXAS
+from ranking import IndiceRanking, ruta_ranking, top_k, top_k_dict
+from disposicion import disposicion, ruta_disposicion
+from dibujo import arrays_dibujo, colocar_etiquetas, dibujar_aristas, dibujar_nodos
+from vista_agregada import dibujar_vista_agregada, NODOS_VISTA_DETALLADA
+
+# Semillas por defecto (QID -> nombre); cada una tiene su grafo_<QID>.pkl
+SEMILLAS = {
+    "Q2408955": "Qoyllur Riti",
+    "Q60643381": "Celebración a la Virgen",
+}
+
+GRAFO_RELACIONES = "relaciones"   # nombre del grafo de relaciones entre semillas en el índice MinHash
+
+# Relaciones conocidas entre semillas que no aparecen en sus grafos de grado 2
+RELACIONES_SEMILLAS = [
+    ("Q2408955", "Q60643381", "P361", "parte de"),
+    ("Q60643381", "Q2408955", "P527", "tiene parte"),
+]
+
 def cargar_grafo(filename):
     """Carga un grafo desde archivo PKL"""
     try:
@@ -19,52 +54,99 @@ def cargar_grafo(filename):
         print(f"Error al cargar {filename}: {e}")
         return None
 
-def unir_grafos():
-    """Une los dos grafos y analiza la red combinada"""
+def actualizar_indice_similitud(grafos, relaciones, ruta):
+    """Índice MinHash del grafo combinado: solo se pliegan los grafos que aún no contiene
+
+    Cada grafo plegado (semillas y relaciones entre ellas) guarda su huella. Si
+    uno ya plegado cambió (re-crawl, profundización) o se retiró, el índice se
+    reconstruye: los mínimos de MinHash no permiten quitar aristas.
+    """
+    dispersos = {q_id: GrafoDisperso.desde_networkx(grafo) for q_id, grafo in grafos.items()}
+    if relaciones:
+        dispersos[GRAFO_RELACIONES] = GrafoDisperso.desde_networkx(nx.DiGraph(relaciones))
+    huellas = {nombre: huella(gd) for nombre, gd in dispersos.items()}
+    
+    indice = None
+    if ruta.exists():
+        indice = IndiceSimilitud.cargar(ruta)
+        sin_huella = set(indice.semillas_grafo) - set(indice.huellas)
+        if indice.nodos and not indice.huellas:
+            sin_huella.add(GRAFO_RELACIONES)   # índice anterior a las huellas: no se sabe qué contiene
+        cambiados = [q for q, h in indice.huellas.items() if huellas.get(q) != h]
+        if sin_huella or cambiados:
+            print(f"   • Índice MinHash reconstruido (cambiaron: {', '.join(sorted(sin_huella | set(cambiados)))})")
+            indice = None
+    if indice is None:
+        indice = IndiceSimilitud([], np.zeros((0, 128), dtype=np.uint32))
+    
+    for nombre, gd in dispersos.items():
+        if nombre not in indice.huellas:
+            indice.agregar(gd, [nombre] if nombre in grafos else [], {nombre: huellas[nombre]})
+    indice.guardar(ruta)
+    return indice
+
+def unir_grafos(semillas=None):
+    """Une los grafos de las semillas (uno por festividad) y guarda el grafo combinado"""
+    semillas = semillas or list(SEMILLAS)
     print("🔗 UNIENDO Y ANALIZANDO GRAFOS COMBINADOS")
     print("=" * 65)
-    print("Qoyllur Riti (Q2408955) + Celebración a la Virgen (Q60643381)")
+    print(" + ".join(f"{SEMILLAS.get(q, q)} ({q})" for q in semillas))
     print("=" * 65)
     
     # Cargar grafos individuales
     print("📂 Cargando grafos individuales...")
-    grafo_qoyllur = cargar_grafo("grafo_Q2408955.pkl")
-    grafo_virgen = cargar_grafo("grafo_Q60643381.pkl")
-    
-    if not grafo_qoyllur or not grafo_virgen:
-        print("❌ No se pudieron cargar ambos grafos")
-        return None
-    
-    # Mostrar stats iniciales
-    print(f"   • Qoyllur Riti: {grafo_qoyllur.number_of_nodes()} nodos, {grafo_qoyllur.number_of_edges()} aristas")
-    print(f"   • Celebración Virgen: {grafo_virgen.number_of_nodes()} nodos, {grafo_virgen.number_of_edges()} aristas")
-    
-    # Crear grafo combinado
+    grafos = {}
+    for q_id in semillas:
+        grafo = cargar_grafo(f"grafo_{q_id}.pkl")
+        if not grafo:
+            print(f"❌ No se pudo cargar el grafo de {q_id}")
+            return None
+        grafos[q_id] = grafo
+        print(f"   • {SEMILLAS.get(q_id, q_id)}: {grafo.number_of_nodes()} nodos, {grafo.number_of_edges()} aristas")
+    
+    # Crear grafo combinado (una pasada, conflictos de atributos según motor_union.REGLAS_POR_DEFECTO)
     print("🔄 Combinando grafos...")
-    grafo_combinado = nx.compose(grafo_qoyllur, grafo_virgen)
-    
-    # Agregar conexión entre las dos entidades principales
-    grafo_combinado.add_edge("Q2408955", "Q60643381", 
-                           label="P361",  # parte de
-                           prop_label="parte de",
-                           dimension="Relacional")
-    grafo_combinado.add_edge("Q60643381", "Q2408955", 
-                           label="P527",  # tiene parte
-                           prop_label="tiene parte",
-                           dimension="Relacional")
-    
-    # Guardar grafo combinado
+    grafo_combinado, indice = unir_n_grafos(grafos)
+    
+    # Agregar conexiones conocidas entre entidades principales
+    relaciones = []
+    for origen, destino, prop, prop_label in RELACIONES_SEMILLAS:
+        if origen in grafos and destino in grafos:
+            grafo_combinado.add_edge(origen, destino, 
+                                   label=prop,
+                                   prop_label=prop_label,
+                                   dimension="Relacional")
+            relaciones.append((origen, destino))
+    
+    # Guardar grafo combinado e índice de pertenencia a semillas
     with open("grafo_combinado.pkl", 'wb') as f:
         pickle.dump(grafo_combinado, f)
+    indice.guardar("indice_semillas.npz")
+    
+    # Índice de similitud (MinHash/LSH) junto al grafo, actualizado incrementalmente
+    similitud = actualizar_indice_similitud(grafos, relaciones, ruta_indice("grafo_combinado.pkl"))
+    
+    # Embeddings por paseos aleatorios (recomendación de entidades relacionadas)
+    embeddings = Embeddings.desde_grafo(GrafoDisperso.desde_networkx(grafo_combinado))
+    embeddings.guardar(ruta_embeddings("grafo_combinado.pkl"))
     
     print(f"✅ Grafos unidos exitosamente")
     print(f"   • Nodos totales: {grafo_combinado.number_of_nodes()}")
     print(f"   • Aristas totales: {grafo_combinado.number_of_edges()}")
     print(f"   • Densidad: {nx.density(grafo_combinado):.6f}")
     
-    return grafo_combinado, grafo_qoyllur, grafo_virgen
+    for q_id in semillas:
+        parecidos = similitud.similares(q_id, 5)
+        if len(parecidos):
+            print(f"   • Más parecidos a {SEMILLAS.get(q_id, q_id)}: " +
+                  ", ".join(f"{nodo} ({jaccard:.2f})" for nodo, jaccard in parecidos.items()))
+        cercanos = embeddings.vecinos(q_id, 5)
+        print(f"   • Más cercanos (embeddings) a {SEMILLAS.get(q_id, q_id)}: " +
+              ", ".join(f"{nodo} ({coseno:.2f})" for nodo, coseno in cercanos.items()))
+    
+    return grafo_combinado, indice
 
-def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
+def analizar_grafo_combinado(grafo, indice):
     """Analiza COMPLETAMENTE el grafo combinado"""
     print("\n" + "="*60)
     print("📊 ANÁLISIS COMPLETO DEL GRAFO COMBINADO")
@@ -76,13 +158,23 @@ def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
     print(f"• Nodos totales: {grafo.number_of_nodes()}")
     print(f"• Aristas totales: {grafo.number_of_edges()}")
     print(f"• Densidad: {nx.density(grafo):.6f}")
-    print(f"• Diámetro: {nx.diameter(grafo.to_undirected()) if nx.is_connected(grafo.to_undirected()) else 'No conectado'}")
-    print(f"• Radio: {nx.radius(grafo.to_undirected()) if nx.is_connected(grafo.to_undirected()) else 'N/A'}")
+    
+    # Diámetro y radio exactos con pocas BFS (double-sweep + iFUB), por componente
+    gd = GrafoDisperso.desde_networkx(grafo)
+    excentricidades = diametro_radio_por_componente(gd)
+    if len(excentricidades) == 1:
+        print(f"• Diámetro: {excentricidades.at[0, 'diametro']}")
+        print(f"• Radio: {excentricidades.at[0, 'radio']}")
+    else:
+        print(f"• Diámetro / radio por componente ({len(excentricidades)} componentes, mayores primero):")
+        for fila in excentricidades.head(5).itertuples():
+            print(f"   - {fila.nodos} nodos: diámetro {fila.diametro}, radio {fila.radio}")
     
     # 2. COMPONENTES CONECTADOS
     print("\n2. 🔗 COMPONENTES CONECTADOS")
     print("-" * 30)
-    componentes = list(nx.connected_components(grafo.to_undirected()))
+    # Union-find sobre los arrays de aristas (sin copia no dirigida del grafo)
+    componentes = [{gd.nodos[i] for i in idx} for idx in agrupar_por_componente(componentes_grafo(gd))]
     print(f"• Componentes conectados: {len(componentes)}")
     
     componente_principal = max(componentes, key=len)
@@ -94,7 +186,7 @@ def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
     
     # Grado de centralidad
     centralidad_grado = nx.degree_centrality(grafo)
-    top_grado = sorted(centralidad_grado.items(), key=lambda x: x[1], reverse=True)[:15]
+    top_grado = top_k_dict(centralidad_grado, 15)
     
     print("🔝 TOP 15 NODOS POR GRADO DE CENTRALIDAD:")
     for i, (nodo, cent) in enumerate(top_grado, 1):
@@ -104,7 +196,7 @@ def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
     
     # Betweenness centrality
     betweenness = nx.betweenness_centrality(grafo)
-    top_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_betweenness = top_k_dict(betweenness, 10)
     
     print("\n🔝 TOP 10 NODOS POR INTERMEDIACIÓN:")
     for i, (nodo, bet) in enumerate(top_betweenness, 1):
@@ -132,11 +224,20 @@ def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
     # 6. NODOS COMPARTIDOS
     print("\n6. 🤝 NODOS COMPARTIDOS ENTRE GRAFOS")
     print("-" * 30)
-    nodos_qoyllur = set(grafo_qoyllur.nodes())
-    nodos_virgen = set(grafo_virgen.nodes())
-    nodos_comunes = nodos_qoyllur.intersection(nodos_virgen)
+    # Conteos por par con el índice de pertenencia (popcounts sobre bitsets)
+    compartidos = indice.matriz_compartidos()
+    for a, b in combinations(range(len(indice.semillas)), 2):
+        print(f"• {indice.semillas[a]} ∩ {indice.semillas[b]}: {compartidos[a, b]} nodos")
+    
+    multiplicidad = np.bincount(indice.multiplicidad(), minlength=len(indice.semillas) + 1)
+    for k in range(2, len(indice.semillas) + 1):
+        if multiplicidad[k]:
+            print(f"• Nodos en exactamente {k} semillas: {multiplicidad[k]}")
     
-    print(f"• Nodos en común: {len(nodos_comunes)}")
+    en_todas = indice.en_todas(indice.semillas)
+    nodos_comunes = {nodo for nodo, comun in zip(indice.nodos, en_todas) if comun}
+    
+    print(f"• Nodos en común (todas las semillas): {len(nodos_comunes)}")
     if nodos_comunes:
         print("• Ejemplos de nodos compartidos:")
         for i, nodo in enumerate(list(nodos_comunes)[:10], 1):
@@ -159,27 +260,46 @@ def analizar_grafo_combinado(grafo, grafo_qoyllur, grafo_virgen):
     # 8. ANÁLISIS DE CONECTIVIDAD
     print("\n8. 📡 CONECTIVIDAD ENTRE NODOS PRINCIPALES")
     print("-" * 30)
-    try:
-        camino = nx.shortest_path(grafo, "Q2408955", "Q60643381")
-        print(f"• Camino más corto Q2408955 → Q60643381: {len(camino)-1} saltos")
-        print(f"• Ruta: {' → '.join(camino)}")
-    except:
-        print("• No hay camino directo entre los nodos principales")
-    
-    # 9. EXPORTAR DATOS COMPLETOS
-    print("\n9. 💾 EXPORTANDO DATOS DE ANÁLISIS")
+    # Índice de landmarks: cotas inmediatas y camino exacto con BFS bidireccional acotado
+    oraculo = OraculoDistancias(gd, dirigido=True)
+    for origen, destino in combinations(indice.semillas, 2):
+        inferior, superior = oraculo.cotas(origen, destino)
+        camino = oraculo.camino(origen, destino)
+        if camino:
+            print(f"• Camino más corto {origen} → {destino}: {len(camino)-1} saltos (cotas [{inferior}, {superior}])")
+            print(f"• Ruta: {' → '.join(camino)}")
+        else:
+            print(f"• No hay camino directo entre {origen} y {destino}")
+    
+    # 9. TRIÁNGULOS Y MOTIVOS
+    print("\n9. 🔺 TRIÁNGULOS Y MOTIVOS DE 3 NODOS")
     print("-" * 30)
-    exportar_analisis_completo(grafo, centralidad_grado, betweenness)
+    motivos, censo, resumen = analizar_motivos(grafo, gd)
+    print(f"• Triángulos: {resumen['triangulos']}")
+    print(f"• Transitividad: {resumen['transitividad']:.4f}")
+    print(f"• Clustering medio: {resumen['clustering_medio']:.4f}")
+    print(f"• Pares que comparten padre P131: {resumen['pares_hermanos_P131']}")
+    print(f"• Pares recíprocos P361/P527: {len(resumen['reciprocos_P361_P527'])}")
+    print("• Tríadas conexas (censo dirigido):")
+    for tipo, cantidad in censo[TRIADAS_CONEXAS].items():
+        if cantidad:
+            print(f"   - {tipo}: {cantidad}")
+    
+    # 10. EXPORTAR DATOS COMPLETOS
+    print("\n10. 💾 EXPORTANDO DATOS DE ANÁLISIS")
+    print("-" * 30)
+    exportar_analisis_completo(grafo, centralidad_grado, betweenness, gd, motivos)
     
     return {
         'centralidad_grado': centralidad_grado,
         'betweenness': betweenness,
         'componentes': componentes,
         'dimensiones': contador_dim,
-        'nodos_comunes': nodos_comunes
+        'nodos_comunes': nodos_comunes,
+        'censo_triadas': censo
     }
 
-def exportar_analisis_completo(grafo, centralidad_grado, betweenness):
+def exportar_analisis_completo(grafo, centralidad_grado, betweenness, gd=None, motivos=None):
     """Exporta análisis completo a CSV CON NOMBRE DEL NODO"""
     datos_completos = []
     
@@ -203,7 +323,23 @@ def exportar_analisis_completo(grafo, centralidad_grado, betweenness):
     
     df_completo = pd.DataFrame(datos_completos)
     
-    df_completo = df_completo.sort_values('grado_centralidad', ascending=False)
+    # Centralidades dispersas (grado entrada/salida, PageRank, eigenvector, Katz)
+    gd = gd or GrafoDisperso.desde_networkx(grafo)
+    centralidades = calcular_centralidades(gd)
+    df_completo = df_completo.join(centralidades, on='nodo_id')
+    
+    # Comunidades por modularidad: ¿coinciden con la división por dimensión?
+    df_completo = df_completo.join(comunidades_grafo(gd), on='nodo_id')
+    
+    # Triángulos, clustering y motivos de Wikidata por nodo (detalle por tríada aparte)
+    if motivos is None:
+        motivos = analizar_motivos(grafo, gd)[0]
+    df_completo = df_completo.join(motivos.drop(columns=TRIADAS_CONEXAS), on='nodo_id')
+    
+    # Índice preordenado de todas las métricas junto al grafo; su orden por grado sirve también al CSV
+    ranking = IndiceRanking.desde_tabla(df_completo.set_index('nodo_id'))
+    ranking.guardar(ruta_ranking("grafo_combinado.pkl"))
+    df_completo = df_completo.iloc[ranking.orden('grado_centralidad')]
     df_completo.to_csv("analisis_completo_combinado.csv", index=False, encoding='utf-8')
     print("✓ Análisis completo exportado a: analisis_completo_combinado.csv")
     
@@ -217,44 +353,69 @@ def exportar_analisis_completo(grafo, centralidad_grado, betweenness):
     
     stats_dimension.to_csv("estadisticas_por_dimension.csv", encoding='utf-8')
     print("✓ Estadísticas por dimensión exportadas a: estadisticas_por_dimension.csv")
+    
+    motivos_dimension = motivos.join(df_completo.set_index('nodo_id')['dimension']).groupby('dimension')
+    motivos.to_csv("motivos_por_nodo.csv", encoding='utf-8')
+    motivos_dimension[TRIADAS_CONEXAS + ['triangulos']].sum().join(
+        motivos_dimension['clustering'].mean().rename('clustering_medio')).to_csv("motivos_por_dimension.csv", encoding='utf-8')
+    print("✓ Motivos exportados a: motivos_por_nodo.csv y motivos_por_dimension.csv")
+    
+    contingencia = tabla_contingencia(df_completo['comunidad'], df_completo['dimension'])
+    contingencia.to_csv("comunidades_por_dimension.csv", encoding='utf-8')
+    print(f"✓ {df_completo['comunidad'].nunique()} comunidades; tabla comunidad x dimensión exportada a: comunidades_por_dimension.csv")
 
-def visualizar_grafo_combinado(grafo):
-    """Visualiza el grafo combinado con mejoras"""
+def visualizar_grafo_combinado(grafo, agrupar=None, expandir=()):
+    """Visualiza el grafo combinado con mejoras (agregado por dimensión/comunidad si es grande)"""
     print("\n🎨 CREANDO VISUALIZACIÓN MEJORADA...")
     
-    plt.figure(figsize=(20, 16))
+    if agrupar is None and grafo.number_of_nodes() > NODOS_VISTA_DETALLADA:
+        agrupar = 'dimension'
+    if agrupar:
+        agregado = dibujar_vista_agregada(grafo, "grafo_combinado_detallado.png", agrupar, expandir, dpi=300,
+                                          titulo="🌄 RED COMBINADA por " + agrupar)
+        print(f"✅ Vista agregada ({agregado.k} grupos) guardada como: grafo_combinado_detallado.png")
+        return
+    
+    fig, ax = plt.subplots(figsize=(20, 16))
     
     # Layout mejorado
-    pos = nx.spring_layout(grafo, k=3, iterations=100, seed=42)
+    pos = disposicion(grafo, semilla=42, cache=ruta_disposicion("grafo_combinado.pkl"))
+    nodos, P, origen, destino, _ = arrays_dibujo(grafo, pos)
     
     # Colores y tamaños personalizados
     node_colors = []
     node_sizes = []
-    labels = {}
+    labels = [None] * len(nodos)
     
-    for node in grafo.nodes():
+    for i, node in enumerate(nodos):
         if node == "Q2408955":
             node_colors.append('red')
             node_sizes.append(1200)
-            labels[node] = "Qoyllur\nRiti"
+            labels[i] = "Qoyllur\nRiti"
         elif node == "Q60643381":
             node_colors.append('purple')
             node_sizes.append(1200)
-            labels[node] = "Celebración\nVirgen"
+            labels[i] = "Celebración\nVirgen"
         elif grafo.nodes[node].get('type') == 'intermediate':
             node_colors.append('blue')
             node_sizes.append(400)
             if grafo.degree(node) > 5:  # Etiquetar intermediarios importantes
-                labels[node] = node
+                labels[i] = node
         else:
             node_colors.append('green')
             node_sizes.append(200)
             # No etiquetar targets para evitar sobrecarga
     
-    # Dibujar grafo
-    nx.draw_networkx_nodes(grafo, pos, node_color=node_colors, node_size=node_sizes, alpha=0.9)
-    nx.draw_networkx_edges(grafo, pos, edge_color='lightgray', alpha=0.6, width=0.8)
-    nx.draw_networkx_labels(grafo, pos, labels, font_size=8, font_weight='bold')
+    # Dibujar grafo (una colección para aristas y otra para nodos)
+    dibujar_aristas(ax, P, origen, destino, anchos=0.8, color='lightgray', alpha=0.6, dpi=300)
+    dibujar_nodos(ax, P, tamanos=node_sizes, colores=node_colors, bordes='none')
+    
+    # Etiquetas por prioridad (semillas primero, luego intermediarios por grado);
+    # se saltan las que taparían una ya colocada
+    semillas = {"Q2408955", "Q60643381"}
+    prioridad = np.array([np.inf if n in semillas else grafo.degree(n) for n in nodos], dtype=float)
+    candidatos = [i for i in top_k(prioridad, len(nodos)) if labels[i]]
+    colocar_etiquetas(ax, P, labels, orden=candidatos, fontsize=8, fontweight='bold')
     
     # Leyenda
     legend_elements = [
@@ -276,24 +437,37 @@ def visualizar_grafo_combinado(grafo):
     print("✅ Visualización detallada guardada como: grafo_combinado_detallado.png")
 
 def main():
+    ap = argparse.ArgumentParser(description="Une y analiza los grafos de varias festividades semilla")
+    ap.add_argument("semillas", nargs="*", help="QIDs con grafo_<QID>.pkl (default: Qoyllur Riti + Virgen)")
+    ap.add_argument("--agrupar", choices=["dimension", "comunidad"], default=None,
+                    help=f"Vista agregada por grupos (default: dimension si hay más de {NODOS_VISTA_DETALLADA} nodos)")
+    ap.add_argument("--expandir", nargs="*", default=[], help="Grupos de la vista agregada a mostrar nodo a nodo")
+    args = ap.parse_args()
+    
     # Unir grafos
-    grafo_combinado, grafo_qoyllur, grafo_virgen = unir_grafos()
+    union = unir_grafos(args.semillas)
     
-    if grafo_combinado:
+    if union:
+        grafo_combinado, indice = union
+        
         # Analizar completo
-        resultados = analizar_grafo_combinado(grafo_combinado, grafo_qoyllur, grafo_virgen)
+        resultados = analizar_grafo_combinado(grafo_combinado, indice)
         
         # Visualizar
-        visualizar_grafo_combinado(grafo_combinado)
+        visualizar_grafo_combinado(grafo_combinado, args.agrupar, args.expandir)
         
         print("\n" + "="*60)
         print("🎉 ANÁLISIS COMPLETO FINALIZADO")
         print("="*60)
         print("📁 Archivos generados:")
         print("  • grafo_combinado.pkl (grafo completo)")
+        print("  • indice_semillas.npz (pertenencia nodo -> semillas)")
+        print("  • grafo_combinado.minhash.npz (índice de similitud MinHash/LSH)")
+        print("  • grafo_combinado.embeddings.npy (+ .nodos.npy) (embeddings de nodos)")
         print("  • grafo_combinado_detallado.png (visualización)")
         print("  • analisis_completo_combinado.csv (datos completos)")
         print("  • estadisticas_por_dimension.csv (stats por dimensión)")
+        print("  • motivos_por_nodo.csv / motivos_por_dimension.csv (triángulos y tríadas)")
         print("\n📊 Resumen estadístico:")
         print(f"  • {grafo_combinado.number_of_nodes()} nodos analizados")
         print(f"  • {grafo_combinado.number_of_edges()} conexiones mapeadas")
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+vista_agregada.py - Vista de nivel de detalle: grupos en lugar de nodos
+
+Dibujar y etiquetar cada nodo deja de ser legible (y rápido) a partir de unos
+cientos de nodos. La vista agregada colapsa los nodos en super-nodos por
+dimensión o por comunidad (Louvain):
+    • cada super-nodo tiene área proporcional a su nº de miembros
+    • las aristas entre grupos se agrupan en una sola, con grosor ∝ log(cuenta)
+    • los grupos indicados en `expandir` muestran sus nodos individuales
+La agregación es O(n + m) vectorizada; la disposición y el dibujo solo
+dependen del nº de grupos (más los nodos de los grupos expandidos).
+
+Uso:
+    python vista_agregada.py                                   # grafo_combinado.pkl por dimensión
+    python vista_agregada.py --por comunidad --expandir 0 3
+    python vista_agregada.py --grafo grafo_Q2408955.pkl --expandir Identidad Cultural
+"""
+
+import argparse
+import pickle
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from grafo_disperso import GrafoDisperso
+from comunidades import comunidades_grafo
+from disposicion import forceatlas2, normalizar
+from dibujo import dibujar_aristas, dibujar_nodos, guardar_figura
+
+NODOS_VISTA_DETALLADA = 500     # por encima, las visualizaciones pasan a la vista agregada
+SIN_GRUPO = 'N/A'
+
+
+def etiquetas_grupo(grafo, gd, por='dimension'):
+    """Array (alineado con gd.nodos) con el grupo de cada nodo: atributo de nodo o 'comunidad'"""
+    if por == 'comunidad':
+        return comunidades_grafo(gd).to_numpy().astype(str)
+    return np.array([str(grafo.nodes[q].get(por) or SIN_GRUPO) for q in gd.nodos], dtype=object)
+
+
+class GrafoAgregado:
+    """Grafo de grupos: miembros por grupo y aristas entre grupos con su multiplicidad"""
+    def __init__(self, gd, etiquetas, expandir=()):
+        etiquetas = np.asarray(etiquetas, dtype=object)
+        expandidos = np.isin(etiquetas, [str(g) for g in expandir])
+        # Los nodos de un grupo expandido forman su propio grupo (con su QID como nombre)
+        etiquetas = np.where(expandidos, np.array(gd.nodos, dtype=object), etiquetas)
+        codigos, self.nombres = pd.factorize(etiquetas)
+        self.nombres = np.asarray(self.nombres, dtype=object)
+        self.individual = np.zeros(len(self.nombres), dtype=bool)
+        self.individual[codigos[expandidos]] = True
+        self.miembros = np.bincount(codigos, minlength=len(self.nombres))
+        self.asignacion = codigos
+
+        # Aristas entre grupos como pares no dirigidos (a < b), contadas una vez por arista original
+        a, b = codigos[gd.origen], codigos[gd.destino]
+        externas = a != b
+        a, b = np.minimum(a, b)[externas], np.maximum(a, b)[externas]
+        pares, self.cuenta = np.unique(a.astype(np.int64) * len(self.nombres) + b, return_counts=True)
+        self.origen, self.destino = np.divmod(pares, len(self.nombres))
+
+    @property
+    def k(self):
+        return len(self.nombres)
+
+    def adyacencia(self):
+        """CSR simétrica k x k con la multiplicidad como peso"""
+        A = sp.csr_matrix((self.cuenta.astype(np.float64), (self.origen, self.destino)), shape=(self.k, self.k))
+        return (A + A.T).tocsr()
+
+    def posiciones(self, semilla=42, iteraciones=300):
+        """Posiciones normalizadas de los grupos (ForceAtlas2 con masa = nº de miembros)"""
+        if self.k == 1:
+            return np.zeros((1, 2))
+        masas = 1.0 + self.miembros.astype(np.float64)
+        return normalizar(forceatlas2(self.adyacencia(), masas=masas, iteraciones=iteraciones, semilla=semilla))
+
+
+def _tamanos(miembros, minimo=60, maximo=3000):
+    """Área del marcador ∝ nº de miembros, acotada"""
+    escala = (maximo - minimo) / max(miembros.max() - 1, 1)
+    return np.minimum(minimo + escala * (miembros - 1), maximo)
+
+
+def dibujar_vista_agregada(grafo, filename, por='dimension', expandir=(), titulo=None,
+                           figsize=(16, 14), dpi=300, semilla=42):
+    """Dibuja la vista agregada y la guarda (el formato sale de la extensión de filename)"""
+    gd = GrafoDisperso.desde_networkx(grafo)
+    agregado = GrafoAgregado(gd, etiquetas_grupo(grafo, gd, por), expandir)
+    P = agregado.posiciones(semilla)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    anchos = 0.5 + 1.5 * np.log1p(agregado.cuenta)
+    dibujar_aristas(ax, P, agregado.origen, agregado.destino, anchos=anchos, color='gray', alpha=0.5, dpi=dpi)
+
+    grupos = ~agregado.individual
+    colores = np.where(grupos, 'tab:blue', 'tab:orange')
+    dibujar_nodos(ax, P, tamanos=np.where(grupos, _tamanos(agregado.miembros), 40), colores=colores,
+                  alpha=0.85, bordes='black', grosor=0.6)
+
+    # Solo se etiquetan los super-nodos; los nodos expandidos sin etiqueta salvo que haya pocos
+    etiquetar = grupos | (agregado.individual.sum() <= 30)
+    for i in np.flatnonzero(etiquetar):
+        nombre = agregado.nombres[i]
+        if grupos[i]:
+            texto = f"{nombre}\n({agregado.miembros[i]})"
+        else:
+            texto = str(grafo.nodes[nombre].get('label') or nombre)[:34]
+        ax.text(P[i, 0], P[i, 1], texto, fontsize=8 if grupos[i] else 6, ha='center', va='center',
+                fontweight='bold' if grupos[i] else 'normal', zorder=3)
+
+    ax.set_title(titulo or f"Vista agregada por {por}: {agregado.k} grupos, {grafo.number_of_nodes()} nodos, "
+                 f"{grafo.number_of_edges()} aristas", fontsize=14)
+    ax.set_axis_off()
+    ruta = Path(filename)
+    guardar_figura(fig, ruta, (ruta.suffix.lstrip('.') or 'png',), dpi=dpi, bbox_inches='tight', facecolor='white')
+    plt.close(fig)
+    return agregado
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vista agregada (super-nodos por dimensión o comunidad) de un grafo PKL")
+    ap.add_argument("--grafo", default="grafo_combinado.pkl", help="Grafo PKL (default: grafo_combinado.pkl)")
+    ap.add_argument("--por", default="dimension", help="Atributo de nodo o 'comunidad' (default: dimension)")
+    ap.add_argument("--expandir", nargs="*", default=[], help="Grupos a mostrar nodo a nodo")
+    ap.add_argument("--salida", default=None, help="Imagen de salida (default: <grafo>_agregado_<por>.png)")
+    args = ap.parse_args()
+
+    with open(args.grafo, 'rb') as f:
+        grafo = pickle.load(f)
+    salida = args.salida or f"{Path(args.grafo).stem}_agregado_{args.por}.png"
+    agregado = dibujar_vista_agregada(grafo, salida, args.por, args.expandir)
+    print(f"✅ {agregado.k} grupos ({int(agregado.individual.sum())} nodos expandidos), "
+          f"{len(agregado.cuenta)} haces de aristas -> {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Reutilización del índice de subclases guardado en jerarquia_tipos.indice_subclases"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "consulta_wiki"))
+
+from jerarquia_tipos import indice_subclases  # noqa: E402
+
+PARES = [("Q1", "Q200538"), ("Q2", "Q1"), ("Q3", "Q131036"), ("Q4", "Q3")]
+
+
+def test_quitar_una_raiz_deja_de_aceptar_sus_subclases(tmp_path):
+    ruta = tmp_path / "jerarquia.tsv"
+    ruta.write_text("".join(f"{s}\t{p}\n" for s, p in PARES), encoding='utf-8')
+
+    indice = indice_subclases({'Q200538', 'Q131036'}, ruta)
+    assert indice.es_subclase('Q2') and indice.es_subclase('Q4')
+
+    indice = indice_subclases({'Q200538'}, ruta)
+    assert indice.raices == ['Q200538']
+    assert indice.es_subclase('Q2')
+    assert not indice.es_subclase('Q4')
+
+
+def test_mismas_raices_reutiliza_el_indice(tmp_path, monkeypatch):
+    import jerarquia_tipos
+
+    ruta = tmp_path / "jerarquia.tsv"
+    ruta.write_text("".join(f"{s}\t{p}\n" for s, p in PARES), encoding='utf-8')
+    indice_subclases({'Q200538', 'Q131036'}, ruta)
+
+    def no_construir(*args, **kwargs):
+        raise AssertionError("se reconstruyó el índice")
+    monkeypatch.setattr(jerarquia_tipos.IndiceSubclases, "construir", no_construir)
+    assert indice_subclases({'Q131036', 'Q200538'}, ruta).es_subclase('Q4')
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Actualización incremental de métricas en profundizacion.actualizar_grafo"""
+
+import json
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(RAIZ / "grafos"), str(RAIZ / "grafos_unidos")]
+
+import metricas_incrementales  # noqa: E402
+import profundizacion  # noqa: E402
+from grafo_networkx import create_graph_from_results  # noqa: E402
+
+URI = "http://www.wikidata.org/entity/"
+
+
+def _resultados_base():
+    filas = []
+    for intermedio, destinos in [("Q4100", ["Q5100", "Q5200"]), ("Q4200", ["Q5200", "Q5300"])]:
+        for destino in destinos:
+            filas.append({'entidadIntermedia_short': intermedio, 'propiedadGrado1_short': 'P31',
+                          'entidadGrado2_short': destino, 'propiedadGrado2_short': 'P17',
+                          'dimension': 'Cultural'})
+    return filas
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    """JSON base, su CSV de análisis y un directorio de trabajo temporal"""
+    monkeypatch.chdir(tmp_path)
+    ruta = tmp_path / "base_grado2.json"
+    ruta.write_text(json.dumps({'results': _resultados_base()}), encoding='utf-8')
+    G = create_graph_from_results(_resultados_base())
+    df = pd.DataFrame({
+        'nodo': list(G.nodes),
+        'tipo': [G.nodes[q].get('type', 'target') for q in G.nodes],
+        'dimension': [G.nodes[q].get('dimension', 'N/A') for q in G.nodes],
+        'grado_centralidad': pd.Series(nx.degree_centrality(G)).reindex(list(G.nodes)).to_numpy(),
+        'intermediacion': pd.Series(nx.betweenness_centrality(G)).reindex(list(G.nodes)).to_numpy(),
+    })
+    return ruta, df
+
+
+def _resultados_consulta():
+    return [{'nodoOrigen': URI + o, 'nodoDestino': URI + d, 'dimension': 'Cultural'}
+            for o, d in [("Q5100", "Q9100"), ("Q5200", "Q9200"), ("Q4100", "Q9100"), ("Q5300", "Q4200")]]
+
+
+def test_filas_nuevas_con_metricas_reales(base):
+    ruta, df = base
+    df_final = profundizacion.actualizar_grafo(_resultados_consulta(), df.copy(), ruta)
+
+    G = create_graph_from_results(_resultados_base())
+    G.add_edges_from((o, d) for o, d in [("Q5100", "Q9100"), ("Q5200", "Q9200"),
+                                         ("Q4100", "Q9100"), ("Q5300", "Q4200")])
+    esperado = df_final['nodo'].map(nx.degree_centrality(G))
+    np.testing.assert_allclose(df_final['grado_centralidad'], esperado)
+    np.testing.assert_allclose(df_final['intermediacion'], df_final['nodo'].map(nx.betweenness_centrality(G)))
+    nuevos = df_final['tipo'] == 'enriquecido'
+    assert set(df_final.loc[nuevos, 'nodo']) == {"Q9100", "Q9200"}
+    assert df_final['pagerank'].notna().all()
+
+
+def test_segunda_ejecucion_reutiliza_estado_y_pagerank(base, monkeypatch):
+    ruta, df = base
+    profundizacion.actualizar_grafo(_resultados_consulta(), df.copy(), ruta)
+    guardado = metricas_incrementales.MetricasIncrementales.cargar(metricas_incrementales.ruta_metricas(ruta))
+    previo = dict(zip(guardado.nodos, guardado.pagerank_actual()))
+
+    # La segunda ejecución no debe reconstruir el grafo desde el JSON
+    def no_reconstruir(*args, **kwargs):
+        raise AssertionError("se reconstruyó el grafo base")
+    monkeypatch.setattr(profundizacion, "load_json_data", no_reconstruir)
+
+    arranques = []
+    pagerank_original = metricas_incrementales.pagerank
+    def espiar(A, *args, x0=None, **kwargs):
+        arranques.append(x0)
+        return pagerank_original(A, *args, x0=x0, **kwargs)
+    monkeypatch.setattr(metricas_incrementales, "pagerank", espiar)
+
+    consulta = _resultados_consulta() + [{'nodoOrigen': URI + "Q5300", 'nodoDestino': URI + "Q9300",
+                                          'dimension': 'Cultural'}]
+    df_final = profundizacion.actualizar_grafo(consulta, df.copy(), ruta)
+
+    assert len(arranques) == 1 and arranques[0] is not None
+    nodos = guardado.nodos
+    np.testing.assert_allclose(arranques[0][:len(nodos)], [previo[q] for q in nodos])
+    assert "Q9300" in set(df_final['nodo'])
+
+
+def test_estado_se_descarta_si_cambia_el_grafo_base(base):
+    ruta, df = base
+    profundizacion.actualizar_grafo(_resultados_consulta(), df.copy(), ruta)
+    filas = _resultados_base() + [{'entidadIntermedia_short': 'Q4300', 'propiedadGrado1_short': 'P31',
+                                   'entidadGrado2_short': 'Q5400', 'propiedadGrado2_short': 'P17',
+                                   'dimension': 'Cultural'}]
+    ruta.write_text(json.dumps({'results': filas}), encoding='utf-8')
+
+    metricas = profundizacion.cargar_metricas_base(df, ruta)
+    assert "Q5400" in metricas.indice
+    assert "Q9100" not in metricas.indice      # estado anterior descartado
+
+
+def test_aristas_entre_nodos_existentes_actualizan_metricas(base):
+    ruta, df = base
+    consulta = [{'nodoOrigen': URI + "Q5100", 'nodoDestino': URI + "Q5300", 'dimension': 'Cultural'}]
+    df_final = profundizacion.actualizar_grafo(consulta, df.copy(), ruta)
+
+    G = create_graph_from_results(_resultados_base())
+    G.add_edge("Q5100", "Q5300")
+    assert len(df_final) == len(df)
+    np.testing.assert_allclose(df_final['grado_centralidad'], df_final['nodo'].map(nx.degree_centrality(G)))
+    np.testing.assert_allclose(df_final['intermediacion'], df_final['nodo'].map(nx.betweenness_centrality(G)))
+    guardado = metricas_incrementales.MetricasIncrementales.cargar(metricas_incrementales.ruta_metricas(ruta))
+    origen, destino = guardado.aristas()
+    assert ("Q5100", "Q5300") in {(guardado.nodos[i], guardado.nodos[j]) for i, j in zip(origen, destino)}
+
+
+def test_intermediacion_muestreada_en_grafos_grandes(base, monkeypatch):
+    ruta, df = base
+    monkeypatch.setattr(profundizacion, "NODOS_INTERMEDIACION", 3)
+    df_final = profundizacion.actualizar_grafo(_resultados_consulta(), df.copy(), ruta)
+    assert df_final['intermediacion'].notna().all()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""top_k frente al orden completo de np.argsort, con NaN y empates"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "grafos_unidos"))
+
+from ranking import top_k, top_k_dict  # noqa: E402
+
+
+def test_nan_no_pierde_resultados():
+    valores = np.array([3, np.nan, 5, 1, np.nan, 4, 2])
+    assert top_k(valores, 3).tolist() == [2, 5, 0]
+    assert top_k(valores, 7).tolist() == [2, 5, 0, 6, 3, 1, 4]
+
+
+def test_igual_que_argsort_con_nan_y_empates():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(1, 40))
+        valores = rng.integers(0, 5, n).astype(np.float64)
+        valores[rng.random(n) < 0.3] = np.nan
+        orden = np.argsort(-valores, kind='stable')      # NaN al final, empates por índice
+        for k in (1, 3, n // 2, n):
+            np.testing.assert_array_equal(top_k(valores, k), orden[:k])
+
+
+def test_dict_con_nan():
+    metricas = {'a': 0.1, 'b': float('nan'), 'c': 0.3, 'd': 0.3}
+    assert [q for q, _ in top_k_dict(metricas, 3)] == ['c', 'd', 'a']
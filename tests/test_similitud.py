@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Actualización del índice MinHash en unir_grafos.actualizar_indice_similitud"""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / "grafos_unidos"))
+
+from grafo_disperso import GrafoDisperso  # noqa: E402
+from similitud import IndiceSimilitud  # noqa: E402
+from unir_grafos import actualizar_indice_similitud  # noqa: E402
+
+VECINOS = [f"Q{i}" for i in range(100, 106)]
+
+
+def _grafos(vecinos_x):
+    """Semilla A: X e Y con los vecinos dados; semilla B: otro vecindario"""
+    a = nx.DiGraph()
+    a.add_edges_from(("QX", v) for v in vecinos_x)
+    a.add_edges_from(("QY", v) for v in VECINOS)
+    b = nx.DiGraph()
+    b.add_edges_from(("QZ", f"Q{i}") for i in range(200, 206))
+    return {"QA": a, "QB": b}
+
+
+def test_cambio_de_una_semilla_actualiza_las_consultas(tmp_path):
+    ruta = tmp_path / "grafo_combinado.minhash.npz"
+    indice = actualizar_indice_similitud(_grafos(VECINOS), [("QA", "QB")], ruta)
+    assert indice.similares("QX", 3).get("QY") == 1.0
+
+    # Re-crawl de la semilla A: X pierde todos sus vecinos anteriores
+    otros = [f"Q{i}" for i in range(300, 306)]
+    indice = actualizar_indice_similitud(_grafos(otros), [("QA", "QB")], ruta)
+    assert "QY" not in indice.similares("QX", 3)
+
+    cargado = IndiceSimilitud.cargar(ruta)
+    combinado = nx.compose_all(list(_grafos(otros).values()) + [nx.DiGraph([("QA", "QB")])])
+    desde_cero = IndiceSimilitud.desde_grafo(GrafoDisperso.desde_networkx(combinado))
+    orden = [desde_cero.indice[q] for q in cargado.nodos]
+    np.testing.assert_array_equal(cargado.firmas, desde_cero.firmas[orden])
+
+
+def test_sin_cambios_no_se_reconstruye(tmp_path):
+    ruta = tmp_path / "grafo_combinado.minhash.npz"
+    grafos = _grafos(VECINOS)
+    actualizar_indice_similitud({"QA": grafos["QA"]}, [], ruta)
+    indice = actualizar_indice_similitud(grafos, [], ruta)
+    assert indice.semillas_grafo == ["QA", "QB"]       # QA conservada, solo se plegó QB
+    assert set(indice.huellas) == {"QA", "QB"}